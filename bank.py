@@ -0,0 +1,194 @@
+# bank.py
+
+"""Compiled question bank format with random access
+
+    header  : magic, version, flags, question count, index offset
+    records : for each question a u32 length followed by its json payload,
+              zlib compressed when the compressed flag is set
+    index   : one fixed width u64 record offset per question
+
+Records are written before the index so a bank can be compiled from a
+stream of questions without holding them in memory. Readers memory map
+the file and only decode the records that are accessed.
+
+Json lines sets are read the same way through an index of line offsets
+built when the set is opened. Json array sets have no such index and are
+parsed whole.
+"""
+
+import json
+import mmap
+import struct
+import zlib
+from array import array
+
+MAGIC = b'QBNK'
+VERSION = 1
+FLAG_COMPRESSED = 1
+HEADER = struct.Struct('<4sHHQQ')
+LENGTH = struct.Struct('<I')
+OFFSET = struct.Struct('<Q')
+
+class BankError(Exception):
+    pass
+
+def is_bank_file(file_name):
+    try:
+        with open(file_name, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+def encode(question, compressed):
+    payload = json.dumps(question, separators=(',', ':')).encode()
+    return zlib.compress(payload) if compressed else payload
+
+def decode(payload, compressed):
+    return json.loads(zlib.decompress(payload) if compressed else payload)
+
+def write_bank(questions, file_name, compressed=False):
+    """Writes serialized questions from any iterable. Returns the count"""
+    return write_payloads((encode(question, False) for question in questions),
+                          file_name, compressed)
+
+def write_payloads(payloads, file_name, compressed=False):
+    """Writes questions already encoded as uncompressed json payloads.
+    Returns the count"""
+    flags = FLAG_COMPRESSED if compressed else 0
+    offsets = []
+    with open(file_name, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, flags, 0, 0))
+        position = HEADER.size
+        for payload in payloads:
+            if compressed:
+                payload = zlib.compress(payload)
+            offsets.append(position)
+            f.write(LENGTH.pack(len(payload)))
+            f.write(payload)
+            position += LENGTH.size + len(payload)
+        index_offset = position
+        for offset in offsets:
+            f.write(OFFSET.pack(offset))
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, flags, len(offsets), index_offset))
+    return len(offsets)
+
+class Bank:
+    """Read only sequence of serialized questions backed by a mapped bank"""
+
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self.file = open(file_name, "rb")
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise BankError(f"{file_name}: empty bank file")
+        if len(self.map) < HEADER.size:
+            self.close()
+            raise BankError(f"{file_name}: truncated bank header")
+        magic, version, flags, count, index_offset = HEADER.unpack_from(self.map)
+        if magic != MAGIC:
+            self.close()
+            raise BankError(f"{file_name}: not a question bank")
+        if version != VERSION:
+            self.close()
+            raise BankError(f"{file_name}: unsupported bank version {version}")
+        self.compressed = bool(flags & FLAG_COMPRESSED)
+        self.count = count
+        self.index_offset = index_offset
+
+    def __repr__(self):
+        return f"Bank({self.file_name}, {self.count})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(f"question index out of range: {index}")
+        return decode(self.record(index), self.compressed)
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self[index]
+
+    def record(self, index):
+        """Returns the raw payload of a question without decoding it"""
+        offset, = OFFSET.unpack_from(self.map, self.index_offset + index * OFFSET.size)
+        length, = LENGTH.unpack_from(self.map, offset)
+        start = offset + LENGTH.size
+        return self.map[start:start + length]
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+def open_bank(file_name):
+    return Bank(file_name)
+
+def is_json_lines_file(file_name):
+    """A json lines set starts with an object where a json set starts with
+    the list holding them"""
+    try:
+        with open(file_name, "rb") as f:
+            return f.read(64).lstrip().startswith(b'{')
+    except OSError:
+        return False
+
+class JsonLines:
+    """Read only sequence of serialized questions backed by a mapped json
+    lines set. Opening only scans for line offsets, a question is decoded
+    when it is accessed"""
+
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self.file = open(file_name, "rb")
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise BankError(f"{file_name}: empty question set")
+        self.offsets = array('Q')
+        find = self.map.find
+        start, size = 0, len(self.map)
+        while start < size:
+            end = find(b'\n', start)
+            if end < 0:
+                end = size
+            if end > start and not self.map[start:end].isspace():
+                self.offsets.append(start)
+            start = end + 1
+
+    def __repr__(self):
+        return f"JsonLines({self.file_name}, {len(self)})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, index):
+        start = self.offsets[index]
+        end = self.map.find(b'\n', start)
+        return json.loads(self.map[start:end if end >= 0 else len(self.map)])
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def close(self):
+        self.map.close()
+        self.file.close()
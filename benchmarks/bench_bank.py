@@ -0,0 +1,60 @@
+# bench_bank.py
+
+"""Compares loading a json question set against opening a compiled bank
+and decoding only the questions that are asked
+
+    py -m benchmarks.bench_bank [questions] [asked]
+"""
+
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+import click
+
+from bank import open_bank, write_bank
+from benchmarks.synth import generate_questions
+from model import Question
+
+def measure(function):
+    tracemalloc.start()
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+@click.command()
+@click.argument('questions', default=200000)
+@click.argument('asked', default=5)
+def main(questions, asked):
+    with tempfile.TemporaryDirectory() as directory:
+        json_name = os.path.join(directory, "questions.json")
+        bank_name = os.path.join(directory, "questions.qbank")
+        with open(json_name, "w") as f:
+            json.dump(list(generate_questions(questions)), f)
+        write_bank(generate_questions(questions), bank_name, compressed=True)
+        picks = random.sample(range(questions), asked)
+
+        def load_json():
+            with open(json_name) as f:
+                data = json.load(f)
+            return [Question(d, shuffle=False, question_id=i + 1) for i, d in enumerate(data)]
+
+        def load_bank():
+            bank = open_bank(bank_name)
+            questions = [Question(bank[i], shuffle=False, question_id=i + 1) for i in picks]
+            bank.close()
+            return questions
+
+        print(f"{questions} questions, {asked} asked")
+        for name, function in (('json', load_json), ('bank', load_bank)):
+            elapsed, peak = measure(function)
+            print(f"  {name:<5} {elapsed * 1000:.1f}ms peak {peak / 2**20:.2f}MB")
+
+if __name__ == "__main__":
+	main()
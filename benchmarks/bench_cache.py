@@ -0,0 +1,50 @@
+# bench_cache.py
+
+"""Times a full compile against a cached recompile after a one line edit
+
+    py -m benchmarks.bench_cache [questions] [--format=json|jsonl|bank]
+"""
+
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import click
+
+from benchmarks.synth import generate_text
+from cache import BlockCache
+from reader import read_fragments_cached, read_questions, write_fragments, write_questions
+
+@click.command()
+@click.argument('questions', default=50000)
+@click.option('--format', 'output_format', type=click.Choice(['json', 'jsonl', 'bank']),
+              default='json')
+def main(questions, output_format):
+    lines = generate_text(questions).splitlines(True)
+    edited = list(lines)
+    middle = len(lines) // 2
+    while not lines[middle][0].isdigit():
+        middle += 1
+    edited[middle] = lines[middle].rstrip() + " edited\n"
+    with tempfile.TemporaryDirectory() as directory, \
+            contextlib.redirect_stderr(io.StringIO()):
+        file_name = os.path.join(directory, "cache")
+        output = os.path.join(directory, "questions")
+
+        start = time.perf_counter()
+        write_questions(read_questions(lines), output, output_format, False)
+        print(f"  uncached  {time.perf_counter() - start:.3f}s")
+
+        for name, text in (('cold', lines), ('warm', edited)):
+            start = time.perf_counter()
+            cache = BlockCache(file_name, 1, questions * 2)
+            fragments = read_fragments_cached(text, cache, output_format)
+            write_fragments(fragments, output, output_format)
+            cache.save()
+            elapsed = time.perf_counter() - start
+            print(f"  {name:<9} {elapsed:.3f}s {cache.summary()}")
+
+if __name__ == "__main__":
+	main()
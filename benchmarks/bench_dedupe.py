@@ -0,0 +1,55 @@
+# bench_dedupe.py
+
+"""Measures duplicate indexing throughput on questions drawn from a large
+vocabulary with a share of exact and reworded copies mixed in
+
+    py -m benchmarks.bench_dedupe [questions] [copies]
+"""
+
+import random
+import time
+
+import click
+
+import dedupe
+
+def distinct_questions(count, seed=0):
+    rng = random.Random(seed)
+    vocabulary = [f"w{i}" for i in range(20000)]
+    for _ in range(count):
+        yield {
+            'question_before': " ".join(rng.choices(vocabulary, k=rng.randint(8, 30))),
+            'question_after': "",
+            'question_code': [" ".join(rng.choices(vocabulary, k=6)) for _ in range(rng.randint(0, 4))],
+            'answers': [[" ".join(rng.choices(vocabulary, k=4)), i == 0] for i in range(4)],
+            'answer_why': None
+        }
+
+def with_copies(questions, copies, seed=0):
+    """Appends exact copies and copies with one word added"""
+    rng = random.Random(seed)
+    for _ in range(copies):
+        question = dict(rng.choice(questions))
+        if rng.random() < 0.5:
+            question['question_before'] += " reworded"
+        questions.append(question)
+    return questions
+
+@click.command()
+@click.argument('questions', default=20000)
+@click.argument('copies', default=200)
+def main(questions, copies):
+    data = with_copies(list(distinct_questions(questions)), copies)
+    print(f"{len(data)} questions, {copies} copies, numpy: {dedupe.numpy is not None}")
+    index = dedupe.DedupeIndex()
+    start = time.perf_counter()
+    for question in data:
+        index.add(question)
+    indexed = time.perf_counter()
+    clusters = index.clusters()
+    clustered = time.perf_counter()
+    print(f"  index    {len(data) / (indexed - start):.0f} questions/s")
+    print(f"  clusters {len(clusters)} in {clustered - indexed:.3f}s")
+
+if __name__ == "__main__":
+	main()
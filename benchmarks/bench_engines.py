@@ -0,0 +1,35 @@
+# bench_engines.py
+
+"""Times the two reader engines on the same synthetic banks and checks they
+produce identical questions
+
+    py -m benchmarks.bench_engines [largest] [--tabs]
+"""
+
+import timeit
+
+import click
+
+from benchmarks.synth import generate_text
+from reader import parse_block_grammar, parse_text
+
+@click.command()
+@click.argument('largest', default=100000)
+@click.option('--tabs', is_flag=True, help="indent choices with tabs")
+def main(largest, tabs):
+    count = 1000
+    while count <= largest:
+        lines = generate_text(count, indent='\t' if tabs else '    ', code=True).splitlines(True)
+        regex = parse_text(lines)
+        grammar, _ = parse_block_grammar(lines)
+        if grammar != regex:
+            raise SystemExit(f"{count} questions: engines disagree")
+        print(f"{count:>8} questions, {len(lines)} lines")
+        for name, parse in (('regex', parse_text), ('grammar', parse_block_grammar)):
+            elapsed = min(timeit.repeat(lambda: parse(lines), number=1, repeat=3))
+            print(f"  {name:<8} {elapsed:.4f}s {elapsed / count * 1e6:.2f}us/question "
+                  f"{elapsed / len(lines) * 1e6:.2f}us/line")
+        count *= 10
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,38 @@
+# bench_grade.py
+
+"""Measures batch grading throughput in responses per second
+
+    py -m benchmarks.bench_grade [takers] [questions]
+"""
+
+import random
+import time
+
+import click
+
+import grade
+
+@click.command()
+@click.argument('takers', default=2000)
+@click.argument('questions', default=500)
+def main(takers, questions):
+    rng = random.Random(0)
+    keys = [rng.choice((1, 2, 4, 8, 3, 5)) for _ in range(questions)]
+    letters = ["a", "b", "c", "d", "ab", "ac", ""]
+    sheets = [
+        (f"taker {t}", {n + 1: rng.choice(letters) for n in range(questions)})
+            for t in range(takers)
+        ]
+    responses = takers * questions
+    print(f"{takers} takers x {questions} questions, numpy: {grade.numpy is not None}")
+
+    start = time.perf_counter()
+    takers, matrix = grade.encode_sheets(sheets, [4] * questions)
+    encoded = time.perf_counter()
+    grade.score(keys, matrix)
+    scored = time.perf_counter()
+    print(f"  encode {responses / (encoded - start) / 1e6:.2f}M responses/s")
+    print(f"  score  {responses / (scored - encoded) / 1e6:.2f}M responses/s")
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,45 @@
+# bench_lexer.py
+
+"""Compares tokenizer throughput against the character stepping reference
+and the memory held by Token lists against a compact TokenBuffer
+
+    py -m benchmarks.bench_lexer [questions] [repeat]
+"""
+
+import timeit
+import tracemalloc
+
+import click
+
+from benchmarks.synth import generate_text
+from lexer import tokenize, tokenize_buffer, tokenize_by_char
+
+def peak_memory(function):
+    tracemalloc.start()
+    result = function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, result
+
+@click.command()
+@click.argument('questions', default=5000)
+@click.argument('repeat', default=3)
+def main(questions, repeat):
+    text = generate_text(questions)
+    data = text.encode()
+    print(f"{questions} questions, {len(text)} characters")
+    engines = (
+        ('by_char', lambda: tokenize_by_char(text)),
+        ('regex', lambda: tokenize(text)),
+        ('buffer', lambda: tokenize_buffer(data))
+    )
+    for name, function in engines:
+        best = min(timeit.repeat(function, number=1, repeat=repeat))
+        print(f"  {name:<8} {best:.4f}s {len(text) / best / 1e6:.2f} MB/s")
+    for name, function in engines[1:]:
+        peak, tokens = peak_memory(function)
+        print(f"  {name:<8} {len(tokens)} tokens, peak {peak / 1e6:.2f} MB "
+              f"({peak / len(tokens):.1f} bytes/token)")
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,42 @@
+# bench_model.py
+
+"""Compares memory held by Question objects and by a columnar QuestionBank
+
+    py -m benchmarks.bench_model [questions]
+"""
+
+import time
+import tracemalloc
+
+import click
+
+from benchmarks.synth import generate_questions
+from model import Question, QuestionBank
+
+def measure(function, data):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(data)
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, size
+
+def build_questions(data):
+    return [Question(d, shuffle=False, question_id=i + 1) for i, d in enumerate(data)]
+
+def build_bank(data):
+    bank = QuestionBank.from_serialized(data)
+    return [bank.view(i) for i in range(0, len(bank), 1000)]
+
+@click.command()
+@click.argument('questions', default=100000)
+def main(questions):
+    data = list(generate_questions(questions))
+    print(f"{questions} questions")
+    for name, function in (('objects', build_questions), ('columnar', build_bank)):
+        elapsed, size = measure(function, data)
+        print(f"  {name:<9} {elapsed:.3f}s {size / 2**20:.1f}MB retained")
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,28 @@
+# bench_parser.py
+
+"""Times the grammar functions over growing question banks. With the cursor
+based token stream the time per question should stay flat as banks grow
+
+    py -m benchmarks.bench_parser [largest]
+"""
+
+import timeit
+
+import click
+
+from benchmarks.synth import generate_text
+from lexer import tokenize
+from parser import TokenStream, questions
+
+@click.command()
+@click.argument('largest', default=100000)
+def main(largest):
+    count = 1000
+    while count <= largest:
+        tokens = tokenize(generate_text(count, indent='\t'))
+        elapsed = timeit.timeit(lambda: questions(TokenStream(tokens)), number=1)
+        print(f"{count:>8} questions {elapsed:.4f}s {elapsed / count * 1e6:.2f}us/question")
+        count *= 10
+
+if __name__ == "__main__":
+	main()
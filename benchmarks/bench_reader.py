@@ -0,0 +1,37 @@
+# bench_reader.py
+
+"""Per line throughput of the reader's single pattern line classifier
+against the original cascade of line patterns
+
+    py -m benchmarks.bench_reader [largest]
+"""
+
+import timeit
+
+import click
+
+from benchmarks.synth import generate_text
+from reader import CascadeReader, Reader
+
+def feed_all(reader_class, lines):
+    reader = reader_class()
+    feed = reader.feed
+    return [question for question in map(feed, lines) if question is not None]
+
+@click.command()
+@click.argument('largest', default=100000)
+def main(largest):
+    count = 1000
+    while count <= largest:
+        lines = generate_text(count, code=True).splitlines(True)
+        if feed_all(Reader, lines) != feed_all(CascadeReader, lines):
+            raise SystemExit(f"{count} questions: readers disagree")
+        print(f"{count:>8} questions, {len(lines)} lines")
+        for name, reader_class in (('cascade', CascadeReader), ('single', Reader)):
+            elapsed = min(timeit.repeat(lambda: feed_all(reader_class, lines), number=1, repeat=3))
+            print(f"  {name:<8} {elapsed:.4f}s {elapsed / len(lines) * 1e6:.2f}us/line "
+                  f"{len(lines) / elapsed / 1e6:.2f}M lines/s")
+        count *= 10
+
+if __name__ == "__main__":
+	main()
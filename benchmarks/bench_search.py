@@ -0,0 +1,45 @@
+# bench_search.py
+
+"""Measures full text index build rate and query latency
+
+    py -m benchmarks.bench_search [questions] [repeat]
+"""
+
+import os
+import tempfile
+import time
+
+import click
+
+from benchmarks.bench_dedupe import distinct_questions
+from search import IndexBuilder, open_index
+
+QUERIES = ['w1', 'w1 w2', '"w10 w11"', 'w12*', 'w3 -w4', 'w5 OR w6 OR w7']
+
+@click.command()
+@click.argument('questions', default=100000)
+@click.argument('repeat', default=5)
+def main(questions, repeat):
+    builder = IndexBuilder()
+    start = time.perf_counter()
+    for question in distinct_questions(questions):
+        builder.add(question)
+    built = time.perf_counter()
+    with tempfile.TemporaryDirectory() as directory:
+        file_name = os.path.join(directory, "questions.index")
+        terms = builder.write(file_name)
+        written = time.perf_counter()
+        print(f"{questions} questions, {terms} terms, {os.path.getsize(file_name) / 1e6:.1f} MB")
+        print(f"  build {questions / (built - start):.0f} questions/s, write {written - built:.2f}s")
+        with open_index(file_name) as index:
+            for query in QUERIES:
+                best = None
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    found = index.search(query)
+                    elapsed = time.perf_counter() - start
+                    best = elapsed if best is None else min(best, elapsed)
+                print(f"  {query:<16} {len(found):>7} questions {best * 1000:.2f}ms")
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,81 @@
+# bench_server.py
+
+"""Load generator for the quiz server. Runs concurrent client sessions that
+answer every question and reports sessions per second and answer latency
+
+    py -m benchmarks.bench_server [sessions] [concurrency] [questions]
+
+Without --port an in process server is started on a synthetic bank.
+"""
+
+import asyncio
+import json
+import time
+
+import click
+
+from benchmarks.synth import generate_questions
+from model import QuestionBank
+from server import QuizServer
+
+letters = "abcdefghijklmnopqrstuvwxyz"
+
+async def client(host, port, questions, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+
+    async def request(line):
+        writer.write(line.encode() + b"\n")
+        await writer.drain()
+        return json.loads(await reader.readline())
+
+    reply = await request(f"start -s -o --questions=1-{questions}")
+    question = reply['question']
+    while question is not None:
+        # answering with the first letters always passes validation
+        start = time.perf_counter()
+        reply = await request(f"answer {letters[:question['choose']]}")
+        latencies.append(time.perf_counter() - start)
+        question = reply['question']
+    await request("quit")
+    writer.close()
+
+async def run(sessions, concurrency, questions, host, port, bank_size):
+    server_task = None
+    if port is None:
+        bank = QuestionBank.from_serialized(generate_questions(bank_size))
+        started = asyncio.get_running_loop().create_future()
+        server_task = asyncio.create_task(QuizServer(bank).serve(host, 0, started))
+        host, port = (await started)[:2]
+
+    latencies = []
+    pending = iter(range(sessions))
+
+    async def worker():
+        for _ in pending:
+            await client(host, port, questions, latencies)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    if server_task:
+        server_task.cancel()
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[int(len(latencies) * 0.99)]
+    print(f"{sessions} sessions x {questions} questions, {concurrency} concurrent")
+    print(f"  {sessions / elapsed:.1f} sessions/s {len(latencies) / elapsed:.0f} answers/s")
+    print(f"  answer latency p50 {p50 * 1000:.2f}ms p99 {p99 * 1000:.2f}ms")
+
+@click.command()
+@click.argument('sessions', default=500)
+@click.argument('concurrency', default=50)
+@click.argument('questions', default=20)
+@click.option('--host', default="127.0.0.1")
+@click.option('--port', default=None, type=int, help="connect to a running server")
+@click.option('--bank-size', default=10000)
+def main(sessions, concurrency, questions, host, port, bank_size):
+    asyncio.run(run(sessions, concurrency, questions, host, port, bank_size))
+
+if __name__ == "__main__":
+	main()
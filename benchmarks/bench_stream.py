@@ -0,0 +1,52 @@
+# bench_stream.py
+
+"""Compares peak memory and time to first question between parsing a whole
+token list and the lazy chunked pipeline
+
+    py -m benchmarks.bench_stream [questions]
+"""
+
+import os
+import tempfile
+import time
+import tracemalloc
+
+import click
+
+from benchmarks.synth import generate_text
+from lexer import read_from_file, tokenize
+from parser import TokenStream, iter_questions, parse_file_lazily
+
+def measure(blocks):
+    tracemalloc.start()
+    start = time.perf_counter()
+    first = None
+    count = 0
+    for _ in blocks:
+        if first is None:
+            first = time.perf_counter() - start
+        count += 1
+    total = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, first, total, peak
+
+def eager(file_name):
+    tokens = tokenize(read_from_file(file_name))
+    yield from iter_questions(TokenStream(tokens))
+
+@click.command()
+@click.argument('questions', default=50000)
+def main(questions):
+    with tempfile.TemporaryDirectory() as directory:
+        file_name = os.path.join(directory, "questions.txt")
+        with open(file_name, "w") as f:
+            f.write(generate_text(questions, indent='\t'))
+        print(f"{questions} questions, {os.path.getsize(file_name)} bytes")
+        for name, blocks in (('eager', eager), ('lazy', parse_file_lazily)):
+            count, first, total, peak = measure(blocks(file_name))
+            print(f"  {name:<6} {count} blocks, first after {first * 1000:.1f}ms, "
+                  f"total {total:.2f}s, peak {peak / 2**20:.1f}MB")
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,105 @@
+# run.py
+
+"""Benchmark suite timing every pipeline stage on synthetic banks. Results
+are written as json so runs can be compared across changes
+
+    py -m benchmarks.run [--sizes=100,1000,10000,100000] [--output=file.json]
+
+The lexer and parser stages run on the subset of the format the preview
+grammar accepts (tab indented choices, no code blocks). Every other stage,
+including the reader's grammar engine, runs on banks with code blocks and
+multi answer keys.
+"""
+
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import click
+
+from benchmarks.synth import write_question_file
+from lexer import read_from_file, tokenize
+from model import Question
+from parser import TokenStream, questions
+from quizzer import load_questions
+from reader import (create_json_file, parse_block_grammar, parse_text,
+                    read_lines_from_file)
+
+def best_of(repeat, function):
+    """Returns the best time and the result of the last run"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def run_size(size, seed, repeat, directory):
+    text_name = os.path.join(directory, f"questions_{size}.txt")
+    grammar_name = os.path.join(directory, f"grammar_{size}.txt")
+    json_name = os.path.join(directory, f"questions_{size}.json")
+    write_question_file(text_name, size, seed, code=True)
+    write_question_file(grammar_name, size, seed, indent='\t')
+
+    results = {}
+    def stage(name, function):
+        elapsed, result = best_of(repeat, function)
+        results[name] = elapsed
+        return result
+
+    text = stage('lexer.read', lambda: read_from_file(grammar_name))
+    tokens = stage('lexer.tokenize', lambda: tokenize(text))
+    stage('parser.parse', lambda: questions(TokenStream(tokens)))
+    lines = stage('reader.read', lambda: read_lines_from_file(text_name))
+    serialized = stage('reader.parse_text', lambda: parse_text(lines))
+    stage('reader.grammar', lambda: parse_block_grammar(lines))
+    with contextlib.redirect_stderr(io.StringIO()):
+        stage('reader.write_json', lambda: create_json_file(serialized, json_name))
+    stage('quizzer.load', lambda: load_questions(json_name))
+    stage('model.Question', lambda: [
+        Question(d, shuffle=False, question_id=i + 1) for i, d in enumerate(serialized)
+    ])
+    return [
+        {
+            'size': size,
+            'stage': name,
+            'seconds': elapsed,
+            'us_per_question': elapsed / size * 1e6
+        } for name, elapsed in results.items()
+    ]
+
+@click.command()
+@click.option('--sizes', default="100,1000,10000,100000", help="comma separated bank sizes")
+@click.option('--seed', default=0)
+@click.option('--repeat', default=3, help="best of this many runs per stage")
+@click.option('--output', default='-', help="json results file")
+def main(sizes, seed, repeat, output):
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': seed,
+        'repeat': repeat,
+        'time': time.time(),
+        'results': []
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for size in (int(size) for size in sizes.split(',')):
+            results = run_size(size, seed, repeat, directory)
+            for result in results:
+                print(f"{result['size']:>8} {result['stage']:<18} {result['seconds']:.4f}s"
+                      f" {result['us_per_question']:.2f}us/question", file=sys.stderr)
+            report['results'] += results
+    if output == '-':
+        print(json.dumps(report, indent=2))
+    else:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+	main()
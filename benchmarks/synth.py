@@ -0,0 +1,74 @@
+# synth.py
+
+"""Seeded synthetic question banks for benchmarks
+
+    py -m benchmarks.synth [questions] [file_name] [--code/--no-code] [--tabs]
+"""
+
+import random
+
+import click
+
+words = "the a of which value class method returns list string".split()
+code_words = "self return value items index key none true false".split()
+
+def generate_lines(count, seed=0, indent='    ', code=False):
+    """Yields the lines of a question file in the README format. Every
+    question has 2 to 5 choices and an answer key of one or more letters.
+    With code about a third of the questions get a code block followed by
+    additional text"""
+    rng = random.Random(seed)
+    for n in range(1, count + 1):
+        sentence = ' '.join(rng.choice(words) for _ in range(rng.randint(4, 12)))
+        yield f"{n}. {sentence.capitalize()}?\n"
+        if code and rng.random() < 0.33:
+            yield '"""\n'
+            for i in range(1, rng.randint(2, 8)):
+                line = ' '.join(rng.choice(code_words) for _ in range(rng.randint(2, 10)))
+                yield f"{i}. {'    ' * rng.randint(0, 2)}{line}\n"
+            yield '"""\n'
+            yield f"   {' '.join(rng.choice(words) for _ in range(rng.randint(3, 9)))}\n"
+        choices = rng.randint(2, 5)
+        for i in range(choices):
+            yield f"{indent}{chr(97 + i)}. {rng.choice(words)} {rng.randint(0, 999)}\n"
+        key = sorted(rng.sample(range(choices), rng.randint(1, min(3, choices))))
+        yield f"A. ({', '.join(chr(97 + i) for i in key)}) -- answer {n}\n"
+        yield "\n"
+
+def generate_text(count, seed=0, indent='    ', code=False):
+    return "".join(generate_lines(count, seed, indent, code))
+
+def write_question_file(file_name, count, seed=0, indent='    ', code=False):
+    with open(file_name, "w") as f:
+        f.writelines(generate_lines(count, seed, indent, code))
+
+def code_question_lines(count, title="Question"):
+    """Lines of count small questions that each have a one line code block
+    holding an answer line, used as a shared test fixture"""
+    return "".join(
+        f'{n}. {title} {n}\n"""\nA. (a) code {n}\n"""\n    a. first\nA. (a)\n'
+            for n in range(1, count + 1)).splitlines(True)
+
+def generate_questions(count, seed=0):
+    """Yields serialized questions as written by reader.py"""
+    rng = random.Random(seed)
+    for n in range(count):
+        yield {
+            'question_before': f"Question {n} " + "text " * rng.randint(5, 30),
+            'question_after': "",
+            'question_code': [f"line {i}" for i in range(rng.randint(0, 6))],
+            'answers': [[f"answer {i}", i == 0] for i in range(rng.randint(2, 5))],
+            'answer_why': None
+        }
+
+@click.command()
+@click.argument('questions', default=1000)
+@click.argument('file_name', default="questions.txt")
+@click.option('--seed', default=0)
+@click.option('--code/--no-code', default=True, help="include code blocks")
+@click.option('--tabs', is_flag=True, help="indent choices with tabs")
+def main(questions, file_name, seed, code, tabs):
+    write_question_file(file_name, questions, seed, '\t' if tabs else '    ', code)
+
+if __name__ == "__main__":
+	main()
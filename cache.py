@@ -0,0 +1,108 @@
+# cache.py
+
+"""On disk cache of serialized question blocks keyed by content hash"""
+
+import hashlib
+import os
+from functools import partial
+
+from config import sidecar_file_name
+
+cache_file_name = partial(sidecar_file_name, extension='cache')
+
+def block_hash(lines):
+    return hashlib.blake2b("".join(lines).encode(), digest_size=16).hexdigest()
+
+# a block is stored as its json fragments joined by the record separator.
+# json text never holds raw control characters, so the separator and the
+# unit separator standing in for newlines inside fragments are unambiguous
+FRAGMENT_SEPARATOR = '\x1e'
+NEWLINE = '\x1f'
+
+class BlockCache:
+    """Maps block hashes to the json fragments serialized from them.
+
+    The cache file is an append only log of 'key<tab>fragments' lines after
+    a version line. Loading only indexes the raw lines, an entry is split
+    into fragments when it is used and a save appends the new entries. Once
+    the log holds more than max_entries lines it is rewritten keeping the
+    entries used in this run, then the most recently written ones. A
+    version mismatch discards the whole cache"""
+
+    def __init__(self, file_name, version, max_entries):
+        self.file_name = file_name
+        self.version = version
+        self.max_entries = max_entries
+        self.entries = {}
+        self.added = {}
+        self.used = set()
+        self.lines = 0
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def __repr__(self):
+        return f"BlockCache({self.file_name}, {len(self)})"
+
+    def __len__(self):
+        return len(self.entries) + len(self.added)
+
+    def header(self):
+        return f"version {self.version}"
+
+    def load(self):
+        try:
+            with open(self.file_name, "r") as f:
+                header = f.readline()
+                data = f.read()
+        except (OSError, ValueError):
+            return
+        if header != self.header() + "\n":
+            return
+        lines = data.split("\n")
+        # the text after the last newline is empty or an unfinished append
+        lines.pop()
+        self.lines = len(lines)
+        self.entries = dict(line.split("\t", 1) for line in lines if "\t" in line)
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.added.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+        self.hits += 1
+        self.used.add(key)
+        if not entry:
+            return []
+        return entry.replace(NEWLINE, "\n").split(FRAGMENT_SEPARATOR)
+
+    def put(self, key, fragments):
+        self.added[key] = FRAGMENT_SEPARATOR.join(fragments).replace("\n", NEWLINE)
+
+    def save(self):
+        """Appends the new entries, or rewrites the log without the least
+        recently used entries once it outgrows max_entries"""
+        added = {key: entry for key, entry in self.added.items() if key not in self.entries}
+        self.added = {}
+        if self.lines and self.lines + len(added) <= self.max_entries:
+            with open(self.file_name, "a") as f:
+                f.write("".join(f"{key}\t{entry}\n" for key, entry in added.items()))
+            self.entries.update(added)
+            self.lines += len(added)
+            return
+        unused = [key for key in self.entries if key not in self.used]
+        used = [key for key in self.entries if key in self.used]
+        keys = unused + used + list(added)
+        entries = {**self.entries, **added}
+        self.entries = {key: entries[key] for key in keys[max(len(keys) - self.max_entries, 0):]}
+        temporary = f"{self.file_name}.tmp"
+        with open(temporary, "w") as f:
+            f.write(self.header() + "\n")
+            f.write("".join(f"{key}\t{entry}\n" for key, entry in self.entries.items()))
+        os.replace(temporary, self.file_name)
+        self.lines = len(self.entries)
+
+    def summary(self):
+        return f"Cache: {self.hits} hits, {self.misses} misses, {len(self.entries)} entries"
@@ -6,6 +6,10 @@
 # data files
 data_path = "data"
 
+def sidecar_file_name(file_name, extension):
+    """Files derived from a question set are stored next to it"""
+    return f"{file_name}.{extension}"
+
 # file names
 file_name_text = f"{data_path}/questions.txt"
 file_name_json = f"{data_path}/questions.json"
@@ -19,10 +23,18 @@ verbose = False
 randomize_answers = False
 randomize_questions = False
 show_answer = [False, False] # on incorrect, on correct
+schedule_new_questions = 20 # questions never answered before asked per --schedule session
+
+layout_max_entries = 20000 # wrapped layouts kept in a -L layout file
+
+# server variables
+server_host = "127.0.0.1"
+server_port = 8765
 
 # lexer variables
 lex_test_file_name_in = f"{data_path}/question.txt"
 lex_test_file_name_out = f"{data_path}/tokens.txt"
+lex_chunk_size = 1 << 16 # characters read per chunk when streaming
 
 # parser variables
 parse_test_file_name_in = f"{data_path}/tokens.txt"
@@ -31,4 +43,14 @@ parse_test_file_name_out = f"{data_path}/ast.txt"
 # reader variables
 reader_test_file_name_in = f"{data_path}/question.txt"
 reader_test_file_name_out = f"{data_path}/questions.json"
+reader_chunk_lines = 20000 # lines per chunk handed to each --jobs worker
+reader_read_size = 1 << 16 # characters of lines read per batch when streaming
+
+# reader cache variables
+cache_max_entries = 500000
+
+# reader dedupe variables
+dedupe_threshold = 0.7 # estimated word shingle similarity of near duplicates
 
+# reader watch variables
+watch_interval = 0.25 # seconds between checks of the source file
@@ -0,0 +1,238 @@
+# dedupe.py
+
+"""Exact and near duplicate detection for serialized questions
+
+Every question is reduced to its normalized words. Exact duplicates share a
+digest of those words. Near duplicates are found with MinHash signatures
+over word shingles, bucketed by band (locality sensitive hashing) so only
+questions sharing a band are ever compared, keeping the index roughly
+linear in the number of questions.
+
+The index is saved next to the compiled output
+
+    header     : magic, version, permutations, bands, seed, question count
+    digests    : 16 byte digest per question
+    signatures : permutations u32 minhashes per question
+
+so new files can be checked against it without rehashing the old bank.
+"""
+
+import hashlib
+import random
+import struct
+import zlib
+from array import array
+from functools import partial
+
+from config import sidecar_file_name
+from search import question_words
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+MAGIC = b'QDUP'
+VERSION = 1
+HEADER = struct.Struct('<4sHHHIQ')
+DIGEST_SIZE = 16
+MASK = (1 << 64) - 1
+SHINGLE = 3 # words per shingle
+
+class DedupeError(Exception):
+    pass
+
+def shingle_hashes(words):
+    if len(words) <= SHINGLE:
+        return {zlib.crc32(" ".join(words).encode())}
+    return {
+        zlib.crc32(" ".join(words[i:i + SHINGLE]).encode())
+            for i in range(len(words) - SHINGLE + 1)
+    }
+
+def permutations(count, seed):
+    """Multiply shift hash parameters. The same seed gives the same
+    signatures so saved indexes stay comparable"""
+    rng = random.Random(seed)
+    return [(rng.getrandbits(64) | 1, rng.getrandbits(64)) for _ in range(count)]
+
+def signature(hashes, parameters, vectors=None):
+    """Minimum of every permutation over the shingle hashes, kept to the
+    high 32 bits. numpy wraps at 64 bits exactly like the masked fallback"""
+    if vectors is not None and len(hashes) > 8:
+        a, b = vectors
+        values = numpy.fromiter(hashes, dtype=numpy.uint64, count=len(hashes))
+        mixed = a[:, None] * values[None, :] + b[:, None]
+        return (mixed.min(axis=1) >> numpy.uint64(32)).tolist()
+    return [
+        min(((a * x + b) & MASK) for x in hashes) >> 32
+            for a, b in parameters
+    ]
+
+class DedupeIndex:
+    """Digests and signatures of questions in order with band buckets. Pairs
+    of duplicates are recorded as each question is added"""
+
+    def __init__(self, permutation_count=64, bands=16, seed=1, threshold=0.7):
+        if permutation_count % bands:
+            raise DedupeError("permutations must split evenly into bands")
+        self.permutation_count = permutation_count
+        self.bands = bands
+        self.rows = permutation_count // bands
+        self.seed = seed
+        self.threshold = threshold
+        self.parameters = permutations(permutation_count, seed)
+        self.vectors = None
+        if numpy is not None:
+            self.vectors = tuple(
+                numpy.array(column, dtype=numpy.uint64) for column in zip(*self.parameters)
+            )
+        self.digests = []
+        self.signatures = array('I')
+        self.exact = {}
+        self.buckets = [{} for _ in range(bands)]
+        self.pairs = []
+
+    def __repr__(self):
+        return f"DedupeIndex({len(self)} questions, {len(self.pairs)} duplicate pairs)"
+
+    def __len__(self):
+        return len(self.digests)
+
+    def signature(self, index):
+        start = index * self.permutation_count
+        return self.signatures[start:start + self.permutation_count]
+
+    def similarity(self, first, second):
+        """Estimated jaccard similarity of two indexed questions"""
+        matching = sum(x == y for x, y in zip(self.signature(first), self.signature(second)))
+        return matching / self.permutation_count
+
+    def band_keys(self, index):
+        sig = self.signature(index)
+        return [tuple(sig[i * self.rows:(i + 1) * self.rows]) for i in range(self.bands)]
+
+    def insert(self, digest, sig):
+        """Adds a question, records the earlier questions it duplicates and
+        returns its index"""
+        index = len(self.digests)
+        self.digests.append(digest)
+        self.signatures.extend(sig)
+        original = self.exact.get(digest)
+        if original is not None:
+            # exact copies are left out of the buckets, the original matches
+            self.pairs.append((original, index, 1.0))
+            return index
+        self.exact[digest] = index
+        candidates = set()
+        for bucket, key in zip(self.buckets, self.band_keys(index)):
+            found = bucket.setdefault(key, [])
+            candidates.update(found)
+            found.append(index)
+        for candidate in sorted(candidates):
+            similarity = self.similarity(candidate, index)
+            if similarity >= self.threshold:
+                self.pairs.append((candidate, index, similarity))
+        return index
+
+    def add(self, question):
+        words = question_words(question)
+        digest = hashlib.blake2b(" ".join(words).encode(), digest_size=DIGEST_SIZE).digest()
+        if digest in self.exact:
+            return self.insert(digest, self.signature(self.exact[digest]))
+        return self.insert(digest, signature(shingle_hashes(words), self.parameters, self.vectors))
+
+    def clusters(self, start=0):
+        """Groups of duplicate question indices, joined through any chain of
+        pairs, that include a question at or after start. Each cluster is
+        returned sorted with whether all its pairs are exact copies"""
+        parent = {}
+        def find(i):
+            while parent.get(i, i) != i:
+                i = parent[i]
+            return i
+        for first, second, _ in self.pairs:
+            root_first, root_second = find(first), find(second)
+            if root_first != root_second:
+                parent[max(root_first, root_second)] = min(root_first, root_second)
+        groups = {}
+        exact = {}
+        for first, second, _ in self.pairs:
+            root = find(first)
+            groups.setdefault(root, set()).update((first, second))
+            exact[root] = exact.get(root, True) and self.digests[first] == self.digests[second]
+        return [
+            (sorted(group), exact[root]) for root, group in sorted(groups.items())
+                if max(group) >= start
+        ]
+
+    def save(self, file_name, start=0):
+        """Writes the questions from start on, so an index saved after
+        checking against another bank only describes the new questions"""
+        count = len(self) - start
+        with open(file_name, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.permutation_count,
+                                self.bands, self.seed, count))
+            f.write(b"".join(self.digests[start:]))
+            f.write(self.signatures[start * self.permutation_count:].tobytes())
+
+    def load(self, file_name):
+        """Adds every question of a saved index. Duplicates inside it are
+        recorded as pairs like any other"""
+        with open(file_name, "rb") as f:
+            data = f.read()
+        if len(data) < HEADER.size:
+            raise DedupeError(f"{file_name}: truncated index header")
+        magic, version, permutation_count, bands, seed, count = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise DedupeError(f"{file_name}: not a dedupe index")
+        if version != VERSION:
+            raise DedupeError(f"{file_name}: unsupported index version {version}")
+        if (permutation_count, bands, seed) != (self.permutation_count, self.bands, self.seed):
+            raise DedupeError(f"{file_name}: index built with other parameters")
+        signatures = array('I')
+        start = HEADER.size + count * DIGEST_SIZE
+        if len(data) < start + count * permutation_count * signatures.itemsize:
+            raise DedupeError(f"{file_name}: truncated index")
+        signatures.frombytes(data[start:start + count * permutation_count * 4])
+        for i in range(count):
+            digest = data[HEADER.size + i * DIGEST_SIZE:HEADER.size + (i + 1) * DIGEST_SIZE]
+            self.insert(digest, signatures[i * permutation_count:(i + 1) * permutation_count])
+        return count
+
+dedupe_file_name = partial(sidecar_file_name, extension='dedupe')
+
+class DuplicateCheck:
+    """Indexes questions while they are compiled, after loading the saved
+    indexes of other sets so the new questions are checked against them"""
+
+    def __init__(self, against=(), threshold=0.7):
+        self.index = DedupeIndex(threshold=threshold)
+        self.sources = []
+        for file_name in against:
+            self.sources.append((len(self.index), file_name))
+            self.index.load(dedupe_file_name(file_name))
+        self.start = len(self.index)
+
+    def __repr__(self):
+        return f"DuplicateCheck({len(self.sources)} sets, {len(self.index) - self.start} new)"
+
+    def added(self, questions):
+        for question in questions:
+            self.index.add(question)
+            yield question
+
+    def origin(self, index):
+        """Returns (file name, question number) of an indexed question from
+        one of the loaded sets, or None for a new question"""
+        if index >= self.start:
+            return None
+        start, file_name = max(s for s in self.sources if s[0] <= index)
+        return file_name, index - start + 1
+
+    def clusters(self):
+        """Duplicate clusters that include at least one new question"""
+        return self.index.clusters(self.start)
+
+    def save(self, file_name):
+        self.index.save(dedupe_file_name(file_name), self.start)
@@ -1,10 +1,11 @@
 # error.py
 
 class Error(Exception):
-    def __init__(self, error_code=None, token=None, message=None):
+    def __init__(self, error_code=None, token=None, message=None, offset=None):
         self.error_code = error_code
         self.token = token
         self.message = message
+        self.offset = offset
 
 class LexerError(Error):
     pass
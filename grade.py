@@ -0,0 +1,178 @@
+# grade.py
+
+"""Headless batch grading of answer sheets against a question set
+
+Answer sheets are csv files with a header row of question numbers
+
+    taker,1,2,3
+    alice,a,bc,
+    bob,b,bc,d
+
+or json lines with one sheet per line
+
+    {"taker": "alice", "answers": {"1": "a", "2": "bc"}}
+
+Keys and responses are encoded as bitmasks (bit i set for answer letter i)
+so a response is correct when its mask equals the key. A response with a
+letter past the question's choices or a letter given twice is invalid and
+graded as answered but incorrect. Scoring runs on numpy matrices when numpy
+is installed and falls back to plain python.
+"""
+
+import csv
+import json
+import sys
+
+import click
+
+from bank import JsonLines, is_bank_file, is_json_lines_file, open_bank
+from config import file_name_json
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# mask of an invalid response. Keys never set this bit so it never matches
+INVALID = 1 << 63
+
+def answer_mask(answer, choices=26):
+    mask = 0
+    for ch in answer.strip().lower().replace(',', '').replace(' ', ''):
+        bit = ord(ch) - 97
+        if not 0 <= bit < choices or mask >> bit & 1:
+            return INVALID
+        mask |= 1 << bit
+    return mask
+
+def answer_keys(data):
+    """Returns the correct answer bitmask of every serialized question"""
+    keys = []
+    for d in data:
+        mask = 0
+        for i, (_, correct) in enumerate(d['answers']):
+            if correct:
+                mask |= 1 << i
+        keys.append(mask)
+    return keys
+
+def answer_choices(data):
+    """Returns the number of choices of every serialized question"""
+    return [len(d['answers']) for d in data]
+
+def load_keys(file_name):
+    """Returns the answer keys and choice counts of a question set"""
+    if is_bank_file(file_name):
+        with open_bank(file_name) as bank:
+            data = list(bank)
+    elif is_json_lines_file(file_name):
+        with JsonLines(file_name) as lines:
+            data = list(lines)
+    else:
+        with open(file_name, "r") as f:
+            data = json.load(f)
+    return answer_keys(data), answer_choices(data)
+
+def read_sheets(file_name):
+    """Yields (taker, {question number: answer}) for every answer sheet.
+    Malformed sheets raise ValueError"""
+    with open(file_name, "r", newline='') as f:
+        if file_name.endswith('.jsonl'):
+            for number, line in enumerate(f, 1):
+                if line.strip():
+                    sheet = json.loads(line)
+                    if not isinstance(sheet, dict) or 'taker' not in sheet \
+                            or not isinstance(sheet.get('answers'), dict):
+                        raise ValueError(f"line {number}: expected a taker and an answers object")
+                    yield sheet['taker'], {int(k): v for k, v in sheet['answers'].items()}
+            return
+        rows = csv.reader(f)
+        header = next(rows, [])
+        if not all(number.strip().isdigit() for number in header[1:]):
+            raise ValueError("header: expected question numbers after the taker column")
+        numbers = [int(number) for number in header[1:]]
+        for row in rows:
+            if row:
+                yield row[0], dict(zip(numbers, row[1:]))
+
+def encode_sheets(sheets, choices):
+    """Returns the takers and a takers x questions response matrix. Zero
+    means the question was not answered. choices holds the number of
+    choices of every question"""
+    count = len(choices)
+    takers = []
+    masks = {}
+    rows = []
+    for taker, answers in sheets:
+        row = [0] * count
+        for number, answer in answers.items():
+            if not 1 <= number <= count:
+                raise ValueError(f"{taker}: question {number} not in set of {count} questions")
+            choice_count = choices[number - 1]
+            mask = masks.get((answer, choice_count))
+            if mask is None:
+                mask = masks[answer, choice_count] = answer_mask(answer, choice_count)
+            row[number - 1] = mask
+        takers.append(taker)
+        rows.append(row)
+    if numpy is not None:
+        return takers, numpy.array(rows, dtype=numpy.uint64).reshape(len(rows), count)
+    return takers, rows
+
+def score(keys, responses):
+    """Returns correct and answered counts per taker"""
+    if numpy is not None:
+        keys = numpy.asarray(keys, dtype=numpy.uint64)
+        answered = responses != 0
+        correct = answered & (responses == keys)
+        return correct.sum(axis=1).tolist(), answered.sum(axis=1).tolist()
+    correct = []
+    answered = []
+    for row in responses:
+        correct.append(sum(1 for key, mask in zip(keys, row) if mask and mask == key))
+        answered.append(sum(1 for mask in row if mask))
+    return correct, answered
+
+def grade(keys, choices, sheets):
+    """Returns (taker, correct, answered, total) for every sheet"""
+    total = len(keys)
+    takers, responses = encode_sheets(sheets, choices)
+    correct, answered = score(keys, responses)
+    return [(t, c, a, total) for t, c, a in zip(takers, correct, answered)]
+
+def percent(part, whole):
+    return f"{part / whole * 100:.2f}" if whole else "0.00"
+
+def write_report(results, f):
+    writer = csv.writer(f)
+    writer.writerow(['taker', 'correct', 'answered', 'total', 'answered_percent', 'total_percent'])
+    for taker, correct, answered, total in results:
+        writer.writerow([taker, correct, answered, total,
+                         percent(correct, answered), percent(correct, total)])
+
+@click.command()
+@click.argument('sheets', nargs=-1, required=True)
+@click.option('--file', 'file_name', default=file_name_json, help="question set")
+@click.option('--report', default='-', help="per taker csv report")
+def main(sheets, file_name, report):
+    keys, choices = load_keys(file_name)
+    results = []
+    for name in sheets:
+        try:
+            results += grade(keys, choices, read_sheets(name))
+        except (OSError, ValueError) as e:
+            raise click.BadParameter(f"{name}: {e}", param_hint="'SHEETS'")
+    if report == '-':
+        write_report(results, sys.stdout)
+    else:
+        with open(report, "w", newline='') as f:
+            write_report(results, f)
+    correct = sum(c for _, c, _, _ in results)
+    answered = sum(a for _, _, a, _ in results)
+    total = sum(t for _, _, _, t in results)
+    print(f"Graded {len(results)} sheets:", file=sys.stderr)
+    print(f"  {correct}/{answered} questions ({percent(correct, answered)}%)", file=sys.stderr)
+    print(f"  {correct}/{total} questions ({percent(correct, total)}%)", file=sys.stderr)
+
+if __name__ == "__main__":
+	main()
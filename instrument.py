@@ -0,0 +1,126 @@
+# instrument.py
+
+"""Named timing spans and counters shared by the lexer, parser, reader and
+quizzer. Everything is a no-op until enable() is called so instrumented
+code pays only a function call while profiling is off"""
+
+import contextlib
+import functools
+import json
+import sys
+import time
+
+enabled = False
+spans = {} # name -> [calls, seconds]
+counters = {} # name -> count
+
+class Span:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        record = spans.get(self.name)
+        if record is None:
+            spans[self.name] = [1, elapsed]
+        else:
+            record[0] += 1
+            record[1] += elapsed
+
+null_span = contextlib.nullcontext()
+
+def enable():
+    global enabled
+    enabled = True
+
+def reset():
+    spans.clear()
+    counters.clear()
+
+def span(name):
+    """Times the enclosed block under name"""
+    if not enabled:
+        return null_span
+    return Span(name)
+
+def timed(name):
+    """Decorator timing every call of a function under name"""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return function(*args, **kwargs)
+            with Span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def count(name, value=1):
+    if enabled:
+        counters[name] = counters.get(name, 0) + value
+
+def timed_iter(name, iterable):
+    """Times the work done producing each item of a lazy iterable"""
+    if not enabled:
+        return iterable
+    return _timed_iter(name, iterable)
+
+def _timed_iter(name, iterable):
+    iterator = iter(iterable)
+    while True:
+        with Span(name):
+            item = next(iterator, StopIteration)
+        if item is StopIteration:
+            return
+        yield item
+
+def report():
+    return {
+        'spans': {
+            name: {'calls': calls, 'seconds': seconds}
+                for name, (calls, seconds) in spans.items()
+            },
+        'counters': dict(counters)
+    }
+
+def print_report(file=sys.stderr):
+    print("Profile:", file=file)
+    for name, (calls, seconds) in sorted(spans.items(), key=lambda item: -item[1][1]):
+        print(f"  {name:<22} {seconds * 1000:>10.2f}ms {calls:>8} calls", file=file)
+    for name, value in sorted(counters.items()):
+        print(f"  {name:<22} {value:>10}", file=file)
+
+def write_report(destination):
+    """Prints the breakdown for '-' otherwise writes it as json"""
+    if destination == '-':
+        print_report()
+        return
+    with open(destination, "w") as f:
+        json.dump(report(), f, indent=2)
+
+@contextlib.contextmanager
+def profiled(profile, cprofile=None):
+    """Enables spans when profile is set and wraps the block in cProfile when
+    cprofile names a dump file. Reports are written on exit"""
+    if profile:
+        enable()
+    profiler = None
+    if cprofile:
+        import cProfile
+        profiler = cProfile.Profile()
+    if profiler:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(cprofile)
+        if profile:
+            write_report(profile)
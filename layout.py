@@ -0,0 +1,91 @@
+# layout.py
+
+"""Precomputed line wrapping for rendering questions"""
+
+import hashlib
+import json
+import os
+from functools import partial
+
+from config import layout_max_entries, sidecar_file_name
+
+# wrap widths that do not depend on the terminal
+question_width = 80 - 2 - 2
+answer_width = 80 - 4 - 4
+
+def content_hash(question):
+    content = [question.question, question.code, question.additional, question.source_answers]
+    return hashlib.blake2b(json.dumps(content).encode(), digest_size=16).hexdigest()
+
+def wrap_question(question, code_width):
+    """Returns every wrapped text segment needed to render a question, the
+    answers in the order of the question set"""
+    import textwrap
+    return {
+        'question': textwrap.wrap(question.question, question_width),
+        'code': [
+            s for line in question.code
+                for s in textwrap.wrap(line, code_width)
+            ],
+        'additional': textwrap.wrap(question.additional, question_width),
+        'answers': [
+            textwrap.wrap(answer, answer_width) for answer in question.source_answers
+        ]
+    }
+
+class LayoutCache:
+    """Wrapped layouts keyed by question content hash and code width. When
+    given a file name the cache is loaded from and saved to that file so
+    later sessions skip wrapping entirely. Answers are cached unshuffled so
+    every answer order of a question shares one layout. A saved file keeps
+    at most max_entries layouts, dropping the oldest ones not used in this
+    session first"""
+
+    def __init__(self, file_name=None, max_entries=layout_max_entries):
+        self.file_name = file_name
+        self.max_entries = max_entries
+        self.layouts = {}
+        self.used = set()
+        self.changed = False
+        if file_name:
+            self.load()
+
+    def __repr__(self):
+        return f"LayoutCache({self.file_name}, {len(self.layouts)})"
+
+    def __len__(self):
+        return len(self.layouts)
+
+    def load(self):
+        try:
+            with open(self.file_name, "r") as f:
+                self.layouts = json.load(f)
+        except (OSError, ValueError):
+            self.layouts = {}
+
+    def get(self, question, code_width):
+        key = f"{content_hash(question)}:{code_width}"
+        layout = self.layouts.get(key)
+        if layout is None:
+            layout = self.layouts[key] = wrap_question(question, code_width)
+            self.changed = True
+        self.used.add(key)
+        order = question.order
+        if order != sorted(order):
+            layout = {**layout, 'answers': [layout['answers'][i] for i in order]}
+        return layout
+
+    def save(self):
+        if not self.file_name or not self.changed:
+            return
+        if len(self.layouts) > self.max_entries:
+            keys = [key for key in self.layouts if key not in self.used]
+            keys += [key for key in self.layouts if key in self.used]
+            self.layouts = {key: self.layouts[key] for key in keys[-self.max_entries:]}
+        temporary = f"{self.file_name}.tmp"
+        with open(temporary, "w") as f:
+            f.write(json.dumps(self.layouts, separators=(',', ':')))
+        os.replace(temporary, self.file_name)
+        self.changed = False
+
+layout_file_name = partial(sidecar_file_name, extension='layout')
@@ -1,7 +1,12 @@
 # lexer.py
 
+import mmap
+import re
+from array import array
+
 import click
 
+import instrument
 from config import lex_test_file_name_in as file_name_in
 from error import LexerError
 
@@ -22,20 +27,185 @@ RPAREN = 'right parenthesis' # )
 PERIOD = 'period' # '.'
 COMMA = 'comma'
 COMMENT = 'comment' # '--'
+CODE = 'code' # '"""' line, code lines, closing '"""' line
+TEXT = 'text' # any other character or a run of non ascii characters
 ENDMARKER = 'endmarker' # '' (empty string)
 
+# single master pattern used by tokenize. Every match is one token candidate:
+# a whole code block from its opening to its closing quote line, an opening
+# quote line that is never closed, comments, whole numbers, whole words, runs
+# of non ascii characters or any other single non blank character. A
+# carriage return is blank so mapped files with windows line ends give the
+# same tokens. Code lines may hold any character so a block is kept as one
+# token
+token_pattern = re.compile(
+    r'^"""[^\n]*\n(?:(?!""")[^\n]*\n)*"""[^\n]*|^"""[^\n]*|--[^\n]*|[0-9]+|[A-Za-z]+'
+    r'|[^\x00-\x7f]+|[^ \r\n]',
+    re.MULTILINE)
+code_fence = re.compile(r'^"""', re.MULTILINE)
+
+# precomputed character class table keyed on the first character of a match.
+# characters missing from the table are text, the parser only reads text
+# tokens where it takes free text from the source
+CHARACTER_CLASS = {'\t': TAB}
+CHARACTER_CLASS.update((char, WORD) for char in ALPHABET)
+CHARACTER_CLASS.update((char, NUMBER) for char in NUMERIC)
+CHARACTER_CLASS.update((char, SYMBOL) for char in SYMBOLS)
+CHARACTER_CLASS.update({'.': PERIOD, '(': LPAREN, ')': RPAREN, ',': COMMA})
+
+# token types stored in a TokenBuffer as one byte codes. The code of a type
+# is its index in this tuple
+TOKEN_TYPES = (WORD, LETTER_UPPER, LETTER_LOWER, NUMBER, SYMBOL, LPAREN,
+               RPAREN, PERIOD, COMMA, TAB, CODE, TEXT, ENDMARKER)
+TOKEN_CODE = {token_type: code for code, token_type in enumerate(TOKEN_TYPES)}
+
+# the master pattern and character class table over bytes, keyed on the
+# first byte of a match. 0xff marks the quote, which starts code blocks
+byte_token_pattern = re.compile(token_pattern.pattern.encode(), re.MULTILINE)
+BYTE_CLASS = bytes(
+    0xff if byte == ord('"') else
+    TOKEN_CODE[CHARACTER_CLASS.get(chr(byte), TEXT)]
+        for byte in range(256)
+)
+
+def quoted_token(value):
+    """Type of a match starting with a quote. A code block always spans
+    lines, an opening quote line without its closing line is an error"""
+    if len(value) < 3:
+        return TEXT
+    if '\n' not in value:
+        raise LexerError(message="Code block not correctly ended")
+    return CODE
+
 class Token:
+    __slots__ = ('type', 'value')
     def __init__(self, token_type, value):
         self.type = token_type
         self.value = value
     def __repr__(self):
         return f"Token({self.type}, {repr(self.value)})"
 
+class TokenBuffer:
+    """Tokens stored as parallel array columns of type code, start offset and
+    end offset into the source bytes. Memory grows with the token count only,
+    token values are sliced out of the source when they are read.
+
+    Indexing returns Token objects built on demand so a TokenStream runs over
+    the buffer unchanged"""
+
+    def __init__(self, data, mapped=None):
+        self.data = data
+        self.mapped = mapped
+        self.types = array('B')
+        self.starts = array('Q')
+        self.ends = array('Q')
+
+    def __repr__(self):
+        return f"TokenBuffer({len(self)} tokens, {len(self.data)} bytes)"
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        return Token(TOKEN_TYPES[self.types[index]], self.value(index))
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def type(self, index):
+        return TOKEN_TYPES[self.types[index]]
+
+    def view(self, index):
+        """Zero copy view of the token bytes in the source"""
+        return memoryview(self.data)[self.starts[index]:self.ends[index]]
+
+    def value(self, index):
+        return self.data[self.starts[index]:self.ends[index]].decode()
+
+    def close(self):
+        if self.mapped is not None:
+            self.data = b''
+            self.mapped.close()
+            self.mapped = None
+
+@instrument.timed('lexer.tokenize_buffer')
+def tokenize_buffer(data, mapped=None):
+    """Same tokens as tokenize() from source bytes into a TokenBuffer"""
+    tokens = TokenBuffer(data, mapped)
+    types = tokens.types.append
+    starts = tokens.starts.append
+    ends = tokens.ends.append
+    byte_class = BYTE_CLASS
+    word, symbol = TOKEN_CODE[WORD], TOKEN_CODE[SYMBOL]
+    upper, lower = TOKEN_CODE[LETTER_UPPER], TOKEN_CODE[LETTER_LOWER]
+
+    for match in byte_token_pattern.finditer(data):
+        start, end = match.span()
+        first = data[start]
+        code = byte_class[first]
+        if code == word:
+            if end - start < 2:
+                code = upper if first < 97 else lower
+        elif code == 0xff:
+            if end - start < 3:
+                code = TOKEN_CODE[TEXT]
+            elif data.find(b'\n', start, end) < 0:
+                raise LexerError(message="Code block not correctly ended", offset=start)
+            else:
+                code = TOKEN_CODE[CODE]
+        elif code == symbol and end - start > 1:
+            # only comments match more than one symbol
+            continue
+        types(code)
+        starts(start)
+        ends(end)
+
+    types(TOKEN_CODE[ENDMARKER])
+    starts(len(data))
+    ends(len(data))
+    instrument.count('tokens', len(tokens))
+    return tokens
+
+def tokenize_mapped_file(file_name):
+    """Memory maps the file and tokenizes it into a TokenBuffer. The map
+    stays open while the buffer is in use, close the buffer when done"""
+    with open(file_name, "rb") as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files can not be mapped
+            return tokenize_buffer(b'')
+    try:
+        return tokenize_buffer(mapped, mapped)
+    except LexerError:
+        mapped.close()
+        raise
+
+@instrument.timed('lexer.read')
 def read_from_file(file_name):
     with open(file_name, "r") as f:
         lines = f.read()
+    instrument.count('characters', len(lines))
     return lines
 
+def read_chunks_from_file(file_name, chunk_size):
+    with open(file_name, "r") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
 def skip_until_nondigit(text, position):
     while True:
         position = advance(text, position)
@@ -60,6 +230,20 @@ def skip_until_nonalpha(text, position):
         if position < 0 or (position >= 0 and not text[position] in ALPHABET):
             return position
 
+def skip_code_block(text, position):
+    """Steps from an opening quote line to the end of its closing quote
+    line, the newline before the next line or -1 at the end of text"""
+    position = skip_until_newline(text, position)
+    while position >= 0:
+        position = advance(text, position)
+        if position < 0:
+            break
+        if text.startswith('"""', position):
+            return skip_until_newline(text, position)
+        if text[position] != '\n':
+            position = skip_until_newline(text, position)
+    raise LexerError(message="Code block not correctly ended")
+
 def advance(text, position):
     if position + 1 > len(text) - 1:
         return -1
@@ -75,7 +259,52 @@ def next_char(text, position):
         return None
     return text[position + 1]
 
+@instrument.timed('lexer.tokenize')
 def tokenize(text):
+    """Splits text into tokens using a single pass of the master pattern"""
+    tokens = []
+    append = tokens.append
+    character_class = CHARACTER_CLASS.get
+
+    for value in token_pattern.findall(text):
+        token_type = character_class(value[0])
+        if token_type is WORD:
+            if len(value) < 2:
+                token_type = LETTER_UPPER if value.isupper() else LETTER_LOWER
+        elif token_type is None:
+            token_type = quoted_token(value) if value[0] == '"' else TEXT
+        elif token_type is SYMBOL and value[:2] == '--':
+            # tokens.append(Token(COMMENT, value))
+            continue
+        append(Token(token_type, value))
+
+    tokens.append(Token(ENDMARKER, ''))
+    instrument.count('tokens', len(tokens))
+    return tokens
+
+def tokenize_chunks(chunks):
+    """Lazily tokenizes text arriving in chunks. Only code blocks span a
+    newline so each chunk is cut after its last newline, or before a code
+    block that is not closed yet, and the rest is carried over"""
+    remainder = ''
+    for chunk in chunks:
+        text = remainder + chunk
+        cut = text.rfind('\n') + 1
+        fences = [match.start() for match in code_fence.finditer(text, 0, cut)]
+        if len(fences) % 2:
+            cut = fences[-1]
+        if not cut:
+            remainder = text
+            continue
+        remainder = text[cut:]
+        tokens = tokenize(text[:cut])
+        tokens.pop()
+        yield from tokens
+    yield from tokenize(remainder)
+
+def tokenize_by_char(text):
+    """Original character stepping tokenizer, taught about code blocks.
+    Kept as the reference implementation for parity tests and benchmarks"""
     position = 0
     tokens = []
 
@@ -119,7 +348,7 @@ def tokenize(text):
             continue
 
         # newlines
-        if char == '\n':
+        if char in '\r\n':
             # tokens.append(Token(NEWLINE, char))
             position = advance(text, position)
             continue
@@ -145,9 +374,20 @@ def tokenize(text):
             tokens.append(Token(token_type, characters))
             continue
 
-        e = LexerError(message=f"Invalid character: {char}")
-        print(e.message)
-        exit(1)
+        # code blocks, from a quote line to the closing quote line
+        if text.startswith('"""', position) and (position == 0 or text[position - 1] == '\n'):
+            start = position
+            position = skip_code_block(text, position)
+            tokens.append(Token(CODE, text[start:position if position >= 0 else len(text)]))
+            continue
+
+        # any other character is text, non ascii characters in runs
+        start = position
+        position = advance(text, position)
+        if ord(char) > 127:
+            while position >= 0 and ord(text[position]) > 127:
+                position = advance(text, position)
+        tokens.append(Token(TEXT, text[start:position]))
 
     tokens.append(Token(ENDMARKER, ''))
     return tokens
@@ -156,7 +396,11 @@ def tokenize(text):
 @click.argument('file_name_in', default=file_name_in)
 def main(file_name_in):
     text = read_from_file(file_name_in)
-    tokens = tokenize(text)
+    try:
+        tokens = tokenize(text)
+    except LexerError as e:
+        print(e.message)
+        exit(1)
     for t in tokens:
         print(t)
 
@@ -0,0 +1,66 @@
+# manifest.py
+
+"""Source file and original number of every question in a merged set"""
+
+import fnmatch
+import json
+import os
+from functools import partial
+
+from config import sidecar_file_name
+
+manifest_file_name = partial(sidecar_file_name, extension='manifest')
+
+def topic_name(source):
+    """A topic is the source file name without directory or extension"""
+    return os.path.splitext(os.path.basename(source))[0]
+
+class Manifest:
+    """Columns of source index and original number, one row per question in
+    merged order. Source file names are stored once"""
+
+    def __init__(self, sources=None, source=None, number=None):
+        self.sources = sources or []
+        self.source = source or []
+        self.number = number or []
+
+    def __repr__(self):
+        return f"Manifest({len(self.sources)} sources, {len(self)} questions)"
+
+    def __len__(self):
+        return len(self.source)
+
+    def add(self, source, count):
+        """Records count questions read in order from source"""
+        index = len(self.sources)
+        self.sources.append(source)
+        self.source.extend([index] * count)
+        self.number.extend(range(1, count + 1))
+
+    def origin(self, index):
+        """Returns (source file, original number) of a merged question"""
+        return self.sources[self.source[index]], self.number[index]
+
+    def topics(self):
+        return [topic_name(source) for source in self.sources]
+
+    def select(self, patterns):
+        """Returns merged indices of questions whose topic matches any of the
+        patterns. Patterns may use shell wildcards"""
+        matched = {
+            i for i, topic in enumerate(self.topics())
+                if any(fnmatch.fnmatchcase(topic, pattern) for pattern in patterns)
+        }
+        return [i for i, source in enumerate(self.source) if source in matched]
+
+    def save(self, file_name):
+        data = {'sources': self.sources, 'source': self.source, 'number': self.number}
+        temporary = f"{file_name}.tmp"
+        with open(temporary, "w") as f:
+            f.write(json.dumps(data, separators=(',', ':')))
+        os.replace(temporary, file_name)
+
+def load_manifest(file_name):
+    with open(file_name, "r") as f:
+        data = json.load(f)
+    return Manifest(data['sources'], data['source'], data['number'])
@@ -3,16 +3,18 @@
 """Holds Question and Answer classes"""
 
 import random
+from array import array
 from dataclasses import dataclass, field
 
+import instrument
 
-class Question:
 
-    question_id = 1
+class Question:
 
-    def __init__(self, data, shuffle):
-        self.question_id = Question.question_id
-        Question.question_id += 1
+    def __init__(self, data, shuffle, question_id):
+        # ids come from the question's position in the bank rather than a
+        # class level counter so they stay the same in every process
+        self.question_id = question_id
         self.question = data['question_before']
         self.code = data['question_code']
         self.additional = data['question_after']
@@ -34,6 +36,142 @@ class Question:
     def __repr__(self):
         return f"Question({self.question_id})"
 
+class QuestionBank:
+    """Columnar storage for a question set. Text lives once in a shared string
+    table, every other column is an array of integers:
+
+        question_ids         : question number in the source set
+        question, additional : string ids per question
+        code_start           : offsets into code_lines, one extra at the end
+        code_lines           : string ids of every code line
+        answer_start         : offsets into answer_text, one extra at the end
+        answer_text          : string ids of every answer
+        correct              : bitmask of correct answers per question
+    """
+
+    def __init__(self):
+        self.strings = []
+        self.string_ids = {}
+        self.question_ids = array('I')
+        self.question = array('I')
+        self.additional = array('I')
+        self.code_start = array('I', [0])
+        self.code_lines = array('I')
+        self.answer_start = array('I', [0])
+        self.answer_text = array('I')
+        self.correct = array('Q')
+
+    @classmethod
+    @instrument.timed('model.QuestionBank')
+    def from_serialized(cls, data, indices=None):
+        """Builds a bank from serialized questions. When indices are given
+        only those entries are added, keeping their original numbers"""
+        bank = cls()
+        if indices is None:
+            for d in data:
+                bank.add(d)
+        else:
+            for index in indices:
+                bank.add(data[index], question_id=index + 1)
+        return bank
+
+    def __repr__(self):
+        return f"QuestionBank({len(self)})"
+
+    def __len__(self):
+        return len(self.question)
+
+    def intern(self, text):
+        string_id = self.string_ids.get(text)
+        if string_id is None:
+            string_id = self.string_ids[text] = len(self.strings)
+            self.strings.append(text)
+        return string_id
+
+    def add(self, data, question_id=None):
+        """Appends a serialized question and returns its row. The question
+        number defaults to the row position"""
+        intern = self.intern
+        if question_id is None:
+            question_id = len(self.question_ids) + 1
+        self.question_ids.append(question_id)
+        self.question.append(intern(data['question_before']))
+        self.additional.append(intern(data['question_after']))
+        self.code_lines.extend(intern(line) for line in data['question_code'])
+        self.code_start.append(len(self.code_lines))
+        mask = 0
+        for i, (text, correct) in enumerate(data['answers']):
+            self.answer_text.append(intern(text))
+            if correct:
+                mask |= 1 << i
+        self.answer_start.append(len(self.answer_text))
+        self.correct.append(mask)
+        return len(self.question) - 1
+
+    def view(self, row, shuffle=False):
+        return QuestionView(self, row, shuffle)
+
+class QuestionView:
+    """Lightweight replacement for Question reading from a QuestionBank row.
+    Only the answered state and the shuffled answer order are stored"""
+
+    __slots__ = ('bank', 'row', 'question_id', 'order', 'answered', 'correct',
+                 'response', 'answered_at')
+
+    def __init__(self, bank, row, shuffle=False):
+        self.bank = bank
+        self.row = row
+        self.question_id = bank.question_ids[row]
+        count = bank.answer_start[row + 1] - bank.answer_start[row]
+        self.order = list(range(count))
+        if shuffle:
+            random.shuffle(self.order)
+        self.answered = False
+        self.correct = False
+        self.response = None
+        self.answered_at = None
+
+    def __repr__(self):
+        return f"QuestionView({self.question_id})"
+
+    @property
+    def question(self):
+        return self.bank.strings[self.bank.question[self.row]]
+
+    @property
+    def additional(self):
+        return self.bank.strings[self.bank.additional[self.row]]
+
+    @property
+    def code(self):
+        bank = self.bank
+        start, end = bank.code_start[self.row], bank.code_start[self.row + 1]
+        return [bank.strings[i] for i in bank.code_lines[start:end]]
+
+    @property
+    def answers(self):
+        """all possible answers to the question"""
+        bank = self.bank
+        start = bank.answer_start[self.row]
+        return [bank.strings[bank.answer_text[start + i]] for i in self.order]
+
+    @property
+    def source_answers(self):
+        """all possible answers in the order of the question set"""
+        bank = self.bank
+        start, end = bank.answer_start[self.row], bank.answer_start[self.row + 1]
+        return [bank.strings[i] for i in bank.answer_text[start:end]]
+
+    @property
+    def answer(self):
+        """only the correct answer combination to the question"""
+        mask = self.bank.correct[self.row]
+        return [i for i, j in enumerate(self.order) if mask >> j & 1]
+
+    def unshuffled(self, answer):
+        """Maps answer letters as shown to the letters of the source order"""
+        return ''.join(chr(97 + self.order[ord(ch) - 97]) for ch in answer)
+
 @dataclass
 class AnswerBuilder:
     text: str
@@ -63,6 +201,7 @@ class QuestionBuilder:
         for i, answer in enumerate(self.answers):
             answer.correct = i in answers
 
+    @instrument.timed('model.serialize')
     def serialize(self):
         return {
             'question_before': ' '.join(self.before),
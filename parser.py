@@ -1,13 +1,22 @@
 # parser.py
+import re
+from bisect import bisect_left
+
 import click
 
+import instrument
+from config import lex_chunk_size as chunk_size
 from config import lex_test_file_name_in as file_name_in
-from error import ParserError
-from lexer import (COMMA, COMMENT, ENDMARKER, LETTER_LOWER, LETTER_UPPER,
-                   LPAREN, NUMBER, PERIOD, RPAREN, SYMBOL, SYMBOLS, TAB, WORD,
-                   read_from_file, tokenize)
+from error import LexerError, ParserError
+from lexer import (CODE, COMMA, COMMENT, ENDMARKER, LETTER_LOWER,
+                   LETTER_UPPER, LPAREN, NUMBER, PERIOD, RPAREN, SYMBOL,
+                   SYMBOLS, TAB, TEXT, WORD, TokenBuffer,
+                   read_chunks_from_file, read_from_file, tokenize,
+                   tokenize_buffer, tokenize_chunks, tokenize_mapped_file)
+from model import AnswerBuilder as Answer
 from model import (AnswerStatement, ChoiceId, ChoiceStatement, QuestionBlock,
                    QuestionId, QuestionStatement)
+from model import QuestionBuilder as Question
 
 QUESTION_ID = 'question_id' # [1-9]*[1-9]+
 SENTENCE = 'sentence'
@@ -15,11 +24,85 @@ ANSWER_CHOICE = 'answer_choice' # [a-e].
 ANSWER = 'answer' # A.
 ANSWER_SET = 'answer_set' # \(([a-e],)*[a-e]+)
 
+# lines that end the free text of a question: a choice, the answer line or
+# the opening line of a code block
+structure_pattern = re.compile(rb'^(?:(?:\t|    )[a-e]\.|A\.|""")', re.MULTILINE)
+
+
+class TokenStream:
+    """Index cursor over tokens. Tokens are never removed from the front of
+    the list while parsing so lookahead and backtracking are constant time.
+
+    A list or TokenBuffer is used as is. Any other iterable is read lazily
+    into a buffer and commit() discards the tokens behind the cursor, keeping
+    memory bounded by the size of a single question"""
+    def __init__(self, tokens):
+        if isinstance(tokens, (list, TokenBuffer)):
+            self.tokens = tokens
+            self.source = None
+        else:
+            self.tokens = []
+            self.source = iter(tokens)
+        self.start = 0 # absolute position of self.tokens[0]
+        self.position = 0
+
+    def __repr__(self):
+        return f"TokenStream({self.position}/{self.start + len(self.tokens)})"
+
+    def __len__(self):
+        return self.start + len(self.tokens) - self.position
+
+    def __bool__(self):
+        return self.fill(0)
+
+    def fill(self, offset):
+        """Reads from the source until the token at offset is buffered"""
+        index = self.position - self.start + offset
+        while index >= len(self.tokens) and self.source:
+            token = next(self.source, None)
+            if token is None:
+                self.source = None
+            else:
+                self.tokens.append(token)
+        return index < len(self.tokens)
+
+    def peek(self, offset=0):
+        """Returns a token without consuming it. Reading past the end returns
+        the last token which is always the endmarker"""
+        index = self.position - self.start + offset
+        if index < len(self.tokens) or self.fill(offset):
+            return self.tokens[index]
+        return self.tokens[-1]
+
+    def next(self):
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def mark(self):
+        return self.position
+
+    def reset(self, position):
+        self.position = position
+
+    def commit(self):
+        """Drops buffered tokens behind the cursor when reading lazily. Marks
+        taken before a commit can no longer be reset to. The last token is
+        always kept so peeking past the end still returns the endmarker"""
+        if not self.source:
+            return
+        index = min(self.position - self.start, len(self.tokens) - 1)
+        if index > 0:
+            del self.tokens[:index]
+            self.start += index
+
+    def lookahead(self, count):
+        self.fill(count - 1)
+        index = self.position - self.start
+        return self.tokens[index:index + count]
 
-def error(message):
-    e = ParserError(message=message)
-    print(e.message)
-    exit(1)
+def error(message, token=None):
+    raise ParserError(message=message, token=token)
 
 def check_if_number(token):
     if token.type is not NUMBER:
@@ -37,19 +120,19 @@ def check_if_letter(token):
     if not is_letter(token):
         error(f"Expected letter token for choice id. Got: {token}")
 
-def consume(source, tokens, token_type):
-    token = tokens.pop(0)
+def consume(source, stream, token_type):
+    token = stream.next()
     if token.type == token_type:
         return token
-    error(f"""
+    error(token=token, message=f"""
   {__file__}, {source}()
     Got: {token.type} ({repr(token.value)})
         
 ParserError: unexepected token. Expected: {token_type} token"""[1:])
 
-def question_id(tokens):
-    number = consume('question_id', tokens, NUMBER)
-    symbol = consume('question_id', tokens, PERIOD)
+def question_id(stream):
+    number = consume('question_id', stream, NUMBER)
+    symbol = consume('question_id', stream, PERIOD)
     return QuestionId(number, symbol)
 
 def is_number(token):
@@ -59,7 +142,7 @@ def is_period(token):
     return token.type == PERIOD and token.value == '.'
 
 def is_symbol(token):
-    return token.type in (SYMBOL, PERIOD, LPAREN, RPAREN, COMMA)
+    return token.type in (SYMBOL, PERIOD, LPAREN, RPAREN, COMMA, TEXT)
 
 def is_letter(token):
     return is_upper_letter(token) or is_lower_letter(token)
@@ -82,89 +165,216 @@ def is_capitalized_word(token):
 def is_lowercase_word(token):
     return token.type == WORD and not str.isupper(token.value[0])
 
-def sentence_statement(tokens):
-    token = tokens.pop(0)
+def sentence_statement(stream):
     sentence = []
-    while token:
+    while True:
+        token = stream.peek()
         if not (is_symbol(token) or is_word(token) or is_number(token)):
             break
-        if is_answer_letter and is_period(tokens[0]):
+        following = stream.peek(1)
+        if is_answer_letter and is_period(following):
             break
         sentence.append(token.value)
-        word_to_word = is_word(token) and is_word(tokens[0])
-        symbol_to_word = not is_period(token) and is_lowercase_word(tokens[0])
+        word_to_word = is_word(token) and is_word(following)
+        symbol_to_word = not is_period(token) and is_lowercase_word(following)
         if word_to_word or symbol_to_word:
             sentence.append(' ')
-        token = tokens.pop(0)
-    tokens.insert(0, token)
+        stream.next()
     return "".join(sentence)
 
-def question_statement_pre(tokens):
-    return QuestionStatement(sentence_statement(tokens))
+def question_statement_pre(stream):
+    return QuestionStatement(sentence_statement(stream))
 
-def choice_id(tokens):
-    tabchr = consume('choice_id', tokens, TAB)
-    letter = consume('choice_id', tokens, LETTER_LOWER)
-    symbol = consume('choice_id', tokens, PERIOD)
+def choice_id(stream):
+    tabchr = consume('choice_id', stream, TAB)
+    letter = consume('choice_id', stream, LETTER_LOWER)
+    symbol = consume('choice_id', stream, PERIOD)
     return QuestionId(letter, symbol)
 
-def question_choices(tokens):
+def question_choices(stream):
     choices = []
     while True:
-        cid = choice_id(tokens)
-        sentence = sentence_statement(tokens)
+        cid = choice_id(stream)
+        sentence = sentence_statement(stream)
         choices.append(ChoiceStatement(cid, sentence))
-        if tokens[0].type != TAB:
+        if stream.peek().type != TAB:
             break
     return choices
 
-def question_answer(tokens):
+def question_answer(stream):
     answers = []
-    letter = consume('question_answer', tokens, LETTER_UPPER)
-    symbol = consume('question_answer', tokens, PERIOD)
-    lparen = consume('question_answer', tokens, LPAREN)
+    letter = consume('question_answer', stream, LETTER_UPPER)
+    symbol = consume('question_answer', stream, PERIOD)
+    lparen = consume('question_answer', stream, LPAREN)
     while True:
-        letter = consume('question_answer', tokens, LETTER_LOWER)
+        letter = consume('question_answer', stream, LETTER_LOWER)
         answers.append(letter.value)
-        if tokens[0].type == COMMA:
-            symbol = consume('question_answer', tokens, COMMA)
+        if stream.peek().type == COMMA:
+            symbol = consume('question_answer', stream, COMMA)
             continue
-        if tokens[0].type == RPAREN:
-            rparen = consume('question_answer', tokens, RPAREN)
+        if stream.peek().type == RPAREN:
+            rparen = consume('question_answer', stream, RPAREN)
             break
     return AnswerStatement(answers)
 
-def question_block(tokens):
-    qid = question_id(tokens)
-    statement = question_statement_pre(tokens)
-    choices = question_choices(tokens)
-    answer = question_answer(tokens)
+def question_block(stream):
+    qid = question_id(stream)
+    statement = question_statement_pre(stream)
+    choices = question_choices(stream)
+    answer = question_answer(stream)
     return QuestionBlock(qid, statement, choices, answer)
 
-def questions(tokens):
-    blocks = []
-    while tokens:
-        block = question_block(tokens)
-        blocks.append(block)
-        if tokens[0].type == ENDMARKER:
+def iter_questions(stream):
+    """Yields each question block as soon as its answer statement is parsed"""
+    while stream:
+        yield question_block(stream)
+        stream.commit()
+        if stream.peek().type == ENDMARKER:
             break
-    return blocks
 
+def questions(stream):
+    return list(iter_questions(stream))
+
+def line_end(data, offset):
+    """Offset of the newline ending the line at offset or the end of data"""
+    end = data.find(b'\n', offset)
+    return len(data) if end < 0 else end
+
+def skip_line(stream, end):
+    """Moves the cursor to the first token at or after offset end"""
+    stream.position = bisect_left(stream.tokens.starts, end, stream.position)
+
+def free_text(stream, data, start, end, container):
+    """Adds the lines between two structural lines to container the way the
+    reader does. Comments and empty lines are skipped, indented lines are
+    stripped and any other line is an error"""
+    for line in data[start:end].split(b'\n')[:-1]:
+        if line and not line.startswith(b'--'):
+            if not line.startswith((b'\t', b'   ')):
+                skip_line(stream, start)
+                error("Expected an indented line, a choice or the answer",
+                      token=stream.next())
+            container.append(line.decode().strip())
+        start += len(line) + 1
+
+def code_lines(block):
+    """Code lines of a code block token without the quote lines, comments
+    and empty lines. One leading tab or three spaces are removed"""
+    lines = []
+    for line in block.split('\n')[1:-1]:
+        if line.startswith('--') or not line:
+            continue
+        if line.startswith('\t'):
+            line = line[1:]
+        elif line.startswith('   '):
+            line = line[3:]
+        lines.append(line)
+    return lines
+
+def question_record(stream, data):
+    """Parses one question from a stream over a TokenBuffer of data and
+    returns it serialized exactly like reader.py. Tokens give the structure:
+    question id, code blocks, choice ids and the answer set. Free text is
+    sliced out of the source between them so it keeps its spacing and
+    symbols"""
+    tokens = stream.tokens
+    ends = tokens.ends
+    question = Question()
+    start = tokens.starts[stream.position]
+    if data.rfind(b'\n', 0, start) + 1 != start:
+        error("Expected a question number at the start of a line", token=stream.next())
+    question_id(stream)
+    end = line_end(data, ends[stream.position - 1])
+    question.before.append(data[ends[stream.position - 1]:end].decode().strip())
+    container = question.before
+    while True:
+        found = structure_pattern.search(data, end)
+        if found is None:
+            error("Question not ended with an answer line", token=stream.peek())
+        free_text(stream, data, end + 1, found.start(), container)
+        skip_line(stream, found.start())
+        token = stream.peek()
+        if token.type == CODE:
+            stream.next()
+            question.code.extend(code_lines(token.value))
+            container = question.after
+            end = ends[stream.position - 1]
+        elif token.type == LETTER_UPPER:
+            answer = question_answer(stream)
+            question.set_correct_answers(",".join(answer.answers))
+            # anything after the answer set is ignored like the reader does
+            skip_line(stream, line_end(data, ends[stream.position - 1]))
+            return question.serialize()
+        else:
+            if token.type == TAB:
+                stream.next()
+            consume('question_record', stream, LETTER_LOWER)
+            consume('question_record', stream, PERIOD)
+            end = line_end(data, ends[stream.position - 1])
+            question.answers.append(Answer(text=data[ends[stream.position - 1]:end].decode().strip()))
+            skip_line(stream, end)
+
+def iter_records(tokens):
+    """Yields every question of a TokenBuffer serialized like reader.py"""
+    stream = TokenStream(tokens)
+    while stream.peek().type != ENDMARKER:
+        yield question_record(stream, tokens.data)
+
+def read_records(data, questions):
+    """Appends every question of the source bytes to questions. Errors are
+    raised with the offset of the token they were found at"""
+    tokens = tokenize_buffer(data)
+    stream = TokenStream(tokens)
+    try:
+        while stream.peek().type != ENDMARKER:
+            questions.append(question_record(stream, data))
+    except ParserError as e:
+        e.offset = tokens.starts[max(stream.position - 1, 0)]
+        raise
+
+@instrument.timed('parser.parse')
 def parse(tokens):
-    blocks = questions(tokens)
+    stream = tokens if isinstance(tokens, TokenStream) else TokenStream(tokens)
+    blocks = questions(stream)
+    instrument.count('questions', len(blocks))
     for b in blocks:
         print(b.preview())
-    if tokens[0].type != ENDMARKER:
-        print(tokens[0:4], len(tokens))
+    if stream.peek().type != ENDMARKER:
+        print(stream.lookahead(4), len(stream))
         error("Not all tokens consumed")
     return blocks
 
+def parse_file_lazily(file_name, chunk_size=chunk_size):
+    """Generator mode: reads the file in chunks, tokenizes on demand and
+    yields each question block as soon as it is complete"""
+    stream = TokenStream(tokenize_chunks(read_chunks_from_file(file_name, chunk_size)))
+    yield from iter_questions(stream)
+    if stream.peek().type != ENDMARKER:
+        print(stream.lookahead(4))
+        error("Not all tokens consumed")
+
+def parse_file_mapped(file_name):
+    """Parses a memory mapped file through a compact TokenBuffer"""
+    with tokenize_mapped_file(file_name) as tokens:
+        return parse(tokens)
+
 @click.command()
 @click.argument('file_name_in', default=file_name_in)
-def main(file_name_in):
-    text = read_from_file(file_name_in)
-    tokens = tokenize(text)
-    blocks = parse(tokens)
+@click.option('--stream', is_flag=True, help="parse lazily while reading")
+@click.option('--mmap', 'mapped', is_flag=True,
+              help="parse a memory mapped file from a compact token buffer")
+def main(file_name_in, stream, mapped):
+    try:
+        if stream:
+            for block in parse_file_lazily(file_name_in):
+                print(block.preview())
+        elif mapped:
+            parse_file_mapped(file_name_in)
+        else:
+            parse(tokenize(read_from_file(file_name_in)))
+    except (LexerError, ParserError) as e:
+        print(e.message)
+        exit(1)
 
 if __name__ == "__main__":
 	main()
@@ -4,58 +4,82 @@
    
 import json
 import os
-import pprint
 import random
+import shutil
 import sys
-import textwrap
-from dataclasses import dataclass
+import time
 
-from config import file_name_json, height_min, width_min
-from model import Question
+# keep module level imports light, startup time is paid on every run. the
+# results store (sqlite3), grading, the server and the click based tools
+# are imported by the functions that use them
+import instrument
+from bank import JsonLines, is_bank_file, is_json_lines_file, open_bank
+from config import (file_name_json, height_min, schedule_new_questions,
+                    server_host, server_port, width_min)
+from layout import LayoutCache, layout_file_name
+from model import QuestionBank
 
 # input argument flags with defaults and variables
-numbers = []
+selection = ''
 verbose = False
 show_answer = False
 save_results = False
 print_results = True
 shuffle_answers = False
 shuffle_questions = False
+cache_layouts = False
+profile = None
+cprofile = None
+connect = None
+topics = []
+match = None
+schedule_new = None
 
 # ui constants
-width, height = os.get_terminal_size()
-y_offset = ((height - height_min) // 2) if height > height_min else 0
-x_offset = ((width - width_min) // 2) if width > width_min else 0
-x_indent = " " * x_offset
 code_indent = " " * 4
 indent = "  "
 
-def results_to_file(text) -> None:
-    """saves results to a file named 'attempt_x'"""
-    attempts = get_next_attempt_value_from_directory_names()
-    filename = f"attempt_{attempts}.txt"
-    with open(filename, "w") as f:
-        f.write(text)
-    print(f"Written results to: {filename}")
+# ui variables. set from the terminal size by update_terminal before each
+# question so a resized terminal is picked up
+width, height = width_min, height_min
+y_offset = 0
+x_offset = 0
+x_indent = ""
+
+# wrapped question layouts, replaced by a persistent cache with -L
+layouts = LayoutCache()
+
+def update_terminal():
+    global width, height, y_offset, x_offset, x_indent
+    width, height = shutil.get_terminal_size((width_min, height_min))
+    y_offset = ((height - height_min) // 2) if height > height_min else 0
+    x_offset = ((width - width_min) // 2) if width > width_min else 0
+    x_indent = " " * x_offset
+
+def results_to_store(questions, total, file_name, started) -> None:
+    """saves the attempt and every answer to the results store"""
+    import sqlite3
+    from results import ResultsStore, results_file_name
+    answers = [
+        (q.question_id, q.response, q.correct, q.answered_at)
+            for q in questions if q.answered
+        ]
+    store_file = results_file_name(file_name)
+    try:
+        with ResultsStore(store_file) as store:
+            attempt = store.record_attempt(file_name, started, answers, total)
+    except sqlite3.Error as e:
+        print(f"Could not save results in {store_file}: {e}")
+        return
+    print(f"Saved results as attempt {attempt} in {store_file}")
 
 def results_to_term(text) -> None:
     clear_screen()
     print(text)
 
-def get_next_attempt_value_from_directory_names() -> int:
-    """Returns next integer value to use in filename when saving results"""
-    for _, _, files in os.walk("."):
-        current = 1 # default attempt name value begins at 1
-        for filename in files:
-            if filename.startswith("attempt"):
-                # removes "attempt_" and ".txt"
-                attempt = int(filename.split("_")[1].split(".")[0])
-                if attempt > current:
-                    current = attempt + 1
-        return current
-
-def output_results(questions):
-    """Handles output to either terminal or file"""
+def output_results(questions, total=None, file_name=None, started=None):
+    """Handles output to either terminal or results store. Total defaults to
+    the number of questions passed in"""
     global print_results, save_results, verbose
 
     # nothing to output
@@ -69,7 +93,22 @@ def output_results(questions):
     # calculate results
     correct = sum(int(q.answered and q.correct) for q in questions)
     answered = sum(int(q.answered) for q in questions)
-    total = len(questions)
+    if total is None:
+        total = len(questions)
+    incorrect = [q.question_id for q in questions if q.answered and not q.correct]
+    text = results_text(correct, answered, total, incorrect)
+
+    # determine if results are saved && printed, just saved or just printed
+    # something will always print regardless of to term or to file
+    if save_results and print_results:
+        results_to_term(text)
+        results_to_store(questions, total, file_name, started)
+    elif save_results:
+        results_to_store(questions, total, file_name, started)
+    else:
+        results_to_term(text)
+
+def results_text(correct, answered, total, incorrect):
     lines = []
 
     # verbose currently only adds the question id that was incorrectly answered
@@ -82,52 +121,30 @@ def output_results(questions):
     # output more information if flag is set
     if verbose:
         lines.append("Incorrect:")
-        lines.append('\n'.join(
-            str(q.question_id)
-                for q in questions 
-                    if q.answered and not q.correct)
-            )
+        lines.append('\n'.join(str(question_id) for question_id in incorrect))
 
-    text = "\n".join(lines)
-
-    # determine if results are saved && printed, just saved or just printed
-    # something will always print regardless of to term or to file
-    if save_results and print_results:
-        results_to_file(text)
-        results_to_term(text)
-    elif save_results:
-        results_to_file(text)
-    else:
-        results_to_term(text)
+    return "\n".join(lines)
 
+@instrument.timed('quizzer.render')
 def ask_question(question, question_id):
     qid = question.question_id if not shuffle_questions else question_id
+    layout = layouts.get(question, width - len(x_indent) - len(code_indent))
+
     # append the question text
     text = [
         f"{x_indent}{str(qid) + '.' if i < 1 else indent} {s}"
-            for i, s in enumerate(
-                textwrap.wrap(question.question, 80 - len(indent) - 2)
-            )
+            for i, s in enumerate(layout['question'])
         ]
     text.append('')
     
     # if any code blocks are included in the question
     if question.code:
-        for line in question.code:
-            text += [
-                f"{x_indent}{code_indent} {s}"
-                    for s in textwrap.wrap(line, width - len(x_indent) - len(code_indent))
-                ]
+        text += [f"{x_indent}{code_indent} {s}" for s in layout['code']]
         text.append('')
     
     # any text after the code block is now added
     if question.additional:
-        text += [
-            f"{x_indent}{indent} {s}"
-                for i, s in enumerate(
-                    textwrap.wrap(question.additional, 80 - len(indent) - 2)
-                )
-            ]
+        text += [f"{x_indent}{indent} {s}" for s in layout['additional']]
         text.append('')
 
     # TODO: randomize answers within a question
@@ -137,8 +154,8 @@ def ask_question(question, question_id):
     # question.answer = question.answers.indexof(answer)
     
     # append the answers text
-    for i, answer in enumerate(question.answers):
-        for j, s in enumerate(textwrap.wrap(answer, 80 - len(indent * 2) - 4)):
+    for i, answer in enumerate(layout['answers']):
+        for j, s in enumerate(answer):
             answer_char = chr(i + 97) + '.' if j < 1 else '  '
             text.append(f"{x_indent}{indent * 2}{answer_char} {s}")
         text.append('')
@@ -148,25 +165,25 @@ def ask_question(question, question_id):
 def print_message(message):
     print(f"{x_indent}{message}")
 
-def check_valid_input(question, answer):
+def check_valid_input(question, answer, report=print_message):
     # creates a set ranging from a->d|e depending on number of possible answers
     answers = ''.join(chr(97+i) for i in range(len(question.answers)))
     # checks if all input characters are in the answer set
     valid = all(ch in answers for ch in answer)
     if not valid:
-        print_message(f"Invalid input: must be in [{', '.join(answers)}]")
+        report(f"Invalid input: must be in [{', '.join(answers)}]")
     return valid
 
-def check_valid_answer_length(question, answer):
+def check_valid_answer_length(question, answer, report=print_message):
     valid = len(answer) == len(question.answer)
     if not valid:
-        print_message(f"Choose {len(question.answer)} answer{'s' if len(question.answer) > 1 else ''}")
+        report(f"Choose {len(question.answer)} answer{'s' if len(question.answer) > 1 else ''}")
     return valid
 
-def check_valid_answer_choices(question, answer):
+def check_valid_answer_choices(question, answer, report=print_message):
     valid = len(set(answer)) == len(question.answer)
     if not valid:
-        print_message(f"Choose {len(question.answer)} unique answers")
+        report(f"Choose {len(question.answer)} unique answers")
     return valid
 
 def check_correct_answer(question, answer):
@@ -195,16 +212,38 @@ def usage():
 py questions.py -[afosvS]
     -s : shuffle question set
     -o : shuffle answer set per question
-    -S : save results to file <attempt_#>.txt
+    -S : save results to a .results store next to the question set
     -v : verbose results
     -a : answers shown on incorrectly answered questions
-    -f : file path to question set"""[1:]
+    -f : file path to question set, a .json set is parsed whole while
+         jsonl and compiled bank sets only decode the questions asked
+    -L : keep wrapped question layouts in a file next to the question set
+    --questions=1-50,75 : only ask the selected question numbers
+    --topic=name[,name] : only ask questions merged from matching source files
+    --match="expr" : only ask questions matching a search of a set compiled with --index
+        words all match, "exact phrase", prefix*, -excluded, OR between alternatives
+    --schedule[=new] : spaced repetition, due reviews first then up to new unseen questions
+    --profile : print a timing breakdown
+    --profile-output=file.json : save the timing breakdown as json
+    --cprofile=file : dump cProfile stats
+    --connect[=host:port] : take the quiz from a running quizzer server
+        only -s, -o, -a, -v and --questions apply to a remote session
+
+py questions.py serve [--file=filename] [--host=host] [--port=port]
+    keeps the question set loaded so --connect sessions start instantly
+
+py questions.py stats [--file=filename]
+    score trend and most often missed questions from saved results
+
+py questions.py grade [--file=filename] [--report=report.csv] sheets...
+    grades csv or jsonl answer sheets in bulk"""[1:]
     )
 
 def handle_args(args):
     """parse input arguments"""
     global shuffle_questions, shuffle_answers, show_answer, verbose
-    global save_results, numbers
+    global save_results, selection, cache_layouts, profile, cprofile, connect
+    global topics, match, schedule_new
     args = {'file_name_json': file_name_json }
     if sys.argv:
         for arg in sys.argv[1:]:
@@ -222,54 +261,407 @@ def handle_args(args):
                 show_answer = True
             elif arg == '-v':
                 verbose = True
+            elif arg == '-L':
+                cache_layouts = True
+            elif arg == '--profile':
+                profile = '-'
+            elif arg.startswith('--profile-output='):
+                profile = arg.split('=')[1]
+            elif arg.startswith('--cprofile='):
+                cprofile = arg.split('=')[1]
+            elif arg == '--schedule':
+                schedule_new = schedule_new_questions
+            elif arg.startswith('--schedule='):
+                try:
+                    schedule_new = int(arg.split('=')[1])
+                except ValueError:
+                    print(f"Invalid number of new questions: {arg}")
+                    exit(1)
+            elif arg.startswith('--match='):
+                match = arg.partition('=')[2]
+            elif arg.startswith('--topic='):
+                topics = [t for t in arg.split('=')[1].split(',') if t]
+            elif arg == '--connect':
+                connect = f"{server_host}:{server_port}"
+            elif arg.startswith('--connect='):
+                connect = arg.split('=')[1]
             elif arg == '-S':
                 save_results = True
                 print(save_results)
             elif arg.startswith('--questions='):
-                # TODO: select questions from a set of numbers
-                # and use it to test
-                _, number = arg.split('=')
-                numbers = number.split(' ')
+                # select questions from a set of numbers and ranges. they
+                # are expanded once the size of the set is known
+                _, selection = arg.split('=')
+                try:
+                    list(selection_ranges(selection))
+                except ValueError as e:
+                    print(e)
+                    exit(1)
             else:
                 print(f"{arg} does not match any flags")
     return args
 
+def selection_ranges(text):
+    """Yields the first and last number of every part of a selection"""
+    for part in text.replace(' ', ',').split(','):
+        if not part:
+            continue
+        first, _, last = part.partition('-')
+        if not first.isdigit() or (last and not last.isdigit()):
+            raise ValueError(f"Invalid question selection: {part}")
+        first = int(first)
+        last = int(last) if last else first
+        if first < 1 or last < first:
+            raise ValueError(f"Invalid question range: {part}")
+        yield first, last
+
+def parse_selection(text, count=None):
+    """Converts a selection like '1-50,75,100-120' into question numbers in
+    the order given. Numbers selected more than once are asked once. With
+    the size of the set given ranges are clamped to it before they are
+    expanded"""
+    selected = {}
+    for first, last in selection_ranges(text):
+        if count is not None:
+            if first > count:
+                raise ValueError(f"Question {first} not in set of {count} questions")
+            last = min(last, count)
+        selected.update(dict.fromkeys(range(first, last + 1)))
+    return list(selected)
+
+@instrument.timed('quizzer.load')
+def open_questions(file_name):
+    """Returns the serialized questions of a json set, or a compiled bank or
+    json lines set memory mapped so its offset index decodes a question only
+    when it is accessed. A json set is always parsed whole"""
+    if is_bank_file(file_name):
+        return open_bank(file_name)
+    if is_json_lines_file(file_name):
+        return JsonLines(file_name)
+    with open(file_name, "r") as f:
+        return json.load(f)
+
+def load_questions(file_name, indices=None):
+    """Returns the question set. Json files are loaded into a columnar
+    QuestionBank holding only the selected indices when given. Compiled banks
+    are returned memory mapped"""
+    data = open_questions(file_name)
+    if not isinstance(data, list):
+        return data
+    check_selection(indices, len(data))
+    return QuestionBank.from_serialized(data, indices)
+
+def select_topics(file_name, topics, numbers):
+    """Returns the question numbers from the selected topics of a merged set,
+    keeping only the given numbers when any were selected"""
+    from manifest import load_manifest, manifest_file_name
+    try:
+        manifest = load_manifest(manifest_file_name(file_name))
+    except (OSError, ValueError, KeyError):
+        print(f"No manifest for {file_name}, compile a directory or glob to filter by topic")
+        exit(1)
+    selected = [index + 1 for index in manifest.select(topics)]
+    if numbers:
+        selected = set(selected)
+        selected = [number for number in numbers if number in selected]
+    if not selected:
+        print(f"No questions for topic {', '.join(topics)} in {', '.join(manifest.topics())}")
+        exit(1)
+    return selected
+
+def select_matches(file_name, query, numbers):
+    """Returns the question numbers matching a search query through the index
+    built at compile time, keeping only the given numbers when any were
+    selected"""
+    from search import SearchError, index_file_name, open_index
+    try:
+        with open_index(index_file_name(file_name)) as index:
+            selected = [i + 1 for i in index.search(query)]
+    except OSError:
+        print(f"No search index for {file_name}, compile it with --index to use --match")
+        exit(1)
+    except SearchError as e:
+        print(e)
+        exit(1)
+    if numbers:
+        selected = set(selected)
+        selected = [number for number in numbers if number in selected]
+    if not selected:
+        print(f"No questions match {query}")
+        exit(1)
+    return selected
+
+def load_review_schedule(file_name, count):
+    """Loads the review state of a question set. The first time a set is
+    scheduled its state is rebuilt from the answers in the results store"""
+    from scheduler import ScheduleError, load_schedule, schedule_file_name
+    schedule_file = schedule_file_name(file_name)
+    try:
+        schedule = load_schedule(schedule_file, count)
+    except ScheduleError as e:
+        print(e)
+        exit(1)
+    import sqlite3
+    from results import ResultsStore, results_file_name
+    file_name = os.path.abspath(file_name)
+    store_file = results_file_name(file_name)
+    if not os.path.exists(schedule_file) and os.path.exists(store_file):
+        try:
+            with ResultsStore(store_file) as store:
+                history = store.answer_history(file_name)
+                schedule.replay(
+                    (question - 1, correct, answered_at)
+                        for question, correct, answered_at in history
+                            if question <= count)
+        except sqlite3.Error as e:
+            print(f"Could not read results in {store_file}: {e}")
+    return schedule
+
+def scheduled_positions(schedule, new_limit):
+    """Yields the most urgent question each time one is needed, so answers
+    recorded in between change what is asked next"""
+    new_left = new_limit
+    while True:
+        position = schedule.next_question(time.time(), new_left)
+        if position is None:
+            return
+        if schedule.slot[position] < 0:
+            new_left -= 1
+        yield position
+
+def check_selection(indices, count):
+    if indices and max(indices) >= count:
+        print(f"Question {max(indices) + 1} not in set of {count} questions")
+        exit(1)
+
+def shuffled_indices(count):
+    """Returns a random permutation of range(count)"""
+    return random.sample(range(count), count)
+
+def print_stats(file_name, limit=10):
+    """Answers history queries from the results store"""
+    import sqlite3
+    from results import ResultsStore, results_file_name
+    store_file = results_file_name(file_name)
+    if not os.path.exists(store_file):
+        print(f"No saved results for {file_name}")
+        return
+    try:
+        with ResultsStore(store_file) as store:
+            trend = store.score_trend(file_name, limit)
+            worst = store.worst_questions(file_name, limit)
+    except sqlite3.Error as e:
+        print(f"Could not read results in {store_file}: {e}")
+        exit(1)
+    if not trend:
+        print(f"No saved results for {file_name}")
+        return
+    print(f"Score trend ({file_name}):")
+    for attempt, finished, correct, answered, total in trend:
+        date = time.strftime("%Y-%m-%d %H:%M", time.localtime(finished))
+        print(f"  attempt {attempt} {date}  {correct}/{total} ({correct/total * 100:.2f}%)")
+    if worst:
+        print("Most missed:")
+        for question, incorrect, asked in worst:
+            print(f"  question {question}: {incorrect}/{asked} incorrect")
+
 def main():
+    started = time.time()
+    if sys.argv[1:2] == ['grade']:
+        from grade import main as grade_main
+        grade_main(args=sys.argv[2:], prog_name="quizzer.py grade")
+        return
+    if sys.argv[1:2] == ['stats']:
+        del sys.argv[1]
+        args = handle_args(sys.argv)
+        print_stats(os.path.abspath(args['file_name_json']))
+        return
+    if sys.argv[1:2] == ['serve']:
+        from server import main as server_main
+        server_main(args=sys.argv[2:], prog_name="quizzer.py serve")
+        return
+
     # global variables set before parsing questions    
     args = handle_args(sys.argv)
+    if connect:
+        remote_quiz(connect)
+        return
+    with instrument.profiled(profile, cprofile):
+        quiz(args, started)
 
-    # load the question set
-    with open(args['file_name_json'], "r") as f:
-        data = json.load(f)
-    
-    # convert them to question objects
-    questions = [Question(d, shuffle=shuffle_answers) for d in data]
-    
-    # randomize order of questions
-    if shuffle_questions:
-        random.shuffle(questions)
-    
-    # render each question and wait for input from user
-    for i, q in enumerate(questions):
-        clear_screen()
-        ask_question(q, i+1)
-        answer = handle_input(q)
-        if not answer:
-            break
-        q.answered = True
-        if check_correct_answer(q, answer):
-            q.correct = True
-        if show_answer:
-            if q.correct:
-                print(f"{x_indent}Correct")
+def remote_question(data):
+    """Wraps a question sent by the server so it renders and validates like a
+    local one. The server keeps the answer key, only the count is known"""
+    from types import SimpleNamespace
+    return SimpleNamespace(
+        question_id=data['id'],
+        question=data['question'],
+        code=data['code'],
+        additional=data['additional'],
+        answers=data['answers'],
+        source_answers=data['answers'],
+        order=list(range(len(data['answers']))),
+        answer=range(data['choose'])
+    )
+
+def remote_quiz(address):
+    """Thin client for a quizzer server. The question set is already loaded
+    by the server so the session starts without parsing or hydrating. Only
+    -s, -o, --questions, -a and -v are handled in a remote session"""
+    local = [flag for flag, used in (
+        ('-S', save_results), ('-L', cache_layouts), ('--topic', topics),
+        ('--match', match), ('--schedule', schedule_new is not None)) if used]
+    if local:
+        print(f"{', '.join(local)} can not be used with --connect, "
+              "the server holds the question set")
+        exit(1)
+
+    import socket
+    host, _, port = address.rpartition(':')
+    try:
+        connection = socket.create_connection((host or server_host, int(port)))
+    except (OSError, ValueError) as e:
+        print(f"Could not connect to {address}: {e}")
+        exit(1)
+
+    with connection, connection.makefile('rw') as f:
+        def request(line):
+            f.write(line + "\n")
+            f.flush()
+            return json.loads(f.readline())
+
+        flags = ['-s'] * shuffle_questions + ['-o'] * shuffle_answers
+        if selection:
+            flags.append(f"--questions={selection.replace(' ', ',')}")
+        reply = request(' '.join(['start'] + flags))
+        if 'error' in reply:
+            print(reply['error'])
+            exit(1)
+
+        data = reply['question']
+        while data:
+            q = remote_question(data)
+            update_terminal()
+            clear_screen()
+            ask_question(q, data['number'])
+            answer = handle_input(q)
+            if not answer:
+                break
+            reply = request(f"answer {answer}")
+            if 'error' in reply:
+                print_message(reply['error'])
+                continue
+            if show_answer:
+                if reply['correct']:
+                    print(f"{x_indent}Correct")
+                else:
+                    print(f"{x_indent}Incorrect: {', '.join(reply['answer'])}")
+                try:
+                    input(f"{x_indent}Press <enter> to continue...")
+                except KeyboardInterrupt:
+                    break
+            data = reply['question']
+
+        results = request("quit")['results']
+    if results['answered']:
+        results_to_term(results_text(**results))
+
+def quiz(args, started):
+    global layouts
+    if cache_layouts:
+        layouts = LayoutCache(layout_file_name(args['file_name_json']))
+
+    if schedule_new is not None and (selection or topics or match or shuffle_questions):
+        print("--schedule picks the questions itself, it can not be combined with "
+              "-s, --questions, --topic or --match")
+        exit(1)
+
+    # load the question set, only the selected questions are hydrated
+    data = open_questions(args['file_name_json'])
+    try:
+        selected = parse_selection(selection, len(data))
+    except ValueError as e:
+        print(e)
+        exit(1)
+    if topics:
+        selected = select_topics(args['file_name_json'], topics, selected)
+    if match:
+        selected = select_matches(args['file_name_json'], match, selected)
+    indices = [number - 1 for number in selected] or None
+
+    # json sets are hydrated up front so every row is asked. compiled bank
+    # entries are added to a bank only once they are asked
+    if isinstance(data, list):
+        check_selection(indices, len(data))
+        data = QuestionBank.from_serialized(data, indices)
+        bank, positions = data, range(len(data))
+    else:
+        check_selection(indices, len(data))
+        bank, positions = QuestionBank(), indices or range(len(data))
+
+    # randomize order of questions or follow the review schedule
+    schedule = None
+    if schedule_new is not None:
+        schedule = load_review_schedule(args['file_name_json'], len(positions))
+        order = scheduled_positions(schedule, schedule_new)
+    elif shuffle_questions:
+        order = (positions[i] for i in shuffled_indices(len(positions)))
+    else:
+        order = positions
+    questions = []
+
+    # render each question and wait for input from user. the schedule is
+    # saved and a mapped bank closed even when the quiz is left with exit
+    try:
+        for i, position in enumerate(order):
+            if bank is data:
+                row = position
             else:
-                print(f"{x_indent}Incorrect: {', '.join(chr(97+a) for a in q.answer)}")
-            try:
-                input(f"{x_indent}Press <enter> to continue...")
-            except KeyboardInterrupt:
+                with instrument.span('model.QuestionBank.add'):
+                    row = bank.add(data[position], question_id=position + 1)
+            instrument.count('questions')
+            q = bank.view(row, shuffle=shuffle_answers)
+            questions.append(q)
+            update_terminal()
+            clear_screen()
+            ask_question(q, i+1)
+            answer = handle_input(q)
+            if not answer:
                 break
+            q.answered = True
+            q.response = q.unshuffled(answer)
+            q.answered_at = time.time()
+            if check_correct_answer(q, answer):
+                q.correct = True
+            if schedule is not None:
+                schedule.record(position, q.correct, q.answered_at)
+            if show_answer:
+                if q.correct:
+                    print(f"{x_indent}Correct")
+                else:
+                    print(f"{x_indent}Incorrect: {', '.join(chr(97+a) for a in q.answer)}")
+                try:
+                    input(f"{x_indent}Press <enter> to continue...")
+                except KeyboardInterrupt:
+                    break
+    finally:
+        if schedule is not None:
+            save_schedule(schedule, args['file_name_json'])
+        if bank is not data:
+            data.close()
+
+    with instrument.span('quizzer.layout_save'):
+        layouts.save()
+    output_results(questions, total=len(questions) if schedule is not None else len(positions),
+                   file_name=os.path.abspath(args['file_name_json']),
+                   started=started)
 
-    output_results(questions)
+def save_schedule(schedule, file_name):
+    from scheduler import schedule_file_name
+    schedule.save(schedule_file_name(file_name))
+    due = schedule.next_due()
+    if due is not None:
+        print(f"{x_indent}Next review due {time.strftime('%Y-%m-%d %H:%M', time.localtime(due))}")
 
 if __name__ == "__main__":
 	main()
@@ -2,14 +2,26 @@
 
 """Read question set file and convert into json"""
 
+import contextlib
+import glob
 import json
+import multiprocessing
 import os
 import re
 import sys
 from dataclasses import dataclass
 
 import click
-from config import file_name_json, file_name_text
+import instrument
+from bank import write_bank, write_payloads
+from cache import BlockCache, block_hash, cache_file_name
+from config import (cache_max_entries, dedupe_threshold, file_name_json,
+                    file_name_text, reader_read_size)
+from config import reader_chunk_lines as chunk_lines
+from error import LexerError, ParserError
+from manifest import Manifest, manifest_file_name
+from parser import read_records
+from search import IndexBuilder, index_file_name
 from model import AnswerBuilder as Answer
 from model import QuestionBuilder as Question
 
@@ -25,7 +37,21 @@ answers_pattern = "^(\t|    )[a-e]\.(.*)$"
 answers = re.compile(answers_pattern)
 answer_pattern = "^(A\..*)\((.*)\).*$"
 answer = re.compile(answer_pattern)
-width, _ = os.get_terminal_size()
+
+# single pattern deciding the kind of a line from its first characters. The
+# kinds start with different characters apart from choices, which are tried
+# before other indented lines. What a kind means depends on the reader state
+line_pattern = re.compile(
+    r'(?P<comment>--)'
+    r'|(?P<empty>\n\Z)'
+    r'|(?P<question_start>\d*\.)'
+    r'|(?P<code_fence>""")'
+    r'|(?P<choice>(?:\t|    )[a-e]\.)'
+    r'|(?P<answer>A\..*\((?P<correct>.*)\))'
+    r'|(?P<indented>\t|   )')
+
+# bump whenever parsing or serialization changes so cached blocks are dropped
+READER_VERSION = 2
 
 def debug(*args):
     if __debug__:
@@ -48,111 +74,630 @@ def print_reader_error(question, question_number, line_number, line, in_code, co
     Expected: {expected}
   inside code block: {in_code}
   code block added: {code_added}
-Reader Error: """[1:])
+Reader Error: """[1:], file=sys.stderr)
 
+def print_grammar_error(question_number, line_number, line, message):
+    print(f"""
+  Question {question_number + 1}, line {line_number + 1}
+    Got: {repr(line if len(line) < 72 else line[:69] + '...')}
+    {message}
+Grammar Error: """[1:], file=sys.stderr)
+
+def open_file(file_name, mode):
+    """Opens a file where '-' stands for stdin or stdout"""
+    if file_name == '-':
+        stream = sys.stdin if 'r' in mode else sys.stdout
+        return contextlib.nullcontext(stream)
+    return open(file_name, mode)
+
+def report(message):
+    print(message, file=sys.stderr)
+
+@instrument.timed('reader.write_json')
 def create_json_file(questions, file_name):
     if not questions:
         return
-    with open(file_name, "w") as f:
+    with open_file(file_name, "w") as f:
         json.dump(questions, f, indent=2)
-    print(f"Created {len(questions)} questions in {file_name}")
+    instrument.count('questions', len(questions))
+    report(f"Created {len(questions)} questions in {file_name}")
+
+@instrument.timed('reader.write_jsonl')
+def create_jsonl_file(questions, file_name):
+    """Writes one question per line as soon as each one is complete"""
+    written = 0
+    with open_file(file_name, "w") as f:
+        for question in questions:
+            f.write(json.dumps(question))
+            f.write("\n")
+            f.flush()
+            written += 1
+    instrument.count('questions', written)
+    report(f"Created {written} questions in {file_name}")
 
+@instrument.timed('reader.write_bank')
+def create_bank_file(questions, file_name, compressed=False):
+    """Writes a compiled bank with an offset index for random access"""
+    written = write_bank(questions, file_name, compressed=compressed)
+    instrument.count('questions', written)
+    report(f"Created {written} questions in {file_name}")
+
+@instrument.timed('reader.write_fragments')
+def write_fragments(fragments, file_name, output_format, compressed=False):
+    """Writes questions already serialized for the output format without
+    decoding them. Gives the same file as the writer of the format"""
+    if output_format == 'bank':
+        written = write_payloads((fragment.encode() for fragment in fragments),
+                                 file_name, compressed)
+    elif output_format == 'jsonl':
+        written = 0
+        with open_file(file_name, "w") as f:
+            for fragment in fragments:
+                f.write(fragment + "\n")
+                written += 1
+    else:
+        fragments = list(fragments)
+        if not fragments:
+            return
+        with open_file(file_name, "w") as f:
+            f.write("[\n" + ",\n".join(fragments) + "\n]")
+        written = len(fragments)
+    instrument.count('questions', written)
+    report(f"Created {written} questions in {file_name}")
+
+@instrument.timed('reader.read')
 def read_lines_from_file(file_name):
     with open(file_name, "r") as f:
         lines = f.readlines()
+    instrument.count('lines', len(lines))
     return lines
 
-def parse_text(lines):
-    code_block_start = False
-    code_block_added = False
-    questions = []
-    question = Question()
-    last_matched_pattern = None
-    
-    for l, line in enumerate(lines):
+def iter_lines_from_file(file_name, read_size=reader_read_size):
+    """Lazily yields the lines of a file, read in batches that are timed
+    like read_lines_from_file"""
+    with open_file(file_name, "r") as f:
+        while True:
+            with instrument.span('reader.read'):
+                lines = f.readlines(read_size)
+            if not lines:
+                return
+            instrument.count('lines', len(lines))
+            yield from lines
+
+def code_text(line):
+    """A code line without one leading tab or three spaces, like codeline"""
+    if line.startswith('\t'):
+        line = line[1:]
+    elif line.startswith('   '):
+        line = line[3:]
+    return line[:-1] if line.endswith('\n') else line
+
+class Reader:
+    """Resumable version of the parse_text state machine. Lines are fed one
+    at a time and each question is returned serialized as soon as its answer
+    line is read. Each line is classified with one match of line_pattern.
+    After an unmatched line the error is printed, unless the reader is
+    quiet, and the reader stops accepting input"""
+
+    def __init__(self, line_number=0, count=0, quiet=False):
+        self.code_block_start = False
+        self.code_block_added = False
+        self.question = Question()
+        self.last_matched_pattern = None
+        self.line_number = line_number
+        self.count = count
+        self.quiet = quiet
+        self.stopped = False
+
+    def feed(self, line):
+        if self.stopped:
+            return None
+        l = self.line_number
+        self.line_number += 1
+        question = self.question
+        matched = line_pattern.match(line)
+        kind = matched.lastgroup if matched else None
+
+        # disregard comments or empty lines
+        if kind == 'comment' or kind == 'empty':
+            return None
+
+        # inside a code block every line is code until the closing quotes
+        if self.code_block_start:
+            if kind == 'code_fence':
+                self.last_matched_pattern = codeblock.pattern
+                self.code_block_start = False
+                self.code_block_added = True
+            else:
+                self.last_matched_pattern = codeline.pattern
+                question.code.append(code_text(line))
+            return None
+
+        if kind == 'question_start' and question.empty:
+            self.last_matched_pattern = question_start.pattern
+            question.before.append(line[matched.end():].strip())
+            return None
+
+        # choices are only accepted once the question has started, before
+        # that they continue the question statement
+        if kind == 'choice' and question.before:
+            self.last_matched_pattern = answers.pattern
+            question.answers.append(Answer(text=line[matched.end():].strip()))
+            return None
+
+        if kind == 'code_fence':
+            self.last_matched_pattern = codeblock.pattern
+            self.code_block_start = True
+            return None
+
+        if kind == 'choice' or kind == 'indented':
+            self.last_matched_pattern = question_continue.pattern
+            container = question.before if not self.code_block_added else question.after
+            container.append(line.strip())
+            return None
+
+        # correct answer statement - reached end of question. serialize it
+        if kind == 'answer':
+            self.last_matched_pattern = answer.pattern
+            question.set_correct_answers(matched.group('correct').strip())
+            serialized_question = question.serialize()
+            question.clear()
+            self.count += 1
+            self.code_block_added = False
+            return serialized_question
+
+        # the cascade tried every pattern and ended on the code line pattern
+        # which matches anything
+        self.last_matched_pattern = codeline.pattern
+        if not self.quiet:
+            print_reader_error(
+                question, 
+                self.count, 
+                l, 
+                line, 
+                self.code_block_start, 
+                self.code_block_added, 
+                self.last_matched_pattern)
+        self.stopped = True
+        return None
+
+class CascadeReader(Reader):
+    """Original reader trying each line pattern in turn. Kept as the
+    reference implementation for parity tests and benchmarks"""
+
+    def feed(self, line):
+        if self.stopped:
+            return None
+        l = self.line_number
+        self.line_number += 1
+        question = self.question
+
         # disregard comments or empty lines
         if line.startswith("--") or line == "\n":
-            continue
+            return None
 
         # beginning question statement
         matched = question_start.match(line)
         if matched:
-            last_matched_pattern = question_start.pattern
-            if question.empty and not code_block_start:
+            self.last_matched_pattern = question_start.pattern
+            if question.empty and not self.code_block_start:
                 question.before.append(matched.groups()[1].strip())
-                continue
+                return None
 
-        # possible answers statement
+        # possible answers statement - only once the question has started and
+        # outside of code blocks
         matched = answers.match(line)
-        if matched and not question.before:
-            last_matched_pattern = answers.pattern
+        if matched and question.before and not self.code_block_start:
+            self.last_matched_pattern = answers.pattern
             question.answers.append(Answer(text=matched.groups()[1].strip()))
-            continue
+            return None
 
         # possible code block
         matched = codeblock.match(line)
         if matched:
-            last_matched_pattern = codeblock.pattern
-            if code_block_start:
-                code_block_start = False
-                code_block_added = True
+            self.last_matched_pattern = codeblock.pattern
+            if self.code_block_start:
+                self.code_block_start = False
+                self.code_block_added = True
             else:
-                code_block_start = True
-            continue
+                self.code_block_start = True
+            return None
 
         # possible code line - only valid if code_block_start is on
         matched = codeline.match(line)
         if matched:
-            last_matched_pattern = codeline.pattern
-            if code_block_start:
+            self.last_matched_pattern = codeline.pattern
+            if self.code_block_start:
                 question.code.append(matched.groups()[1])
-                continue
-        
+                return None
+
         # continuing question statement - set last so any lines that don't 
         # match are sent here
         matched = question_continue.match(line)
         if matched:
-            last_matched_pattern = question_continue.pattern
-            container = question.before if not code_block_added else question.after
+            self.last_matched_pattern = question_continue.pattern
+            container = question.before if not self.code_block_added else question.after
             container.append(matched.group().strip())
-            continue
-        
+            return None
+
         # correct answer statement - reached end of question. serialize it
         matched = answer.match(line)
         if matched:
-            last_matched_pattern = answer.pattern
+            self.last_matched_pattern = answer.pattern
             # somehow code block was entered but not correctly escaped
-            if code_block_start:
+            if self.code_block_start:
                 raise ValueError(f"{l+1}: Code block not correctly ended")
             question.set_correct_answers(matched.groups()[1].strip())
 
             # serialize question
             serialized_question = question.serialize()
-            questions.append(serialized_question)
             question.clear()
-            code_block_start = False
-            code_block_added = False
-            continue
-
-        print_reader_error(
-            question, 
-            len(questions), 
-            l, 
-            line, 
-            code_block_start, 
-            code_block_added, 
-            last_matched_pattern)
-        break
-
-    return questions
+            self.count += 1
+            self.code_block_start = False
+            self.code_block_added = False
+            return serialized_question
+
+        if not self.quiet:
+            print_reader_error(
+                question, 
+                self.count, 
+                l, 
+                line, 
+                self.code_block_start, 
+                self.code_block_added, 
+                self.last_matched_pattern)
+        self.stopped = True
+        return None
+
+def read_questions(lines):
+    """Yields serialized questions while lines are consumed lazily"""
+    reader = Reader()
+    for line in lines:
+        question = reader.feed(line)
+        if question is not None:
+            yield question
+        elif reader.stopped:
+            break
+
+@instrument.timed('reader.parse_text')
+def parse_text(lines):
+    return list(read_questions(lines))
+
+def split_blocks(lines):
+    """Yields (line number, lines) for each question. A block ends with its
+    answer line, answer lines inside code blocks are ignored. Lines after the
+    last answer form a final block"""
+    block = []
+    start = 0
+    in_code = False
+    for l, line in enumerate(lines):
+        block.append(line)
+        if line.startswith('"""'):
+            in_code = not in_code
+        elif not in_code and line.startswith('A.') and answer.match(line):
+            yield start, block
+            block = []
+            start = l + 1
+    if block:
+        yield start, block
+
+def parse_block(lines, start=0, count=0, quiet=False):
+    """Parses the lines of a block or chunk starting at line start. Returns
+    the questions read and whether the reader stopped on an error"""
+    reader = Reader(line_number=start, count=count, quiet=quiet)
+    questions = []
+    for line in lines:
+        question = reader.feed(line)
+        if question is not None:
+            questions.append(question)
+        elif reader.stopped:
+            break
+    return questions, reader.stopped
+
+def parse_block_grammar(lines, start=0, count=0, quiet=False):
+    """Same as parse_block through the lexer and parser. On a lexer error the
+    lines before the invalid character are still parsed so both engines
+    return the same questions before an error"""
+    data = "".join(lines).encode()
+    questions = []
+    try:
+        read_records(data, questions)
+        return questions, False
+    except LexerError as e:
+        failed = e
+        try:
+            read_records(data[:data.rfind(b'\n', 0, e.offset) + 1], questions)
+        except (LexerError, ParserError):
+            pass
+    except ParserError as e:
+        failed = e
+    if not quiet:
+        line = data.count(b'\n', 0, failed.offset)
+        text = data.split(b'\n', line + 1)[line].decode()
+        print_grammar_error(count + len(questions), start + line, text,
+                            failed.message.strip().splitlines()[-1])
+    return questions, True
+
+# parse_block and parse_block_grammar by --engine name
+engines = {
+    'regex': parse_block,
+    'grammar': parse_block_grammar
+}
+
+def read_questions_grammar(lines):
+    questions, _ = parse_block_grammar(list(lines))
+    yield from questions
+
+def serialize(question, output_format):
+    """Json fragment of a question as the writer of the output format puts
+    it in the file"""
+    if output_format == 'jsonl':
+        return json.dumps(question)
+    if output_format == 'bank':
+        return json.dumps(question, separators=(',', ':'))
+    # an element of a json array dumped with indent=2
+    return "  " + json.dumps(question, indent=2).replace("\n", "\n  ")
+
+def read_fragments_cached(lines, cache, output_format='json', engine='regex'):
+    """Questions serialized for the output format where only blocks missing
+    from the cache are parsed. Both engines give the same questions so they
+    share entries"""
+    parse = engines[engine]
+    count = 0
+    for start, block in split_blocks(lines):
+        key = f"{output_format}:{block_hash(block)}"
+        fragments = cache.get(key)
+        if fragments is None:
+            questions, stopped = parse(block, start, count)
+            fragments = [serialize(question, output_format) for question in questions]
+            if stopped:
+                yield from fragments
+                return
+            cache.put(key, fragments)
+        count += len(fragments)
+        yield from fragments
+
+def read_questions_cached(lines, cache, engine='regex'):
+    """Same output as read_questions through the cache"""
+    for fragment in read_fragments_cached(lines, cache, 'jsonl', engine):
+        yield json.loads(fragment)
+
+def split_chunks(lines, size):
+    """Groups whole question blocks into chunks of at least size lines"""
+    chunk = []
+    start = 0
+    for block_start, block in split_blocks(lines):
+        if not chunk:
+            start = block_start
+        chunk.extend(block)
+        if len(chunk) >= size:
+            yield start, chunk
+            chunk = []
+    if chunk:
+        yield start, chunk
+
+def parse_chunk(job):
+    """Worker entry point. Errors are not reported here since the question
+    number depends on earlier chunks, instead the failed chunk is returned
+    so it can be parsed again in order"""
+    engine, (start, lines) = job
+    questions, stopped = engines[engine](lines, start, quiet=True)
+    return questions, (start, lines) if stopped else None
+
+def read_questions_parallel(lines, jobs, chunk_size=chunk_lines, engine='regex'):
+    """Same output as read_questions with chunks parsed in a process pool
+    and merged back in their original order"""
+    count = 0
+    chunks = ((engine, chunk) for chunk in split_chunks(lines, chunk_size))
+    with multiprocessing.Pool(jobs) as pool:
+        for questions, failed in pool.imap(parse_chunk, chunks):
+            if failed:
+                # parse again in order so the error is printed
+                start, chunk = failed
+                questions, _ = engines[engine](chunk, start, count)
+                yield from questions
+                return
+            count += len(questions)
+            yield from questions
+
+def expand_inputs(file_name_in):
+    """Returns the question files a directory or glob stands for, sorted by
+    name. Directories are searched recursively for .txt files. Returns None
+    for a plain file name"""
+    if os.path.isdir(file_name_in):
+        pattern = os.path.join(file_name_in, "**", "*.txt")
+    elif glob.has_magic(file_name_in):
+        pattern = file_name_in
+    else:
+        return None
+    return sorted(f for f in glob.glob(pattern, recursive=True) if os.path.isfile(f))
+
+def parse_source(job):
+    """Worker entry point parsing one whole question file"""
+    engine, file_name = job
+    return engines[engine](read_lines_from_file(file_name), quiet=True)
+
+def read_sources(file_names, jobs, manifest, engine='regex'):
+    """Yields the questions of every file in order while the files are parsed
+    concurrently. Each file is added to the manifest once it is merged"""
+    pool = multiprocessing.Pool(jobs) if jobs > 1 else None
+    try:
+        sources = [(engine, file_name) for file_name in file_names]
+        results = pool.imap(parse_source, sources) if pool else map(parse_source, sources)
+        for file_name, (questions, stopped) in zip(file_names, results):
+            if stopped:
+                # parse again in order so the error is printed
+                report(f"{file_name}:")
+                questions, _ = engines[engine](read_lines_from_file(file_name))
+            manifest.add(file_name, len(questions))
+            yield from questions
+    finally:
+        if pool:
+            pool.terminate()
+
+def write_questions(questions, file_name_out, output_format, compress):
+    if output_format == 'jsonl':
+        create_jsonl_file(questions, file_name=file_name_out)
+    elif output_format == 'bank':
+        create_bank_file(questions, file_name_out, compressed=compress)
+    else:
+        create_json_file(list(questions), file_name=file_name_out)
+
+def start_dedupe(against):
+    # numpy is only imported when duplicates are checked
+    from dedupe import DedupeError, DuplicateCheck
+    try:
+        return DuplicateCheck(against, dedupe_threshold)
+    except OSError as e:
+        raise click.BadParameter(f"can not read {e.filename}: {e.strerror}",
+                                 param_hint="'--dedupe-against'")
+    except DedupeError as e:
+        raise click.BadParameter(str(e), param_hint="'--dedupe-against'")
+
+def report_duplicates(check, file_name_out, manifest=None):
+    """Reports every duplicate cluster with a new question and saves the
+    index of the new questions next to the output"""
+    def label(index):
+        origin = check.origin(index)
+        if origin is None:
+            index -= check.start
+            origin = manifest.origin(index) if manifest else (file_name_out, index + 1)
+        return "{}:{}".format(*origin)
+    clusters = check.clusters()
+    for group, exact in clusters:
+        kind = "Exact" if exact else "Near"
+        report(f"{kind} duplicates: {', '.join(label(index) for index in group)}")
+    report(f"Found {len(clusters)} duplicate cluster{'s' if len(clusters) != 1 else ''}")
+    if file_name_out != '-':
+        check.save(file_name_out)
+
+def save_index(builder, file_name_out):
+    if file_name_out != '-':
+        terms = builder.write(index_file_name(file_name_out))
+        report(f"Indexed {terms} terms in {index_file_name(file_name_out)}")
+
+def compile_files(file_names, file_name_out, output_format, compress, jobs, dedupe=None,
+                  index=False, engine='regex'):
+    """Merges many question files into one output with a manifest recording
+    the source file and original number of every question"""
+    manifest = Manifest()
+    questions = read_sources(file_names, jobs, manifest, engine)
+    questions = instrument.timed_iter('reader.parse', questions)
+    check = start_dedupe(dedupe) if dedupe is not None else None
+    if check is not None:
+        questions = check.added(questions)
+    builder = IndexBuilder() if index else None
+    if builder is not None:
+        questions = builder.added(questions)
+    write_questions(questions, file_name_out, output_format, compress)
+    if builder is not None:
+        save_index(builder, file_name_out)
+    if file_name_out != '-':
+        manifest.save(manifest_file_name(file_name_out))
+    report(f"Merged {len(file_names)} files")
+    if check is not None:
+        report_duplicates(check, file_name_out, manifest)
+
+def compile_file(file_name_in, file_name_out, output_format, compress, use_cache, jobs,
+                 dedupe=None, index=False, engine='regex'):
+    lines = iter_lines_from_file(file_name_in)
+    cache = None
+    if use_cache:
+        with instrument.span('cache.load'):
+            cache = BlockCache(cache_file_name(file_name_out), READER_VERSION,
+                               cache_max_entries)
+    if cache is not None and dedupe is None and not index:
+        # cached blocks are spliced into the output without decoding them
+        fragments = read_fragments_cached(lines, cache, output_format, engine)
+        fragments = instrument.timed_iter('reader.parse', fragments)
+        write_fragments(fragments, file_name_out, output_format, compress)
+    else:
+        if cache is not None:
+            questions = read_questions_cached(lines, cache, engine)
+        elif jobs > 1:
+            questions = read_questions_parallel(lines, jobs, engine=engine)
+        elif engine == 'grammar':
+            questions = read_questions_grammar(lines)
+        else:
+            questions = read_questions(lines)
+        questions = instrument.timed_iter('reader.parse', questions)
+        check = start_dedupe(dedupe) if dedupe is not None else None
+        if check is not None:
+            questions = check.added(questions)
+        builder = IndexBuilder() if index else None
+        if builder is not None:
+            questions = builder.added(questions)
+        write_questions(questions, file_name_out, output_format, compress)
+        if builder is not None:
+            save_index(builder, file_name_out)
+        if check is not None:
+            report_duplicates(check, file_name_out)
+    if cache is not None:
+        with instrument.span('cache.save'):
+            cache.save()
+        instrument.count('cache hits', cache.hits)
+        instrument.count('cache misses', cache.misses)
+        report(cache.summary())
 
 @click.command()
 @click.argument('file_name_in', default=file_name_text)
 @click.argument('file_name_out', default=file_name_json)
-def main(file_name_in, file_name_out):
-    lines = read_lines_from_file(file_name_in)
-    questions = parse_text(lines)
-    create_json_file(questions, file_name=file_name_out)
+@click.option('--format', 'output_format',
+              type=click.Choice(['json', 'jsonl', 'bank']), default='json',
+              help="json array, one question per line or compiled bank")
+@click.option('--compress', is_flag=True, help="compress compiled bank records")
+@click.option('--cache', 'use_cache', is_flag=True,
+              help="reuse questions parsed from unchanged blocks, cached next to the output")
+@click.option('--jobs', default=1, help="parse chunks or files in this many processes")
+@click.option('--profile', is_flag=True, help="print a timing breakdown")
+@click.option('--profile-output', default=None,
+              help="write the timing breakdown as json to a file instead")
+@click.option('--cprofile', default=None, help="dump cProfile stats to a file")
+@click.option('--watch', 'watching', is_flag=True,
+              help="rebuild the output whenever the input file changes")
+@click.option('--dedupe', 'dedupe', is_flag=True,
+              help="report exact and near duplicate questions")
+@click.option('--dedupe-against', 'against', multiple=True,
+              help="also check against a set compiled with --dedupe, given by "
+                   "its output file name (the X.dedupe index next to it is read)")
+@click.option('--index', is_flag=True,
+              help="build a full text index for quizzer.py --match")
+@click.option('--engine', type=click.Choice(list(engines)), default='regex',
+              help="parse with the line regexes or the lexer and parser")
+def main(file_name_in, file_name_out, output_format, compress, use_cache, jobs,
+         profile, profile_output, cprofile, watching, dedupe, against, index, engine):
+    if output_format == 'bank' and file_name_out == '-':
+        raise click.UsageError("compiled banks must be written to a file")
+    if use_cache and jobs > 1:
+        raise click.UsageError("--cache can not be used with --jobs")
+    if use_cache and file_name_out == '-':
+        raise click.UsageError("--cache needs an output file to store the cache next to")
+    if index and file_name_out == '-':
+        raise click.UsageError("--index needs an output file to store the index next to")
+    file_names = expand_inputs(file_name_in)
+    if use_cache and file_names is not None:
+        raise click.UsageError("--cache needs a single input file")
+    dedupe = list(against) if dedupe or against else None
+    if watching:
+        if file_names is not None or '-' in (file_name_in, file_name_out):
+            raise click.UsageError("--watch needs an input and an output file")
+        if dedupe is not None:
+            raise click.UsageError("--dedupe and --dedupe-against can not be used with --watch")
+        if index:
+            raise click.UsageError("--index can not be used with --watch")
+        from watch import watch
+        watch(file_name_in, file_name_out, output_format, compress, engine=engine)
+        return
+    if file_names == []:
+        raise click.UsageError(f"no question files found for {file_name_in}")
+    profile = profile_output or ('-' if profile else None)
+    with instrument.profiled(profile, cprofile):
+        if file_names is not None:
+            compile_files(file_names, file_name_out, output_format, compress, jobs,
+                          dedupe, index, engine)
+        else:
+            compile_file(file_name_in, file_name_out, output_format, compress,
+                         use_cache, jobs, dedupe, index, engine)
 
 if __name__ == "__main__":
 	main()
@@ -0,0 +1,101 @@
+# results.py
+
+"""Append only store of quiz attempts backed by sqlite"""
+
+import sqlite3
+import time
+from functools import partial
+
+from config import sidecar_file_name
+
+# every attempt on a question set is stored next to it
+results_file_name = partial(sidecar_file_name, extension='results')
+
+schema = """
+create table if not exists attempts (
+    id integer primary key,
+    file text not null,
+    started real not null,
+    finished real not null,
+    correct integer not null,
+    answered integer not null,
+    total integer not null
+);
+create table if not exists answers (
+    attempt integer not null references attempts(id),
+    question integer not null,
+    answer text not null,
+    correct integer not null,
+    answered_at real not null
+);
+create index if not exists attempts_by_file on attempts(file, id);
+create index if not exists answers_by_attempt on answers(attempt);
+create index if not exists answers_by_question on answers(question, attempt);
+"""
+
+class ResultsStore:
+    """Attempts and their per question answers. Rows are only ever inserted.
+    Attempt ids come from the integer primary key and answers are joined to
+    their attempt through an index on the attempt column"""
+
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self.connection = sqlite3.connect(file_name)
+        self.connection.executescript(schema)
+
+    def __repr__(self):
+        return f"ResultsStore({self.file_name})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def record_attempt(self, file_name, started, answers, total):
+        """Stores an attempt. Answers are (question id, answer, correct,
+        answered at) tuples. Returns the attempt id"""
+        correct = sum(1 for _, _, is_correct, _ in answers if is_correct)
+        with self.connection:
+            cursor = self.connection.execute(
+                "insert into attempts (file, started, finished, correct, answered, total)"
+                " values (?, ?, ?, ?, ?, ?)",
+                (file_name, started, time.time(), correct, len(answers), total))
+            attempt = cursor.lastrowid
+            self.connection.executemany(
+                "insert into answers values (?, ?, ?, ?, ?)",
+                ((attempt, question, answer, int(is_correct), answered_at)
+                    for question, answer, is_correct, answered_at in answers))
+        return attempt
+
+    def score_trend(self, file_name, limit=10):
+        """Returns (attempt, finished, correct, answered, total) for the most
+        recent attempts on a question set, oldest first"""
+        rows = self.connection.execute(
+            "select id, finished, correct, answered, total from attempts"
+            " where file = ? order by id desc limit ?", (file_name, limit))
+        return rows.fetchall()[::-1]
+
+    def answer_history(self, file_name):
+        """Yields (question, correct, answered_at) for every stored answer to
+        a question set in the order they were given"""
+        rows = self.connection.execute(
+            "select answers.question, answers.correct, answers.answered_at"
+            " from answers join attempts on attempts.id = answers.attempt"
+            " where attempts.file = ? order by answers.answered_at", (file_name,))
+        yield from rows
+
+    def worst_questions(self, file_name, limit=10):
+        """Returns (question, incorrect, asked) for the questions answered
+        incorrectly most often relative to how often they were asked"""
+        rows = self.connection.execute(
+            "select answers.question, sum(1 - answers.correct) as incorrect,"
+            " count(*) as asked from answers join attempts"
+            " on attempts.id = answers.attempt where attempts.file = ?"
+            " group by answers.question having incorrect > 0"
+            " order by 1.0 * incorrect / asked desc, asked desc, answers.question"
+            " limit ?", (file_name, limit))
+        return rows.fetchall()
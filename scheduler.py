@@ -0,0 +1,215 @@
+# scheduler.py
+
+"""Spaced repetition order for a question set
+
+Every question that was answered before has a review interval, an error
+rate (an exponential average of recent incorrect answers) and a priority:
+its due time, with the interval shortened by the error rate so questions
+answered wrong recently come back sooner. Reviewed questions sit in an
+indexed binary heap on that priority, so picking the next question is a
+look at the top and recording an answer is one O(log n) sift. Questions never answered are
+introduced in file order after every due review.
+
+The state is stored next to the question set as columns
+
+    header  : magic, version, question count, heap size, next new question
+    columns : priority (f64), interval (f32), error rate (f32), reviews
+              (u32), heap (u32 question per slot), heap slot per question
+              (i32, -1 when never answered)
+
+so loading and saving are plain array copies however large the set is.
+"""
+
+import os
+import struct
+from array import array
+from functools import partial
+
+from config import sidecar_file_name
+
+MAGIC = b'QSRS'
+VERSION = 1
+HEADER = struct.Struct('<4sHHQQQ')
+
+MINUTE = 60
+DAY = 24 * 60 * MINUTE
+
+class ScheduleError(Exception):
+    pass
+
+schedule_file_name = partial(sidecar_file_name, extension='schedule')
+
+class Schedule:
+    """Review state of every question with an indexed heap of the answered
+    ones keyed on priority"""
+
+    # share of the interval taken off by an error rate of 1
+    error_weight = 0.5
+    # interval after an incorrect answer and after the first correct one
+    relearn_interval = 10 * MINUTE
+    first_interval = DAY
+    # weight of the newest answer in the error rate
+    error_decay = 0.3
+
+    def __init__(self, count=0):
+        self.priority = array('d')
+        self.interval = array('f')
+        self.errors = array('f')
+        self.reviews = array('I')
+        self.heap = array('I')
+        self.slot = array('i')
+        self.next_new = 0
+        self.resize(count)
+
+    def __repr__(self):
+        return f"Schedule({len(self)} questions, {len(self.heap)} reviewed)"
+
+    def __len__(self):
+        return len(self.priority)
+
+    def resize(self, count):
+        """Questions appended to the set start out never answered"""
+        extra = count - len(self)
+        if extra > 0:
+            self.priority.extend(array('d', bytes(8 * extra)))
+            self.interval.extend(array('f', bytes(4 * extra)))
+            self.errors.extend(array('f', bytes(4 * extra)))
+            self.reviews.extend(array('I', bytes(4 * extra)))
+            self.slot.extend(array('i', [-1]) * extra)
+
+    def truncate(self, count):
+        """Questions removed from the end of the set are dropped"""
+        if count >= len(self):
+            return
+        for column in (self.priority, self.interval, self.errors, self.reviews, self.slot):
+            del column[count:]
+        self.heap = array('I', (question for question in self.heap if question < count))
+        for i, question in enumerate(self.heap):
+            self.slot[question] = i
+        for i in reversed(range(len(self.heap) // 2)):
+            self.sift_down(i)
+        self.next_new = min(self.next_new, count)
+
+    def swap(self, i, j):
+        heap, slot = self.heap, self.slot
+        heap[i], heap[j] = heap[j], heap[i]
+        slot[heap[i]] = i
+        slot[heap[j]] = j
+
+    def sift_up(self, i):
+        heap, priority = self.heap, self.priority
+        while i > 0:
+            parent = (i - 1) // 2
+            if priority[heap[parent]] <= priority[heap[i]]:
+                break
+            self.swap(i, parent)
+            i = parent
+
+    def sift_down(self, i):
+        heap, priority = self.heap, self.priority
+        size = len(heap)
+        while True:
+            smallest = i
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < size and priority[heap[child]] < priority[heap[smallest]]:
+                    smallest = child
+            if smallest == i:
+                return
+            self.swap(i, smallest)
+            i = smallest
+
+    def update(self, question):
+        """Restores the heap after the priority of a question changed,
+        adding the question when it was never answered"""
+        i = self.slot[question]
+        if i < 0:
+            self.heap.append(question)
+            i = self.slot[question] = len(self.heap) - 1
+        self.sift_up(i)
+        self.sift_down(self.slot[question])
+
+    def top(self):
+        """Returns the reviewed question with the lowest priority or None"""
+        return self.heap[0] if self.heap else None
+
+    def record(self, question, correct, answered_at):
+        """Updates the state of a question after it was answered"""
+        self.resize(question + 1)
+        errors = self.errors[question] * (1 - self.error_decay)
+        if not correct:
+            errors += self.error_decay
+            interval = self.relearn_interval
+        elif self.reviews[question] == 0 or self.interval[question] < self.first_interval:
+            interval = self.first_interval
+        else:
+            # questions that were often wrong grow their interval slower
+            interval = self.interval[question] * (2.5 - 1.2 * errors)
+        self.errors[question] = errors
+        self.interval[question] = interval
+        self.reviews[question] += 1
+        self.priority[question] = answered_at + interval * (1 - errors * self.error_weight)
+        self.update(question)
+
+    def replay(self, history):
+        """Builds state from (question, correct, answered at) answers ordered
+        by time, such as the results store history"""
+        for question, correct, answered_at in history:
+            self.record(question, correct, answered_at)
+
+    def next_question(self, now, new_left=0):
+        """Returns the next question to ask: the most urgent due review, else
+        the next new question when new_left allows, else None"""
+        question = self.top()
+        if question is not None and self.priority[question] <= now:
+            return question
+        # questions answered out of order are skipped when reached
+        while self.next_new < len(self) and self.slot[self.next_new] >= 0:
+            self.next_new += 1
+        if new_left > 0 and self.next_new < len(self):
+            return self.next_new
+        return None
+
+    def next_due(self):
+        """Time the most urgent review becomes due or None"""
+        question = self.top()
+        return self.priority[question] if question is not None else None
+
+    def save(self, file_name):
+        temporary = f"{file_name}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, 0, len(self), len(self.heap), self.next_new))
+            for column in (self.priority, self.interval, self.errors,
+                           self.reviews, self.heap, self.slot):
+                f.write(column.tobytes())
+        os.replace(temporary, file_name)
+
+def load_schedule(file_name, count):
+    """Loads a saved schedule for a set of count questions. A missing file
+    gives an empty schedule, questions past count are dropped"""
+    schedule = Schedule()
+    try:
+        with open(file_name, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        schedule.resize(count)
+        return schedule
+    if len(data) < HEADER.size:
+        raise ScheduleError(f"{file_name}: truncated schedule header")
+    magic, version, _, size, heap_size, next_new = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ScheduleError(f"{file_name}: not a schedule")
+    if version != VERSION:
+        raise ScheduleError(f"{file_name}: unsupported schedule version {version}")
+    offset = HEADER.size
+    for name, length in (('priority', size), ('interval', size), ('errors', size),
+                         ('reviews', size), ('heap', heap_size), ('slot', size)):
+        column = getattr(schedule, name)
+        end = offset + length * column.itemsize
+        if end > len(data):
+            raise ScheduleError(f"{file_name}: truncated schedule")
+        column.frombytes(data[offset:end])
+        offset = end
+    schedule.next_new = next_new
+    schedule.truncate(count)
+    schedule.resize(count)
+    return schedule
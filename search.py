@@ -0,0 +1,275 @@
+# search.py
+
+"""Inverted full text index over compiled questions
+
+Every question is reduced to its lower case words taken from the question
+text, the code lines and the answers. The index maps each word to the
+questions containing it together with the word positions, so phrases can
+be matched without reading the questions.
+
+    header    : magic, version, question count, term count, table offset
+    postings  : for each term a (question id, word position) u32 pair per
+                occurrence, ordered by question then position
+    entries   : for each term the postings offset and occurrence count
+    terms     : u32 offsets into the term text followed by the text, with
+                terms sorted so lookups are a binary search
+
+The file is memory mapped and only the postings of the queried terms are
+read, so a query costs milliseconds however large the bank is.
+
+Queries are words that must all match, "quoted phrases", prefix* words,
+-excluded words and OR between alternatives:
+
+    sort* "worst case" -bubble OR heap
+"""
+
+import mmap
+import re
+import struct
+from array import array
+from bisect import bisect_left
+from functools import partial
+
+from config import sidecar_file_name
+
+MAGIC = b'QIDX'
+VERSION = 1
+HEADER = struct.Struct('<4sHHQQQ')
+ENTRY = struct.Struct('<QI')
+OFFSET = struct.Struct('<I')
+
+word_pattern = re.compile(r"[a-z0-9]+")
+query_pattern = re.compile(r'-?"[^"]*"?|\S+')
+
+class SearchError(Exception):
+    pass
+
+def question_words(question):
+    """Lower case words of the question text, code and answers"""
+    text = [question['question_before'], question['question_after']]
+    text += question['question_code']
+    text += [answer for answer, _ in question['answers']]
+    return word_pattern.findall(" ".join(text).lower())
+
+index_file_name = partial(sidecar_file_name, extension='index')
+
+class IndexBuilder:
+    """Collects postings in memory while questions are compiled"""
+
+    def __init__(self):
+        self.count = 0
+        self.postings = {}
+
+    def __repr__(self):
+        return f"IndexBuilder({self.count} questions, {len(self.postings)} terms)"
+
+    def add(self, question):
+        # one flat array per term is about twice as fast to fill as
+        # grouping the positions of each question first
+        postings = self.postings
+        document = self.count
+        for position, word in enumerate(question_words(question)):
+            posting = postings.get(word)
+            if posting is None:
+                posting = postings[word] = array('I')
+            posting.append(document)
+            posting.append(position)
+        self.count += 1
+
+    def added(self, questions):
+        for question in questions:
+            self.add(question)
+            yield question
+
+    def write(self, file_name):
+        terms = sorted(self.postings)
+        entries = []
+        with open(file_name, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0, 0))
+            position = HEADER.size
+            for term in terms:
+                posting = self.postings[term]
+                entries.append(ENTRY.pack(position, len(posting) // 2))
+                f.write(posting.tobytes())
+                position += len(posting) * posting.itemsize
+            table_offset = position
+            f.write(b"".join(entries))
+            text = [term.encode() for term in terms]
+            term_offsets = array('I', [0])
+            for term in text:
+                term_offsets.append(term_offsets[-1] + len(term))
+            f.write(term_offsets.tobytes())
+            f.write(b"".join(text))
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, VERSION, 0, self.count, len(terms), table_offset))
+        return len(terms)
+
+class TextIndex:
+    """Read only inverted index backed by a mapped index file"""
+
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self.file = open(file_name, "rb")
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise SearchError(f"{file_name}: empty index file")
+        if len(self.map) < HEADER.size:
+            self.close()
+            raise SearchError(f"{file_name}: truncated index header")
+        magic, version, _, count, term_count, table_offset = HEADER.unpack_from(self.map)
+        if magic != MAGIC:
+            self.close()
+            raise SearchError(f"{file_name}: not a search index")
+        if version != VERSION:
+            self.close()
+            raise SearchError(f"{file_name}: unsupported index version {version}")
+        self.count = count
+        self.term_count = term_count
+        self.table_offset = table_offset
+        self.offsets_offset = table_offset + term_count * ENTRY.size
+        self.text_offset = self.offsets_offset + (term_count + 1) * OFFSET.size
+
+    def __repr__(self):
+        return f"TextIndex({self.file_name}, {self.count} questions, {self.term_count} terms)"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.term_count
+
+    def term(self, index):
+        start, end = struct.unpack_from('<II', self.map, self.offsets_offset + index * OFFSET.size)
+        return self.map[self.text_offset + start:self.text_offset + end]
+
+    def bisect(self, term):
+        """Position of the first term not less than term"""
+        low, high = 0, self.term_count
+        while low < high:
+            middle = (low + high) // 2
+            if self.term(middle) < term:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def lookup(self, word):
+        """Returns the term number of a word or None"""
+        term = word.encode()
+        index = self.bisect(term)
+        if index < self.term_count and self.term(index) == term:
+            return index
+        return None
+
+    def prefixed(self, prefix):
+        """Term numbers of every term starting with prefix"""
+        term = prefix.encode()
+        start = self.bisect(term)
+        end = start
+        while end < self.term_count and self.term(end).startswith(term):
+            end += 1
+        return range(start, end)
+
+    def postings(self, index):
+        """Returns the question ids and word positions of every occurrence
+        of a term as two columns"""
+        offset, count = ENTRY.unpack_from(self.map, self.table_offset + index * ENTRY.size)
+        pairs = array('I')
+        pairs.frombytes(self.map[offset:offset + count * 2 * pairs.itemsize])
+        return pairs[0::2], pairs[1::2]
+
+    def documents(self, index):
+        return set(self.postings(index)[0])
+
+    def word(self, word):
+        """Questions containing a query word, which may end in * to match
+        every word with that prefix"""
+        if word.endswith('*'):
+            found = set()
+            for index in self.prefixed(word[:-1]):
+                found.update(self.postings(index)[0])
+            return found
+        index = self.lookup(word)
+        return self.documents(index) if index is not None else set()
+
+    def phrase(self, words):
+        """Questions containing the words next to each other in order"""
+        if not words:
+            return set()
+        if len(words) == 1:
+            return self.word(words[0])
+        indices = [self.lookup(word) for word in words]
+        if None in indices:
+            return set()
+        postings = [self.postings(index) for index in indices]
+        candidates = set(postings[0][0])
+        for documents, _ in postings[1:]:
+            candidates.intersection_update(documents)
+        found = set()
+        for document in candidates:
+            starts = None
+            for shift, (documents, positions) in enumerate(postings):
+                # occurrences are sorted by question so each question's
+                # positions are one run found by bisection
+                i = bisect_left(documents, document)
+                following = set()
+                while i < len(documents) and documents[i] == document:
+                    following.add(positions[i] - shift)
+                    i += 1
+                starts = following if starts is None else starts & following
+                if not starts:
+                    break
+            if starts:
+                found.add(document)
+        return found
+
+    def search(self, query):
+        """Returns the sorted question ids matching a query"""
+        matched = set()
+        for alternative in split_alternatives(query):
+            included = None
+            excluded = set()
+            for exclude, words in alternative:
+                found = self.phrase(words)
+                if exclude:
+                    excluded |= found
+                else:
+                    included = found if included is None else included & found
+            if included is None:
+                included = set(range(self.count))
+            matched |= included - excluded
+        return sorted(matched)
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+def split_alternatives(query):
+    """Parses a query into alternatives separated by OR. Each alternative is
+    a list of (excluded, words) where several words form a phrase"""
+    alternatives = [[]]
+    for part in query_pattern.findall(query):
+        if part == 'OR':
+            alternatives.append([])
+            continue
+        exclude = part.startswith('-')
+        part = part.lstrip('-').strip('"').lower()
+        prefix = part.endswith('*')
+        words = word_pattern.findall(part)
+        if not words:
+            continue
+        if prefix and len(words) == 1:
+            words[0] += '*'
+        alternatives[-1].append((exclude, words))
+    alternatives = [alternative for alternative in alternatives if alternative]
+    if not alternatives:
+        raise SearchError(f"Empty query: {query!r}")
+    return alternatives
+
+def open_index(file_name):
+    return TextIndex(file_name)
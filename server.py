@@ -0,0 +1,200 @@
+# server.py
+
+"""Asyncio quiz server running many sessions on one shared question bank
+
+Clients speak a line protocol over tcp. Every request is one line and
+every reply is one line of json:
+
+    start [-s] [-o] [--questions=1-50]  -> {"session", "total", "question"}
+    answer <letters>                     -> {"correct", "answer", "question"}
+                                            or {"error"} for invalid input
+    results                              -> {"results"}
+    quit                                 -> {"results"} and the connection closes
+
+"question" is null once every question was answered.
+"""
+
+import asyncio
+import json
+import sys
+
+import click
+
+from config import file_name_json, server_host, server_port
+from model import QuestionBank
+from quizzer import (check_correct_answer, check_valid_answer_choices,
+                     check_valid_answer_length, check_valid_input,
+                     load_questions, parse_selection, shuffled_indices)
+
+class Session:
+    """State of one quiz taker. The bank is shared, the question order and
+    per question answer order belong to the session"""
+
+    def __init__(self, bank, session_id, shuffle_questions=False,
+                 shuffle_answers=False, positions=None):
+        self.bank = bank
+        self.session_id = session_id
+        self.shuffle_answers = shuffle_answers
+        self.positions = positions if positions is not None else range(len(bank))
+        if shuffle_questions:
+            self.order = (self.positions[i] for i in shuffled_indices(len(self.positions)))
+        else:
+            self.order = iter(self.positions)
+        self.questions = []
+        self.current = None
+        self.advance()
+
+    def __repr__(self):
+        return f"Session({self.session_id}, {len(self.questions)}/{len(self.positions)})"
+
+    def advance(self):
+        row = next(self.order, None)
+        if row is None:
+            self.current = None
+            return
+        self.current = self.bank.view(row, shuffle=self.shuffle_answers)
+        self.questions.append(self.current)
+
+    def render(self):
+        q = self.current
+        if q is None:
+            return None
+        return {
+            'id': q.question_id,
+            'number': len(self.questions),
+            'question': q.question,
+            'code': q.code,
+            'additional': q.additional,
+            'answers': q.answers,
+            'choose': len(q.answer)
+        }
+
+    def answer(self, answer):
+        q = self.current
+        if q is None:
+            return {'error': "No question left to answer"}
+        messages = []
+        if not (check_valid_input(q, answer, messages.append) and
+                check_valid_answer_length(q, answer, messages.append) and
+                check_valid_answer_choices(q, answer, messages.append)):
+            return {'error': messages[0]}
+        q.answered = True
+        q.correct = check_correct_answer(q, answer)
+        self.advance()
+        return {
+            'correct': q.correct,
+            'answer': ''.join(chr(97 + a) for a in q.answer),
+            'question': self.render()
+        }
+
+    def results(self):
+        answered = [q for q in self.questions if q.answered]
+        return {
+            'correct': sum(1 for q in answered if q.correct),
+            'answered': len(answered),
+            'total': len(self.positions),
+            'incorrect': [q.question_id for q in answered if not q.correct]
+        }
+
+def load_bank(file_name):
+    """Loads the whole question set once into a shared QuestionBank"""
+    data = load_questions(file_name)
+    if isinstance(data, QuestionBank):
+        return data
+    with data:
+        return QuestionBank.from_serialized(data)
+
+class QuizServer:
+    def __init__(self, bank):
+        self.bank = bank
+        self.sessions = 0
+        self.active = 0
+
+    def __repr__(self):
+        return f"QuizServer({len(self.bank)} questions, {self.active} active)"
+
+    def start_session(self, args):
+        shuffle_questions = shuffle_answers = False
+        positions = None
+        for arg in args:
+            if arg == '-s':
+                shuffle_questions = True
+            elif arg == '-o':
+                shuffle_answers = True
+            elif arg.startswith('--questions='):
+                numbers = parse_selection(arg.split('=')[1], len(self.bank))
+                if not numbers:
+                    raise ValueError("No questions selected")
+                positions = [number - 1 for number in numbers]
+            else:
+                raise ValueError(f"{arg} does not match any flags")
+        self.sessions += 1
+        return Session(self.bank, self.sessions, shuffle_questions,
+                       shuffle_answers, positions)
+
+    def handle(self, session, line):
+        """Returns the session after the request and the reply"""
+        command, _, argument = line.strip().partition(' ')
+        if command == 'start':
+            try:
+                session = self.start_session(argument.split())
+            except ValueError as e:
+                return session, {'error': str(e)}
+            return session, {
+                'session': session.session_id,
+                'total': len(session.positions),
+                'question': session.render()
+            }
+        if session is None:
+            return session, {'error': "No session started"}
+        if command == 'answer':
+            return session, session.answer(argument.strip())
+        if command in ('results', 'quit'):
+            return session, {'results': session.results()}
+        return session, {'error': f"Unknown command: {command}"}
+
+    async def serve_client(self, reader, writer):
+        self.active += 1
+        session = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    line = line.decode()
+                except UnicodeDecodeError:
+                    line, reply = '', {'error': "Request is not valid utf-8"}
+                else:
+                    session, reply = self.handle(session, line)
+                writer.write(json.dumps(reply).encode() + b"\n")
+                await writer.drain()
+                if line.startswith('quit'):
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self.active -= 1
+            writer.close()
+
+    async def serve(self, host, port, started=None):
+        server = await asyncio.start_server(self.serve_client, host, port)
+        if started is not None:
+            started.set_result(server.sockets[0].getsockname())
+        async with server:
+            await server.serve_forever()
+
+@click.command()
+@click.option('--file', 'file_name', default=file_name_json, help="question set")
+@click.option('--host', default=server_host)
+@click.option('--port', default=server_port)
+def main(file_name, host, port):
+    bank = load_bank(file_name)
+    print(f"Serving {len(bank)} questions on {host}:{port}", file=sys.stderr)
+    try:
+        asyncio.run(QuizServer(bank).serve(host, port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+	main()
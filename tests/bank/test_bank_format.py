@@ -0,0 +1,55 @@
+# test_bank_format
+
+import json
+
+import pytest
+
+from bank import (Bank, BankError, JsonLines, is_bank_file, is_json_lines_file, open_bank,
+                  write_bank)
+
+QUESTIONS = [
+    {
+        'question_before': f"Question {i}",
+        'question_after': "",
+        'question_code': ["x = 1"] if i % 2 else [],
+        'answers': [["yes", True], ["no", False]],
+        'answer_why': None
+    } for i in range(20)
+]
+
+@pytest.mark.parametrize('compressed', [False, True])
+def test_round_trip(tmp_path, compressed):
+    path = tmp_path / "questions.qbank"
+    assert write_bank(iter(QUESTIONS), path, compressed=compressed) == 20
+    with open_bank(path) as bank:
+        assert len(bank) == 20
+        assert bank.compressed is compressed
+        assert bank[7] == QUESTIONS[7]
+        assert bank[-1] == QUESTIONS[-1]
+        assert list(bank) == QUESTIONS
+
+def test_index_out_of_range(tmp_path):
+    path = tmp_path / "questions.qbank"
+    write_bank(QUESTIONS, path)
+    with open_bank(path) as bank, pytest.raises(IndexError):
+        bank[20]
+
+def test_json_file_is_not_a_bank(tmp_path):
+    path = tmp_path / "questions.json"
+    path.write_text("[]")
+    assert not is_bank_file(path)
+    with pytest.raises(BankError):
+        Bank(path)
+
+def test_json_lines_decoded_by_offset(tmp_path):
+    path = tmp_path / "questions.jsonl"
+    path.write_text("\n".join(json.dumps(q) for q in QUESTIONS[:3]) + "\n\n  \n"
+                    + json.dumps(QUESTIONS[3]))
+    assert is_json_lines_file(path)
+    with JsonLines(path) as lines:
+        assert len(lines) == 4
+        assert lines[3] == QUESTIONS[3]
+        assert list(lines) == QUESTIONS[:4]
+    json_set = tmp_path / "questions.json"
+    json_set.write_text(json.dumps(QUESTIONS))
+    assert not is_json_lines_file(json_set)
@@ -0,0 +1,84 @@
+# test_dedupe_index
+
+import random
+
+import pytest
+from click.testing import CliRunner
+
+import dedupe
+import reader
+from dedupe import DedupeIndex, DuplicateCheck, dedupe_file_name
+
+def question(text, answers=("first answer", "second answer")):
+    return {
+        'question_before': text,
+        'question_after': "",
+        'question_code': [],
+        'answers': [[answer, i == 0] for i, answer in enumerate(answers)],
+        'answer_why': None
+    }
+
+def distinct(count, seed=0):
+    rng = random.Random(seed)
+    words = [f"w{i}" for i in range(5000)]
+    return [question(" ".join(rng.choices(words, k=20))) for _ in range(count)]
+
+TEXT = "Which of the following sorting algorithms is stable and runs in n log n time in the worst case?"
+
+def test_distinct_questions_have_no_clusters():
+    index = DedupeIndex()
+    for q in distinct(300):
+        index.add(q)
+    assert index.clusters() == []
+
+def test_exact_and_near_duplicates_clustered():
+    index = DedupeIndex()
+    questions = distinct(50)
+    questions.insert(10, question(TEXT))
+    questions.insert(20, question(TEXT.upper().replace("?", "")))
+    questions.insert(30, question(TEXT.replace("worst case", "worst case scenario")))
+    for q in questions:
+        index.add(q)
+    assert index.clusters() == [([10, 20, 30], False)]
+    assert index.similarity(10, 20) == 1.0
+
+def test_numpy_and_fallback_signatures_match():
+    if dedupe.numpy is None:
+        pytest.skip("numpy not installed")
+    index = DedupeIndex()
+    hashes = dedupe.shingle_hashes(dedupe.question_words(question(TEXT)))
+    assert dedupe.signature(hashes, index.parameters, index.vectors) == \
+        dedupe.signature(hashes, index.parameters)
+
+def test_new_set_checked_against_saved_index(tmp_path):
+    old = str(tmp_path / "old.json")
+    check = DuplicateCheck()
+    list(check.added(distinct(40) + [question(TEXT)]))
+    check.save(old)
+
+    check = DuplicateCheck([old])
+    list(check.added(distinct(5, seed=1) + [question(TEXT.lower())]))
+    assert [(group, exact) for group, exact in check.clusters()] == [([40, 46], True)]
+    assert check.origin(40) == (old, 41)
+    assert check.origin(46) is None
+    check.save(str(tmp_path / "new.json"))
+    assert DedupeIndex().load(dedupe_file_name(str(tmp_path / "new.json"))) == 6
+
+@pytest.mark.parametrize('contents', [None, b"", b"not an index"])
+def test_reader_rejects_missing_or_corrupt_index(tmp_path, contents):
+    source = tmp_path / "q.txt"
+    source.write_text("1. Question\n    a. yes\nA. (a)\n")
+    old = tmp_path / "old.json"
+    if contents is not None:
+        (tmp_path / "old.json.dedupe").write_bytes(contents)
+    result = CliRunner().invoke(reader.main, [
+        str(source), str(tmp_path / "out.json"), '--dedupe-against', str(old)])
+    assert result.exit_code == 2
+    assert "--dedupe-against" in result.output
+    assert "old.json.dedupe" in result.output
+
+def test_reader_rejects_dedupe_with_watch(tmp_path):
+    result = CliRunner().invoke(reader.main, [
+        str(tmp_path / "q.txt"), str(tmp_path / "out.json"), '--watch', '--dedupe'])
+    assert result.exit_code == 2
+    assert "can not be used with --watch" in result.output
@@ -0,0 +1,79 @@
+# test_grade_batch
+
+import json
+
+import pytest
+from click.testing import CliRunner
+
+import grade
+from grade import (INVALID, answer_choices, answer_keys, answer_mask,
+                   grade as grade_sheets, read_sheets)
+
+DATA = [
+    {'answers': [["x", True], ["y", False]]},
+    {'answers': [["x", False], ["y", True], ["z", True]]},
+    {'answers': [["x", False], ["y", True]]},
+]
+
+SHEETS = [
+    ("ann", {1: "a", 2: "bc", 3: "a"}),
+    ("bob", {1: "a", 2: "cb"}),
+    ("cy", {}),
+]
+
+def test_answer_masks():
+    assert answer_mask("a") == 1
+    assert answer_mask("c, b") == answer_mask("bc") == 6
+    assert answer_keys(DATA) == [1, 6, 2]
+    assert answer_choices(DATA) == [2, 3, 2]
+
+@pytest.mark.parametrize('answer', ["-", "é", "aa", "c", "a?"])
+def test_invalid_answer_masks(answer):
+    assert answer_mask(answer, 2) == INVALID
+
+@pytest.mark.parametrize('vectorized', [True, False])
+def test_scores_match_interactive_results(monkeypatch, vectorized):
+    if vectorized:
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(grade, 'numpy', None)
+    results = grade_sheets(answer_keys(DATA), answer_choices(DATA), SHEETS)
+    assert results == [("ann", 2, 3, 3), ("bob", 2, 2, 3), ("cy", 0, 0, 3)]
+
+@pytest.mark.parametrize('vectorized', [True, False])
+def test_invalid_answers_are_incorrect(monkeypatch, vectorized):
+    if vectorized:
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(grade, 'numpy', None)
+    sheets = [("ann", {1: "-", 2: "bcc", 3: "é"}), ("bob", {1: "A", 2: "d", 3: "b"})]
+    results = grade_sheets(answer_keys(DATA), answer_choices(DATA), sheets)
+    assert results == [("ann", 0, 3, 3), ("bob", 2, 3, 3)]
+
+def test_question_outside_set_rejected():
+    with pytest.raises(ValueError):
+        grade_sheets(answer_keys(DATA), answer_choices(DATA), [("ann", {4: "a"})])
+
+def test_read_csv_and_jsonl_sheets(tmp_path):
+    csv_file = tmp_path / "sheets.csv"
+    csv_file.write_text("taker,1,3\nann,a,\n")
+    jsonl_file = tmp_path / "sheets.jsonl"
+    jsonl_file.write_text('{"taker": "bob", "answers": {"2": "bc"}}\n')
+    assert list(read_sheets(str(csv_file))) == [("ann", {1: "a", 3: ""})]
+    assert list(read_sheets(str(jsonl_file))) == [("bob", {2: "bc"})]
+
+@pytest.mark.parametrize('name, text', [
+    ("outside.csv", "taker,1,4\nann,a,a\n"),
+    ("header.csv", "taker,q1,q2\nann,a,b\n"),
+    ("missing.jsonl", '{"taker": "bob"}\n'),
+    ("broken.jsonl", '{"taker": "bob", \n'),
+])
+def test_bad_sheets_name_the_file(tmp_path, name, text):
+    questions = tmp_path / "questions.json"
+    questions.write_text(json.dumps(DATA))
+    sheet = tmp_path / name
+    sheet.write_text(text)
+    result = CliRunner().invoke(grade.main, [str(sheet), '--file', str(questions)])
+    assert result.exit_code == 2
+    assert str(sheet) in result.output
+    assert not isinstance(result.exception, ValueError)
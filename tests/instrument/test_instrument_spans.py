@@ -0,0 +1,66 @@
+# test_instrument_spans
+
+import json
+
+import pytest
+
+import instrument
+from lexer import tokenize
+
+@pytest.fixture
+def profiling(monkeypatch):
+    monkeypatch.setattr(instrument, 'enabled', True)
+    instrument.reset()
+    yield
+    instrument.reset()
+
+def test_disabled_records_nothing():
+    instrument.reset()
+    with instrument.span('block'):
+        pass
+    instrument.count('things', 3)
+    tokenize("1. a\n")
+    assert instrument.report() == {'spans': {}, 'counters': {}}
+
+def test_spans_and_counters(profiling):
+    with instrument.span('block'):
+        pass
+    with instrument.span('block'):
+        pass
+    tokenize("1. a\n")
+    report = instrument.report()
+    assert report['spans']['block']['calls'] == 2
+    assert report['spans']['lexer.tokenize']['calls'] == 1
+    assert report['counters'] == {'tokens': 4}
+
+def test_timed_iter(profiling):
+    assert list(instrument.timed_iter('items', iter([1, 2]))) == [1, 2]
+    assert instrument.report()['spans']['items']['calls'] == 3
+
+def test_profiled_writes_json(monkeypatch, tmp_path):
+    monkeypatch.setattr(instrument, 'enabled', False)
+    output = tmp_path / "profile.json"
+    stats = tmp_path / "profile.prof"
+    with instrument.profiled(str(output), str(stats)):
+        instrument.count('things')
+    instrument.reset()
+    assert json.loads(output.read_text())['counters'] == {'things': 1}
+    assert stats.exists()
+
+def test_reader_profile_flag_keeps_arguments(monkeypatch, tmp_path):
+    from click.testing import CliRunner
+    import reader
+    monkeypatch.setattr(instrument, 'enabled', False)
+    source = tmp_path / "q.txt"
+    source.write_text("1. Question\n    a. yes\nA. (a)\n")
+    output = tmp_path / "out.json"
+    profile = tmp_path / "profile.json"
+    result = CliRunner().invoke(reader.main, [
+        '--profile', str(source), str(output), '--profile-output', str(profile)])
+    instrument.reset()
+    assert result.exit_code == 0, result.output
+    assert source.read_text() == "1. Question\n    a. yes\nA. (a)\n"
+    assert json.loads(output.read_text())[0]['answers'] == [["yes", True]]
+    report = json.loads(profile.read_text())
+    assert report['spans']['reader.read']['calls'] == 2
+    assert report['counters']['lines'] == 3
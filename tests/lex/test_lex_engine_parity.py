@@ -0,0 +1,55 @@
+# test_lex_engine_parity
+
+import pytest
+
+from error import LexerError
+from lexer import tokenize, tokenize_by_char
+
+QUESTION = """
+-- sample question
+1. An example question, with symbols: a/b <c> d_e; f? 'g' \\h.
+    a. Answer 1
+\tb. Answer 22 -- trailing comment
+    c. x-y
+A. (a, c)
+"""
+
+def pairs(tokens):
+    return [(token.type, token.value) for token in tokens]
+
+def test_same_tokens_as_reference():
+    assert pairs(tokenize(QUESTION)) == pairs(tokenize_by_char(QUESTION))
+
+def test_same_tokens_for_repeated_questions():
+    text = QUESTION * 100
+    assert pairs(tokenize(text)) == pairs(tokenize_by_char(text))
+
+def test_comment_only_lines_are_dropped():
+    assert pairs(tokenize("-- one\n-- two\n")) == [('endmarker', '')]
+
+def test_other_characters_are_text():
+    text = '1. x = "café" [y]!\n'
+    assert pairs(tokenize(text)) == pairs(tokenize_by_char(text))
+    assert pairs(tokenize(text))[3:8] == [
+        ('text', '='), ('text', '"'), ('word', 'caf'), ('text', 'é'), ('text', '"')]
+
+CODE_QUESTION = '''1. What does this print?
+"""
+def f(x):
+
+    return "x" -- not a comment
+"""
+    a. "x"
+A. (a)
+'''
+
+def test_same_tokens_with_code_blocks():
+    text = CODE_QUESTION * 3
+    assert pairs(tokenize(text)) == pairs(tokenize_by_char(text))
+    assert pairs(tokenize(text))[7] == ('code', '"""\ndef f(x):\n\n    return "x" -- not a comment\n"""')
+
+@pytest.mark.parametrize('tokenizer', [tokenize, tokenize_by_char])
+def test_unclosed_code_block_raises_lexer_error(tokenizer):
+    with pytest.raises(LexerError) as e:
+        tokenizer('1. question\n"""\ncode\n')
+    assert e.value.message == "Code block not correctly ended"
@@ -1,7 +1,17 @@
 # test_lex_rule_comment
 
+import os
+
+from lexer import ENDMARKER, NUMBER, PERIOD, tokenize
+
+def token_types(text):
+    return [token.type for token in tokenize(text)]
+
 def test_single_line_comment():
-    ...
+    assert token_types("-- this is a comment line\n") == [ENDMARKER]
+    assert token_types("1. -- trailing comment\n") == [NUMBER, PERIOD, ENDMARKER]
 
 def test_multiple_single_line_comments():
-    ...
+    data_path = os.path.join(os.path.dirname(__file__), "..", "..", "data")
+    with open(os.path.join(data_path, "comment.txt")) as f:
+        assert token_types(f.read()) == [ENDMARKER]
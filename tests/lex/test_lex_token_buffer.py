@@ -0,0 +1,53 @@
+# test_lex_token_buffer
+
+import pytest
+
+from error import LexerError
+from lexer import tokenize, tokenize_buffer, tokenize_mapped_file
+from parser import TokenStream, questions
+
+TEXT = "".join(
+    f"{n}. Which choice, of 'these', is right?\n\ta. first {n}\n\tb. x-y\nA. (a) -- {n}\n"
+        for n in range(1, 21))
+
+def pairs(tokens):
+    return [(token.type, token.value) for token in tokens]
+
+def test_same_tokens_as_tokenize():
+    assert pairs(tokenize_buffer(TEXT.encode())) == pairs(tokenize(TEXT))
+
+def test_values_sliced_on_demand():
+    tokens = tokenize_buffer(TEXT.encode())
+    assert tokens.type(0) == 'number'
+    assert tokens.value(0) == '1'
+    assert bytes(tokens.view(2)) == b'Which'
+    assert tokens[-1].type == 'endmarker'
+
+def test_other_characters_are_text():
+    text = '1. x = "café" [y]!\n"""\n"\n"""\n'
+    assert pairs(tokenize_buffer(text.encode())) == pairs(tokenize(text))
+
+def test_unclosed_code_block_raises_lexer_error():
+    with pytest.raises(LexerError) as e:
+        tokenize_buffer(b'1. question\n"""\ncode\n')
+    assert e.value.message == "Code block not correctly ended"
+    assert e.value.offset == 12
+
+def test_parser_runs_on_mapped_file(tmp_path):
+    file_name = tmp_path / "questions.txt"
+    file_name.write_text(TEXT)
+    eager = questions(TokenStream(tokenize(TEXT)))
+    with tokenize_mapped_file(file_name) as tokens:
+        mapped = questions(TokenStream(tokens))
+    assert [b.preview() for b in mapped] == [b.preview() for b in eager]
+
+def test_windows_line_ends(tmp_path):
+    file_name = tmp_path / "questions.txt"
+    file_name.write_bytes(TEXT.replace('\n', '\r\n').encode())
+    with tokenize_mapped_file(file_name) as tokens:
+        assert pairs(tokens) == pairs(tokenize(TEXT))
+
+def test_empty_file(tmp_path):
+    file_name = tmp_path / "empty.txt"
+    file_name.write_text("")
+    assert pairs(tokenize_mapped_file(file_name)) == [('endmarker', '')]
@@ -0,0 +1,52 @@
+# test_model_question_bank
+
+import copy
+import random
+
+from model import Question, QuestionBank
+
+DATA = [
+    {
+        'question_before': "Which are even?",
+        'question_after': "Pick two",
+        'question_code': ["x = [1, 2, 4]", "print(x)"],
+        'answers': [["1", False], ["2", True], ["4", True]],
+        'answer_why': None
+    },
+    {
+        'question_before': "Which is odd?",
+        'question_after': "",
+        'question_code': [],
+        'answers': [["1", True], ["2", False]],
+        'answer_why': None
+    }
+]
+
+def fields(question):
+    return (question.question_id, question.question, question.code,
+            question.additional, question.answers, question.answer)
+
+def test_views_match_questions():
+    bank = QuestionBank.from_serialized(DATA)
+    assert len(bank) == 2
+    for i, d in enumerate(DATA):
+        question = Question(copy.deepcopy(d), shuffle=False, question_id=i + 1)
+        assert fields(bank.view(i)) == fields(question)
+
+def test_shuffled_views_match_shuffled_questions():
+    bank = QuestionBank.from_serialized(DATA)
+    random.seed(3)
+    question = Question(copy.deepcopy(DATA[0]), shuffle=True, question_id=1)
+    random.seed(3)
+    assert fields(bank.view(0, shuffle=True)) == fields(question)
+
+def test_strings_are_shared():
+    bank = QuestionBank.from_serialized(DATA)
+    assert bank.strings.count("1") == 1
+    assert bank.strings.count("") == 1
+
+def test_selected_entries_keep_their_numbers():
+    bank = QuestionBank.from_serialized(DATA, indices=[1])
+    assert len(bank) == 1
+    assert bank.view(0).question_id == 2
+    assert bank.view(0).question == "Which is odd?"
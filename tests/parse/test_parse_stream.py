@@ -0,0 +1,41 @@
+# test_parse_stream
+
+from lexer import tokenize, tokenize_chunks
+from parser import TokenStream, iter_questions, parse_file_lazily, questions
+
+TEXT = "".join(
+    f"{n}. Which choice is right?\n\ta. first {n}\n\tb. second\nA. (a) -- {n}\n"
+        for n in range(1, 51))
+
+def chunked(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+def pairs(tokens):
+    return [(token.type, token.value) for token in tokens]
+
+def test_chunked_tokens_match_whole_text():
+    for size in (1, 7, 64, len(TEXT)):
+        assert pairs(tokenize_chunks(chunked(TEXT, size))) == pairs(tokenize(TEXT))
+
+def test_lazy_stream_matches_list_stream():
+    eager = questions(TokenStream(tokenize(TEXT)))
+    lazy = iter_questions(TokenStream(tokenize_chunks(chunked(TEXT, 13))))
+    assert [b.preview() for b in lazy] == [b.preview() for b in eager]
+
+def test_first_question_before_source_is_read():
+    chunks = chunked(TEXT, 32)
+    read = []
+    def source():
+        for chunk in chunks:
+            read.append(chunk)
+            yield chunk
+    next(iter_questions(TokenStream(tokenize_chunks(source()))))
+    assert len(read) < len(chunks)
+
+def test_commit_bounds_buffer(tmp_path):
+    path = tmp_path / "questions.txt"
+    path.write_text(TEXT)
+    stream = TokenStream(tokenize_chunks(chunked(TEXT, 16)))
+    for _ in iter_questions(stream):
+        assert len(stream.tokens) < 100
+    assert len(list(parse_file_lazily(path, chunk_size=16))) == 50
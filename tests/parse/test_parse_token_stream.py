@@ -0,0 +1,42 @@
+# test_parse_token_stream
+
+from lexer import ENDMARKER, NUMBER, PERIOD, tokenize
+from parser import TokenStream, questions
+
+QUESTIONS = """
+1. Which choices are correct?
+\ta. first choice
+\tb. second choice
+A. (a, b)
+2. Which choice is correct?
+\ta. only choice
+A. (a)
+"""
+
+def test_peek_does_not_consume():
+    stream = TokenStream(tokenize("1."))
+    assert stream.peek().type == NUMBER
+    assert stream.peek(1).type == PERIOD
+    assert stream.next().type == NUMBER
+    assert stream.peek().type == PERIOD
+
+def test_mark_and_reset():
+    stream = TokenStream(tokenize("1. 2."))
+    position = stream.mark()
+    stream.next()
+    stream.next()
+    stream.reset(position)
+    assert stream.next().value == '1'
+
+def test_peek_past_end_returns_endmarker():
+    stream = TokenStream(tokenize(""))
+    stream.next()
+    assert not stream
+    assert stream.peek(5).type == ENDMARKER
+
+def test_questions_consume_all_tokens():
+    stream = TokenStream(tokenize(QUESTIONS))
+    blocks = questions(stream)
+    assert [len(block.choices) for block in blocks] == [2, 1]
+    assert str(blocks[0].answers) == "a, b"
+    assert stream.peek().type == ENDMARKER
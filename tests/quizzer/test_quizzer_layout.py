@@ -0,0 +1,69 @@
+# test_quizzer_layout
+
+from layout import LayoutCache, layout_file_name
+from model import QuestionBank
+
+DATA = [{
+    'question_before': "A long question " * 10,
+    'question_after': "Some additional text",
+    'question_code': ["x = " + "1 + " * 30 + "1", ""],
+    'answers': [["short", True], ["a much longer answer " * 5, False]],
+    'answer_why': None
+}]
+
+def test_layout_wraps_code_to_width():
+    question = QuestionBank.from_serialized(DATA).view(0)
+    layout = LayoutCache().get(question, 40)
+    assert all(len(line) <= 40 for line in layout['code'])
+    assert all(len(line) <= 76 for line in layout['question'])
+    assert len(layout['answers']) == 2
+
+def test_layout_keyed_by_width():
+    question = QuestionBank.from_serialized(DATA).view(0)
+    layouts = LayoutCache()
+    narrow = layouts.get(question, 40)
+    assert layouts.get(question, 40) is narrow
+    assert layouts.get(question, 100) != narrow
+    assert len(layouts) == 2
+
+def test_layouts_persist_next_to_set(tmp_path):
+    file_name = layout_file_name(str(tmp_path / "questions.json"))
+    question = QuestionBank.from_serialized(DATA).view(0)
+    layouts = LayoutCache(file_name)
+    layout = layouts.get(question, 60)
+    layouts.save()
+    reloaded = LayoutCache(file_name)
+    assert reloaded.get(question, 60) == layout
+    assert not reloaded.changed
+
+def test_shuffled_answers_share_one_layout():
+    bank = QuestionBank.from_serialized(DATA)
+    layouts = LayoutCache()
+    source = layouts.get(bank.view(0), 60)
+    shuffled = bank.view(0)
+    shuffled.order = [1, 0]
+    layout = layouts.get(shuffled, 60)
+    assert len(layouts) == 1
+    assert layout['answers'] == source['answers'][::-1]
+    assert layout['answers'][0][0].startswith("a much longer answer")
+
+def test_saved_layouts_bounded(tmp_path):
+    file_name = layout_file_name(str(tmp_path / "questions.json"))
+    bank = QuestionBank.from_serialized(DATA)
+    layouts = LayoutCache(file_name, max_entries=2)
+    for width in (40, 50, 60):
+        layouts.get(bank.view(0), width)
+    layouts.save()
+    reloaded = LayoutCache(file_name, max_entries=2)
+    assert len(reloaded) == 2
+    reloaded.get(bank.view(0), 50)
+    reloaded.get(bank.view(0), 70)
+    reloaded.save()
+    assert sorted(key.split(':')[1] for key in LayoutCache(file_name).layouts) == ["50", "70"]
+
+def test_remote_questions_laid_out():
+    from quizzer import remote_question
+    question = remote_question({
+        'id': 1, 'question': "Remote?", 'code': [], 'additional': "",
+        'answers': ["yes", "no"], 'choose': 1})
+    assert LayoutCache().get(question, 60)['answers'] == [["yes"], ["no"]]
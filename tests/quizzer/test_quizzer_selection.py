@@ -0,0 +1,58 @@
+# test_quizzer_selection
+
+import pytest
+
+import quizzer
+from bank import write_bank
+from quizzer import parse_selection, shuffled_indices
+
+def test_ranges_and_numbers_keep_order():
+    assert parse_selection("3-5,1,10-11") == [3, 4, 5, 1, 10, 11]
+
+def test_repeated_numbers_asked_once():
+    assert parse_selection("1-3,2,3") == [1, 2, 3]
+
+def test_ranges_clamped_to_set_size():
+    assert parse_selection("3-100000000000,1", 5) == [3, 4, 5, 1]
+    with pytest.raises(ValueError) as e:
+        parse_selection("1,6-8", 5)
+    assert str(e.value) == "Question 6 not in set of 5 questions"
+
+@pytest.mark.parametrize('text', ["a", "0", "5-2", "1-x"])
+def test_invalid_selection(text):
+    with pytest.raises(ValueError):
+        parse_selection(text)
+
+def test_shuffled_indices_are_a_permutation():
+    assert sorted(shuffled_indices(50)) == list(range(50))
+    assert list(shuffled_indices(0)) == []
+
+def test_quiz_closes_mapped_bank(tmp_path, monkeypatch):
+    file_name = str(tmp_path / "questions.bank")
+    write_bank([{
+        'question_before': "Question", 'question_after': "", 'question_code': [],
+        'answers': [["x", True], ["y", False]], 'answer_why': None
+    }], file_name)
+    opened = []
+    def open_questions(name):
+        opened.append(quizzer.open_bank(name))
+        return opened[-1]
+    monkeypatch.setattr(quizzer, 'open_questions', open_questions)
+    for name in ('update_terminal', 'clear_screen', 'ask_question', 'output_results'):
+        monkeypatch.setattr(quizzer, name, lambda *args, **kwargs: None)
+    monkeypatch.setattr(quizzer, 'handle_input', lambda q: None)
+    quizzer.quiz({'file_name_json': file_name}, 0.0)
+    assert opened[0].map.closed
+
+@pytest.mark.parametrize('name, value, flag', [
+    ('save_results', True, '-S'),
+    ('cache_layouts', True, '-L'),
+    ('topics', ['graphs'], '--topic'),
+    ('match', "heap", '--match'),
+    ('schedule_new', 20, '--schedule'),
+])
+def test_local_flags_rejected_with_connect(monkeypatch, capsys, name, value, flag):
+    monkeypatch.setattr(quizzer, name, value)
+    with pytest.raises(SystemExit):
+        quizzer.remote_quiz("127.0.0.1:1")
+    assert f"{flag} can not be used with --connect" in capsys.readouterr().out
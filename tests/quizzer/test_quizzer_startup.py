@@ -0,0 +1,29 @@
+# test_quizzer_startup
+
+import os
+import subprocess
+import sys
+
+root = os.path.join(os.path.dirname(__file__), "..", "..")
+
+# generous enough for a slow machine, a regression back to importing the
+# results store, click or the profilers at startup goes well past it
+import_budget_us = 250000
+
+deferred = ['sqlite3', 'click', 'cProfile', 'textwrap', 'numpy', 'asyncio', 'socket']
+
+def run(code, *options):
+    return subprocess.run(
+        [sys.executable, *options, "-c", code],
+        cwd=root, capture_output=True, text=True, check=True
+    )
+
+def test_heavy_modules_not_imported():
+    code = f"import sys, quizzer; print([m for m in {deferred!r} if m in sys.modules])"
+    assert run(code).stdout.strip() == "[]"
+
+def test_import_time_within_budget():
+    result = run("import quizzer", "-X", "importtime")
+    line = next(l for l in result.stderr.splitlines() if l.endswith("| quizzer"))
+    cumulative = int(line.split('|')[1])
+    assert cumulative < import_budget_us
@@ -0,0 +1,109 @@
+# test_read_cache
+
+import json
+
+import pytest
+from click.testing import CliRunner
+
+import reader
+from cache import BlockCache
+from reader import (parse_text, read_fragments_cached, read_questions_cached,
+                    split_blocks, write_fragments, write_questions)
+
+TEXT = '''-- header comment
+1. Question with code
+"""
+A. (a) inside code is not an answer
+"""
+    a. first
+A. (a)
+
+2. Second question
+    a. first
+    b. second
+A. (a, b)
+-- trailing comment
+'''
+
+def test_split_blocks_on_answer_lines():
+    blocks = list(split_blocks(TEXT.splitlines(True)))
+    assert [start for start, _ in blocks] == [0, 7, 12]
+    assert blocks[0][1][-1] == "A. (a)\n"
+
+def test_cached_output_matches_parse_text(tmp_path):
+    lines = TEXT.splitlines(True)
+    file_name = str(tmp_path / "cache.json")
+    cache = BlockCache(file_name, 1, 100)
+    assert list(read_questions_cached(lines, cache)) == parse_text(lines)
+    assert (cache.hits, cache.misses) == (0, 3)
+    cache.save()
+
+    edited = [line.replace("Second", "2nd") for line in lines]
+    cache = BlockCache(file_name, 1, 100)
+    assert list(read_questions_cached(edited, cache)) == parse_text(edited)
+    assert (cache.hits, cache.misses) == (2, 1)
+
+def test_version_change_discards_cache(tmp_path):
+    file_name = str(tmp_path / "cache.json")
+    cache = BlockCache(file_name, 1, 100)
+    cache.put("key", [])
+    cache.save()
+    assert len(BlockCache(file_name, 1, 100)) == 1
+    assert len(BlockCache(file_name, 2, 100)) == 0
+
+def test_least_recently_used_entries_evicted(tmp_path):
+    file_name = str(tmp_path / "cache.json")
+    cache = BlockCache(file_name, 1, 2)
+    cache.put("old", [])
+    cache.put("kept", [])
+    cache.save()
+    cache = BlockCache(file_name, 1, 2)
+    cache.get("kept")
+    cache.put("new", [])
+    cache.save()
+    assert sorted(BlockCache(file_name, 1, 2).entries) == ["kept", "new"]
+
+def test_cache_with_jobs_rejected(tmp_path):
+    source = tmp_path / "q.txt"
+    source.write_text(TEXT)
+    result = CliRunner().invoke(reader.main, [
+        str(source), str(tmp_path / "out.json"), '--cache', '--jobs', '2'])
+    assert result.exit_code == 2
+    assert "--cache can not be used with --jobs" in result.output
+
+@pytest.mark.parametrize('output_format', ['json', 'jsonl', 'bank'])
+def test_spliced_fragments_give_the_same_file(tmp_path, output_format):
+    lines = TEXT.splitlines(True)
+    expected = tmp_path / "expected"
+    spliced = tmp_path / "spliced"
+    write_questions(iter(parse_text(lines)), str(expected), output_format, False)
+    for _ in range(2):
+        cache = BlockCache(str(tmp_path / "cache"), 1, 100)
+        write_fragments(read_fragments_cached(lines, cache, output_format), str(spliced),
+                        output_format)
+        cache.save()
+        assert spliced.read_bytes() == expected.read_bytes()
+    assert (cache.hits, cache.misses) == (3, 0)
+
+def test_save_appends_new_entries(tmp_path):
+    file_name = tmp_path / "cache"
+    cache = BlockCache(str(file_name), 1, 100)
+    cache.put("old", ["{}"])
+    cache.save()
+    saved = file_name.read_text()
+    cache = BlockCache(str(file_name), 1, 100)
+    assert cache.get("old") == ["{}"]
+    cache.put("new", ['{\n  "a": 1\n}', "[]"])
+    cache.save()
+    assert file_name.read_text().startswith(saved)
+    assert BlockCache(str(file_name), 1, 100).get("new") == ['{\n  "a": 1\n}', "[]"]
+
+def test_cache_stored_next_to_output(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "q.txt").write_text(TEXT)
+    for _ in range(2):
+        result = CliRunner().invoke(reader.main, ['q.txt', 'out.json', '--cache'])
+        assert result.exit_code == 0, result.output
+    assert "3 hits" in result.output
+    assert (tmp_path / "out.json.cache").exists()
+    assert json.loads((tmp_path / "out.json").read_text()) == parse_text(TEXT.splitlines(True))
@@ -0,0 +1,30 @@
+# test_read_choices
+
+from reader import parse_text
+
+README = '''1. An example question.
+    a. Answer 1
+\tb. Answer 2
+A. (a, b)
+2. An example question with a code block:
+"""
+1. class foo () {
+    a. not a choice inside code
+"""
+   Additional information after the code block
+    a. Answer 1
+    b. Answer 2
+    c. Answer 3
+A. (c)
+'''
+
+def test_choices_are_answers_not_question_text():
+    first, second = parse_text(README.splitlines(True))
+    assert first['question_before'] == "An example question."
+    assert first['answers'] == [["Answer 1", True], ["Answer 2", True]]
+    assert second['question_after'] == "Additional information after the code block"
+    assert second['answers'] == [["Answer 1", False], ["Answer 2", False], ["Answer 3", True]]
+
+def test_choice_lines_inside_code_stay_code():
+    _, second = parse_text(README.splitlines(True))
+    assert second['question_code'] == ["1. class foo () {", " a. not a choice inside code"]
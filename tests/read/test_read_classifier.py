@@ -0,0 +1,50 @@
+# test_read_classifier
+
+import random
+
+import pytest
+
+from benchmarks.synth import generate_lines
+from reader import CascadeReader, Reader
+
+# every kind of line in and out of place, including ones only the cascade
+# order decides: choices before a question, numbers inside code, answers
+# without parentheses and lines without a newline
+PIECES = [
+    "1. question\n", "12. question\n", ". no number\n", "1a. not a start\n",
+    "\ta. choice\n", "    b. choice\n", "     c. five spaces\n", "    f. not a choice\n",
+    "   continued\n", "\tcontinued\n", "  two spaces\n", "   \n", "\t\n",
+    '"""\n', '""" after quotes\n', '"" two quotes\n', "   1. indented number\n",
+    "A. (a)\n", "A. (a, c) -- comment\n", "A. a\n", "A.(b)(c)\n", "B. (a)\n",
+    "-- comment\n", "-dash\n", "\n", "", "text\n", "A. (a)", "1. last",
+]
+
+def feed_all(reader, lines):
+    states = []
+    for line in lines:
+        question = reader.feed(line)
+        states.append((question, reader.last_matched_pattern, reader.stopped,
+                       reader.code_block_start, reader.code_block_added, reader.count))
+    return states
+
+@pytest.mark.parametrize('code', [False, True])
+def test_generated_banks_match_cascade(code):
+    lines = list(generate_lines(300, 1, code=code))
+    assert feed_all(Reader(), lines) == feed_all(CascadeReader(), lines)
+
+def test_random_lines_match_cascade():
+    rng = random.Random(0)
+    for _ in range(2000):
+        lines = [rng.choice(PIECES) for _ in range(rng.randint(1, 30))]
+        reader, cascade = Reader(quiet=True), CascadeReader(quiet=True)
+        assert feed_all(reader, lines) == feed_all(cascade, lines), lines
+        assert reader.question == cascade.question
+
+def test_error_context_matches_cascade(capsys):
+    lines = list(generate_lines(20, code=True))
+    lines[60] = "unexpected\n"
+    feed_all(CascadeReader(line_number=10, count=3), lines)
+    expected = capsys.readouterr().err
+    feed_all(Reader(line_number=10, count=3), lines)
+    assert capsys.readouterr().err == expected
+    assert "Reader Error" in expected
@@ -0,0 +1,90 @@
+# test_read_engines
+
+import pytest
+
+from benchmarks.synth import generate_lines
+from reader import (parse_block, parse_block_grammar, parse_text,
+                    read_questions_parallel)
+
+EDGES = '''-- comments and blank lines between questions
+
+1. Statement with a trailing comment -- kept by both engines
+   continued on an indented line
+\tand a tab indented one
+   -- indented comments are text
+    f. is not a choice so it continues the statement
+    a. First choice, with symbols: a/b <c> d_e; f? 'g'
+\tb. Tab indented choice -- with a comment
+A. (a, b) and anything after the answer set
+
+2. Code blocks keep every character
+"""
+1. x = [y for y in "quoted"]
+-- comments in code are dropped
+
+\tindented with a tab
+   indented with spaces
+    A. (a) inside code
+""" anything after the closing quotes
+   additional text after the code
+    a. first
+    b. second
+"""
+second block
+"""
+   more additional text
+A. (b)
+3.
+    a. empty statement
+A. (a)
+4. Is x = 1 != "2" in [a] {b} + c * d # e % f, café or naïve?
+   écrit à la main — “quoted” ½
+	a. x = "é" [+] {*}
+	b. #! % ünïcode
+A. (b)
+'''
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('indent', ['    ', '\t'])
+@pytest.mark.parametrize('code', [False, True])
+def test_generated_banks_match(seed, indent, code):
+    lines = list(generate_lines(300, seed, indent, code))
+    assert parse_block_grammar(lines) == (parse_text(lines), False)
+
+def test_edge_cases_match():
+    lines = EDGES.splitlines(True)
+    questions, stopped = parse_block_grammar(lines)
+    assert not stopped
+    assert questions == parse_text(lines)
+    assert questions[0]['question_before'].endswith("and a tab indented one "
+        "-- indented comments are text f. is not a choice so it continues the statement")
+    assert questions[0]['answers'][1] == ["Tab indented choice -- with a comment", True]
+    assert questions[1]['question_code'][0] == '1. x = [y for y in "quoted"]'
+    assert questions[1]['question_code'][-1] == "second block"
+    assert questions[2]['question_before'] == ""
+    assert questions[3]['question_before'].endswith("naïve? écrit à la main — “quoted” ½")
+    assert questions[3]['answers'] == [['x = "é" [+] {*}', False], ["#! % ünïcode", True]]
+
+@pytest.mark.parametrize('index, line', [
+    (4, "not indented\n"),
+    (5, "2. question inside a question\n"),
+    (9, "A. a, b\n"),
+])
+def test_same_questions_before_an_error(index, line):
+    lines = EDGES.splitlines(True) * 2
+    lines[len(lines) // 2 + index] = line
+    regex, regex_stopped = parse_block(lines, quiet=True)
+    grammar, grammar_stopped = parse_block_grammar(lines, quiet=True)
+    assert regex_stopped and grammar_stopped
+    assert grammar == regex
+
+def test_unfinished_question_is_an_error(capsys):
+    lines = EDGES.splitlines(True)[:-1]
+    questions, stopped = parse_block_grammar(lines, 100, 5)
+    assert stopped and len(questions) == 3
+    err = capsys.readouterr().err
+    assert "Question 9, line" in err and "Question not ended" in err
+
+def test_parallel_grammar_matches_serial():
+    lines = list(generate_lines(200, code=True))
+    assert list(read_questions_parallel(lines, 2, 150, engine='grammar')) == parse_text(lines)
@@ -0,0 +1,47 @@
+# test_read_incremental
+
+import json
+
+from reader import Reader, create_jsonl_file, parse_text, read_questions
+
+LINES = '''
+-- sample
+1. Which choices are correct?
+"""
+2. class foo:
+       pass
+"""
+   Additional text
+A. (a)
+2. Second question
+A. (b)
+'''.splitlines(True)[1:]
+
+def test_feed_returns_question_on_answer_line():
+    reader = Reader()
+    results = [reader.feed(line) for line in LINES]
+    completed = [i for i, result in enumerate(results) if result is not None]
+    assert completed == [7, 9]
+    assert results[7]['question_code'] == ["2. class foo:", "    pass"]
+    assert results[7]['question_after'] == "Additional text"
+    assert reader.count == 2
+
+def test_reader_stops_on_unmatched_line(capsys):
+    reader = Reader()
+    reader.feed("A. (a)\n")
+    assert reader.feed("1. question\n") is None
+    assert reader.feed("\x00\n") is None
+    assert reader.stopped
+    assert "line 3" in capsys.readouterr().err
+
+def test_read_questions_is_lazy():
+    lines = iter(LINES)
+    questions = read_questions(lines)
+    next(questions)
+    assert next(lines) == "2. Second question\n"
+
+def test_jsonl_matches_parse_text(tmp_path):
+    path = tmp_path / "questions.jsonl"
+    create_jsonl_file(read_questions(LINES), str(path))
+    written = [json.loads(line) for line in path.read_text().splitlines()]
+    assert written == parse_text(LINES)
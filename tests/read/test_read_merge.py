@@ -0,0 +1,58 @@
+# test_read_merge
+
+import json
+
+import pytest
+from click.testing import CliRunner
+
+import reader
+from benchmarks.synth import code_question_lines
+from manifest import load_manifest, manifest_file_name
+from quizzer import select_topics
+from reader import compile_files, expand_inputs, parse_text
+
+TOPICS = {'arrays': 3, 'graphs': 2, 'strings': 4}
+
+@pytest.fixture
+def sources(tmp_path):
+    for topic, count in TOPICS.items():
+        text = "".join(code_question_lines(count, f"{topic} question"))
+        directory = tmp_path / "bank" / ("more" if topic == 'strings' else "")
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"{topic}.txt").write_text(text)
+    (tmp_path / "bank" / "notes.md").write_text("not a question file")
+    return tmp_path / "bank"
+
+def test_directories_and_globs_expand(sources):
+    found = expand_inputs(str(sources))
+    assert [f.rsplit('/', 1)[1] for f in found] == ["arrays.txt", "graphs.txt", "strings.txt"]
+    assert expand_inputs(str(sources / "g*.txt")) == [str(sources / "graphs.txt")]
+    assert expand_inputs(str(sources / "arrays.txt")) is None
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_merged_output_and_manifest(sources, tmp_path, jobs):
+    file_names = expand_inputs(str(sources))
+    output = tmp_path / "merged.json"
+    compile_files(file_names, str(output), 'json', False, jobs)
+    expected = []
+    for file_name in file_names:
+        with open(file_name) as f:
+            expected += parse_text(f.readlines())
+    assert json.loads(output.read_text()) == expected
+
+    manifest = load_manifest(manifest_file_name(str(output)))
+    assert manifest.topics() == list(TOPICS)
+    assert manifest.origin(4) == (file_names[1], 2)
+    assert manifest.select(['graphs', 'str*']) == [3, 4, 5, 6, 7, 8]
+
+def test_quizzer_topic_filter(sources, tmp_path):
+    output = tmp_path / "merged.json"
+    compile_files(expand_inputs(str(sources)), str(output), 'json', False, 1)
+    assert select_topics(str(output), ['graphs'], []) == [4, 5]
+    assert select_topics(str(output), ['arrays', 'strings'], [9, 1, 4]) == [9, 1]
+
+def test_cache_with_many_inputs_rejected(sources, tmp_path):
+    result = CliRunner().invoke(reader.main, [
+        str(sources), str(tmp_path / "merged.json"), '--cache'])
+    assert result.exit_code == 2
+    assert "--cache needs a single input file" in result.output
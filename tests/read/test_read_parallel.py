@@ -0,0 +1,24 @@
+# test_read_parallel
+
+from benchmarks.synth import code_question_lines
+from reader import parse_text, read_questions_parallel, split_chunks
+
+LINES = code_question_lines(40)
+
+def test_chunks_keep_question_boundaries():
+    chunks = list(split_chunks(LINES, 10))
+    assert [start for start, _ in chunks] == list(range(0, len(LINES), 12))
+    assert sum(len(chunk) for _, chunk in chunks) == len(LINES)
+
+def test_parallel_output_matches_serial():
+    assert list(read_questions_parallel(LINES, 3, chunk_size=20)) == parse_text(LINES)
+
+def test_error_reported_with_original_position(capsys):
+    lines = list(LINES)
+    lines.insert(49, "\x00 bad line\n")
+    questions = list(read_questions_parallel(lines, 2, chunk_size=20))
+    err = capsys.readouterr().err
+    assert err.count("Reader Error") == 1
+    assert "Question 9, line 50" in err
+    assert questions == parse_text(lines)
+    assert capsys.readouterr().err == err
@@ -0,0 +1,60 @@
+# test_read_watch
+
+import json
+
+import watch
+from benchmarks.synth import code_question_lines
+from reader import parse_text
+from watch import IncrementalBuild, rebuild
+
+LINES = code_question_lines(20)
+
+def test_only_changed_blocks_parsed():
+    build = IncrementalBuild()
+    assert build.build(LINES) == parse_text(LINES)
+    assert build.parsed == 20
+    lines = list(LINES)
+    lines[2] = "changed code\n"
+    assert build.build(lines) == parse_text(lines)
+    assert build.parsed == 1
+
+def test_error_keeps_last_build(capsys):
+    build = IncrementalBuild()
+    build.build(LINES)
+    lines = list(LINES)
+    lines[4] = "\x00 bad line\n"
+    assert build.build(lines) is None
+    assert "line 5" in capsys.readouterr().err
+    assert build.build(LINES) == parse_text(LINES)
+    assert build.parsed == 0
+
+def test_rebuild_replaces_output(tmp_path):
+    source = tmp_path / "questions.txt"
+    output = tmp_path / "questions.json"
+    source.write_text("".join(LINES))
+    output.write_text("[]")
+    assert rebuild(IncrementalBuild(), source, output, 'json')
+    assert json.loads(output.read_text()) == parse_text(LINES)
+    assert {p.name for p in tmp_path.iterdir()} == {"questions.txt", "questions.json"}
+
+def test_watch_waits_for_missing_source(tmp_path, monkeypatch, capsys):
+    source = tmp_path / "questions.txt"
+    output = tmp_path / "questions.json"
+    source.write_text("".join(LINES))
+    stamps = iter([(1, 1), (2, 1), None, (3, 1)])
+    def file_stamp(file_name):
+        stamp = next(stamps)
+        if stamp == (2, 1):
+            # polled just before the editor removed the file
+            source.unlink()
+        if stamp == (3, 1):
+            source.write_text("".join(LINES[:6]))
+        return stamp
+    def sleep(interval):
+        if output.exists() and len(json.loads(output.read_text())) == 1:
+            raise KeyboardInterrupt
+    monkeypatch.setattr(watch, 'file_stamp', file_stamp)
+    monkeypatch.setattr(watch.time, 'sleep', sleep)
+    watch.watch(str(source), str(output), 'json')
+    assert json.loads(output.read_text()) == parse_text(LINES[:6])
+    assert "not found, waiting for it" in capsys.readouterr().err
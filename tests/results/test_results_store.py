@@ -0,0 +1,52 @@
+# test_results_store
+
+import os
+from types import SimpleNamespace
+
+import quizzer
+from results import ResultsStore
+
+def test_attempt_ids_follow_stored_attempts(tmp_path):
+    with ResultsStore(str(tmp_path / "results.db")) as store:
+        assert store.record_attempt("set.json", 0.0, [(1, "a", True, 1.0)], 3) == 1
+        assert store.record_attempt("set.json", 2.0, [], 3) == 2
+
+def test_answers_joined_through_attempt_index(tmp_path):
+    with ResultsStore(str(tmp_path / "results.db")) as store:
+        plan = store.connection.execute(
+            "explain query plan select answers.question from answers join attempts"
+            " on attempts.id = answers.attempt where attempts.file = ?", ("set.json",))
+        details = " ".join(row[-1] for row in plan)
+    assert "answers_by_attempt" in details
+
+def test_history_queries(tmp_path):
+    file_name = str(tmp_path / "results.db")
+    with ResultsStore(file_name) as store:
+        store.record_attempt("set.json", 0.0, [(1, "a", True, 1.0), (2, "b", False, 2.0)], 2)
+        store.record_attempt("set.json", 5.0, [(1, "b", False, 6.0), (2, "b", False, 7.0)], 2)
+        store.record_attempt("other.json", 9.0, [(1, "a", False, 10.0)], 1)
+    with ResultsStore(file_name) as store:
+        trend = store.score_trend("set.json")
+        worst = store.worst_questions("set.json")
+    assert [(attempt, correct, answered) for attempt, _, correct, answered, _ in trend] == [(1, 1, 2), (2, 0, 2)]
+    assert worst == [(2, 2, 2), (1, 1, 2)]
+
+def answered_question(question_id, correct):
+    return SimpleNamespace(question_id=question_id, response="a", correct=correct,
+                           answered=True, answered_at=1.0)
+
+def test_quizzer_saves_next_to_question_set(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    set_file = str(tmp_path / "sets" / "q.json")
+    os.mkdir(tmp_path / "sets")
+    quizzer.results_to_store([answered_question(1, True)], 2, set_file, 0.0)
+    assert "attempt 1" in capsys.readouterr().out
+    quizzer.print_stats(set_file)
+    assert "1/2" in capsys.readouterr().out
+
+def test_quizzer_reports_store_failures(tmp_path, capsys):
+    set_file = str(tmp_path / "missing" / "q.json")
+    quizzer.results_to_store([answered_question(1, True)], 2, set_file, 0.0)
+    assert "Could not save results" in capsys.readouterr().out
+    quizzer.print_stats(set_file)
+    assert "No saved results" in capsys.readouterr().out
@@ -0,0 +1,91 @@
+# test_scheduler_heap
+
+import random
+
+import pytest
+
+from scheduler import DAY, Schedule, ScheduleError, load_schedule
+
+NOW = 1_700_000_000.0
+
+def check_heap(schedule):
+    heap, priority = schedule.heap, schedule.priority
+    for i, question in enumerate(heap):
+        assert schedule.slot[question] == i
+        if i:
+            assert priority[heap[(i - 1) // 2]] <= priority[question]
+
+def test_heap_order_kept_after_every_answer():
+    rng = random.Random(0)
+    schedule = Schedule(200)
+    for step in range(2000):
+        schedule.record(rng.randrange(200), rng.random() < 0.7, NOW + step * 60)
+    check_heap(schedule)
+    assert len(schedule.heap) == 200
+
+def test_due_reviews_before_new_questions():
+    schedule = Schedule(10)
+    schedule.record(4, True, NOW - 3 * DAY)
+    schedule.record(7, False, NOW - 3 * DAY)
+    schedule.record(2, True, NOW)
+    # both reviews are due, the wrong answer has the earlier priority
+    assert schedule.next_question(NOW, new_left=5) == 7
+    schedule.record(7, True, NOW)
+    assert schedule.next_question(NOW, new_left=5) == 4
+    schedule.record(4, True, NOW)
+    # then new questions in file order, skipping answered ones
+    assert schedule.next_question(NOW, new_left=5) == 0
+    schedule.record(0, True, NOW)
+    schedule.record(1, True, NOW)
+    assert schedule.next_question(NOW, new_left=5) == 3
+    assert schedule.next_question(NOW, new_left=0) is None
+
+def test_wrong_answers_come_back_sooner():
+    schedule = Schedule(2)
+    schedule.record(0, True, NOW)
+    schedule.record(1, True, NOW)
+    schedule.record(0, True, NOW + DAY)
+    schedule.record(1, False, NOW + DAY)
+    schedule.record(1, True, NOW + DAY + 600)
+    assert schedule.priority[1] < schedule.priority[0]
+    assert schedule.interval[1] < schedule.interval[0]
+
+def test_saved_state_round_trip(tmp_path):
+    rng = random.Random(1)
+    schedule = Schedule(50)
+    for step in range(300):
+        schedule.record(rng.randrange(50), rng.random() < 0.5, NOW + step)
+    file_name = tmp_path / "questions.json.schedule"
+    schedule.save(file_name)
+    loaded = load_schedule(file_name, 60)
+    assert len(loaded) == 60
+    for name in ('priority', 'interval', 'errors', 'reviews', 'slot'):
+        assert getattr(loaded, name)[:50] == getattr(schedule, name)
+    assert loaded.heap == schedule.heap
+    assert list(loaded.slot[50:]) == [-1] * 10
+    check_heap(loaded)
+
+def test_questions_past_a_shrunk_set_dropped(tmp_path):
+    rng = random.Random(2)
+    schedule = Schedule(10)
+    for step in range(100):
+        schedule.record(rng.randrange(10), rng.random() < 0.5, NOW - DAY + step)
+    file_name = tmp_path / "questions.json.schedule"
+    schedule.save(file_name)
+    loaded = load_schedule(file_name, 3)
+    assert len(loaded) == 3
+    assert sorted(loaded.heap) == [0, 1, 2]
+    check_heap(loaded)
+    seen = set()
+    while (question := loaded.next_question(NOW + 30 * DAY, new_left=1)) is not None:
+        assert question < 3
+        if question in seen:
+            break
+        seen.add(question)
+        loaded.record(question, True, NOW + 30 * DAY)
+
+def test_missing_and_invalid_files(tmp_path):
+    assert len(load_schedule(tmp_path / "missing", 5)) == 5
+    (tmp_path / "bad").write_bytes(b"not a schedule at all, just some bytes")
+    with pytest.raises(ScheduleError):
+        load_schedule(tmp_path / "bad", 5)
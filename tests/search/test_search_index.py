@@ -0,0 +1,79 @@
+# test_search_index
+
+import pytest
+from click.testing import CliRunner
+
+import reader
+from search import IndexBuilder, SearchError, open_index, split_alternatives
+
+def question(text, code=(), answers=("yes", "no")):
+    return {
+        'question_before': text,
+        'question_after': "",
+        'question_code': list(code),
+        'answers': [[answer, i == 0] for i, answer in enumerate(answers)],
+        'answer_why': None
+    }
+
+QUESTIONS = [
+    question("Which sort is stable in the worst case?", answers=("merge sort", "heap sort")),
+    question("What is the worst sorting case for quicksort?"),
+    question("How are graphs traversed?", code=["def bfs(graph):", "    queue = [graph.root]"]),
+    question("Is a heap a tree?", answers=("yes, a binary tree", "no")),
+]
+
+@pytest.fixture
+def index(tmp_path):
+    builder = IndexBuilder()
+    for q in QUESTIONS:
+        builder.add(q)
+    file_name = tmp_path / "questions.json.index"
+    builder.write(file_name)
+    with open_index(file_name) as index:
+        yield index
+
+@pytest.mark.parametrize('query, expected', [
+    ("worst", [0, 1]),
+    ("Worst CASE", [0, 1]),
+    ('"worst case"', [0]),
+    ('"case for quicksort"', [1]),
+    ("sort*", [0, 1]),
+    ("heap", [0, 3]),
+    ("heap -tree", [0]),
+    ("-worst", [2, 3]),
+    ("graph OR binary", [2, 3]),
+    ("bfs queue", [2]),
+    ("missing", []),
+    ('"worst missing"', []),
+])
+def test_queries(index, query, expected):
+    assert index.search(query) == expected
+
+def test_terms_sorted_for_lookup(index):
+    terms = [bytes(index.term(i)) for i in range(len(index))]
+    assert terms == sorted(terms)
+    assert index.lookup("zzz") is None
+    assert index.count == len(QUESTIONS)
+
+def test_query_parsing():
+    assert split_alternatives('a "b c" -d* OR e') == [
+        [(False, ['a']), (False, ['b', 'c']), (True, ['d*'])], [(False, ['e'])]
+    ]
+    with pytest.raises(SearchError):
+        split_alternatives('"" OR -')
+
+def test_quizzer_match_keeps_selected_numbers(index, tmp_path):
+    from quizzer import select_matches
+    assert select_matches(str(tmp_path / "questions.json"), "heap", []) == [1, 4]
+    assert select_matches(str(tmp_path / "questions.json"), "heap", [4, 2, 1]) == [4, 1]
+
+@pytest.mark.parametrize('arguments, message', [
+    (['out.json', '--watch'], "--index can not be used with --watch"),
+    (['-'], "--index needs an output file"),
+])
+def test_index_needs_a_compiled_file(tmp_path, arguments, message):
+    source = tmp_path / "q.txt"
+    source.write_text("1. Question\nA. yes\n")
+    result = CliRunner().invoke(reader.main, [str(source), *arguments, '--index'])
+    assert result.exit_code == 2
+    assert message in result.output
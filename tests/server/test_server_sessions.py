@@ -0,0 +1,80 @@
+# test_server_sessions
+
+import asyncio
+import json
+
+from model import QuestionBank
+from server import QuizServer
+
+DATA = [
+    {
+        'question_before': f"Question {n}",
+        'question_after': "",
+        'question_code': [],
+        'answers': [["x", True], ["y", n % 2 == 0], ["z", False]],
+        'answer_why': None
+    } for n in range(1, 6)
+]
+
+def test_session_flow():
+    server = QuizServer(QuestionBank.from_serialized(DATA))
+    session, reply = server.handle(None, "start --questions=1-2\n")
+    assert reply['total'] == 2
+    assert reply['question']['id'] == 1
+    assert reply['question']['choose'] == 1
+    _, reply = server.handle(session, "answer a\n")
+    assert reply['correct'] and reply['question']['id'] == 2
+    _, reply = server.handle(session, "answer a\n")
+    assert reply == {'error': "Choose 2 answers"}
+    _, reply = server.handle(session, "answer ac\n")
+    assert not reply['correct'] and reply['question'] is None
+    _, reply = server.handle(session, "results\n")
+    assert reply['results'] == {'correct': 1, 'answered': 2, 'total': 2, 'incorrect': [2]}
+
+def test_sessions_have_independent_state():
+    server = QuizServer(QuestionBank.from_serialized(DATA))
+    first, reply = server.handle(None, "start -s\n")
+    second, _ = server.handle(None, "start\n")
+    server.handle(first, f"answer {'ab'[:reply['question']['choose']]}\n")
+    assert len(first.questions) == 2
+    assert len(second.questions) == 1
+    assert second.session_id == first.session_id + 1
+
+def test_invalid_requests():
+    server = QuizServer(QuestionBank.from_serialized(DATA))
+    assert server.handle(None, "answer a\n")[1] == {'error': "No session started"}
+    assert 'error' in server.handle(None, "start --questions=9\n")[1]
+    assert 'error' in server.handle(None, "start -x\n")[1]
+    assert server.handle(None, "start --questions=\n")[1] == {'error': "No questions selected"}
+
+def test_tcp_round_trip():
+    async def run():
+        server = QuizServer(QuestionBank.from_serialized(DATA))
+        started = asyncio.get_running_loop().create_future()
+        task = asyncio.create_task(server.serve("127.0.0.1", 0, started))
+        host, port = (await started)[:2]
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(b"start\nquit\n")
+        replies = [json.loads(await reader.readline()) for _ in range(2)]
+        writer.close()
+        task.cancel()
+        return replies
+    start, results = asyncio.run(run())
+    assert start['total'] == 5
+    assert results['results']['answered'] == 0
+
+def test_undecodable_request_keeps_session():
+    async def run():
+        server = QuizServer(QuestionBank.from_serialized(DATA))
+        started = asyncio.get_running_loop().create_future()
+        task = asyncio.create_task(server.serve("127.0.0.1", 0, started))
+        host, port = (await started)[:2]
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(b"start\nanswer \xff\nanswer a\n")
+        replies = [json.loads(await reader.readline()) for _ in range(3)]
+        writer.close()
+        task.cancel()
+        return replies
+    _, invalid, answered = asyncio.run(run())
+    assert invalid == {'error': "Request is not valid utf-8"}
+    assert answered['correct']
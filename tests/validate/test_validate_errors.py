@@ -0,0 +1,66 @@
+# test_validate_errors
+
+from benchmarks.synth import code_question_lines
+from validate import validate_lines
+
+LINES = code_question_lines(40)
+
+GRAMMAR = "".join(
+    f"{n}. Which choice is right?\n\ta. first {n}\n\tb. second\nA. (a)\n"
+        for n in range(1, 21)).splitlines(True)
+
+def positions(diagnostics):
+    return [(d.line, d.column, d.question) for d in diagnostics]
+
+def with_errors(lines, errors):
+    lines = list(lines)
+    for index, line in errors:
+        lines[index] = line
+    return lines
+
+def test_clean_file_has_no_errors():
+    assert list(validate_lines(LINES, "q.txt")) == []
+    assert list(validate_lines(GRAMMAR, "g.txt", engine='grammar')) == []
+
+def test_every_error_collected():
+    lines = with_errors(LINES, [(4, "\x00 bad\n"), (40, "\x00 bad\n"), (202, "\x00 bad\n")])
+    diagnostics = list(validate_lines(lines, "q.txt"))
+    assert positions(diagnostics) == [(5, 1, 1), (41, 1, 7), (203, 1, 34)]
+    assert str(diagnostics[0]).startswith("q.txt:5:1: question 1: Got: '\\x00 bad'")
+
+def test_parallel_matches_serial():
+    lines = with_errors(LINES, [(4, "\x00 bad\n"), (100, "\x00 bad\n"), (202, "\x00 bad\n")])
+    serial = list(validate_lines(lines, "q.txt"))
+    parallel = list(validate_lines(lines, "q.txt", jobs=2, chunk_size=20))
+    assert [str(d) for d in parallel] == [str(d) for d in serial]
+
+def test_unfinished_question():
+    diagnostics = list(validate_lines(LINES[:-1], "q.txt"))
+    assert positions(diagnostics) == [(235, 1, 40)]
+
+def test_grammar_errors_have_columns():
+    lines = with_errors(GRAMMAR, [(1, '\ta. "quoted"\n'), (8, "3x. broken\n"), (78, "\tb second\n")])
+    diagnostics = list(validate_lines(lines, "g.txt", engine='grammar'))
+    # any character is free text and an indented line that is not a choice
+    # continues the text like the regex engine reads it
+    assert positions(diagnostics) == [(9, 2, 3)]
+    assert list(validate_lines(lines[76:80], "g.txt", engine='grammar')) == []
+
+def test_grammar_unclosed_code_block():
+    lines = GRAMMAR + ['99. café = "x"\n', '"""\n', '\tcode\n']
+    diagnostics = list(validate_lines(lines, "g.txt", engine='grammar'))
+    assert positions(diagnostics) == [(len(GRAMMAR) + 2, 1, 21)]
+    assert diagnostics[0].message == "Code block not correctly ended"
+
+def test_grammar_unindented_line_is_an_error():
+    lines = with_errors(GRAMMAR, [(78, "b. second\n")])
+    diagnostics = list(validate_lines(lines, "g.txt", engine='grammar'))
+    assert positions(diagnostics) == [(79, 1, 20)]
+    assert diagnostics[0].message.startswith("Expected an indented line")
+
+def test_engines_agree_on_code_blocks():
+    assert list(validate_lines(LINES, "q.txt", engine='grammar')) == []
+    lines = with_errors(LINES, [(40, "bad\n")])
+    regex = list(validate_lines(lines, "q.txt"))
+    grammar = list(validate_lines(lines, "q.txt", engine='grammar'))
+    assert positions(grammar) == positions(regex) == [(41, 1, 7)]
@@ -0,0 +1,156 @@
+# validate.py
+
+"""Collect every error in a question set from a single pass
+
+The compilers stop at the first problem. Validation splits the file into
+question blocks, checks each block on its own and recovers at the next
+block, so one run reports every lexer, parser or reader error with its
+file, line and column.
+
+    py validate.py [file_name] [--engine=regex|grammar] [--jobs=N]
+"""
+
+import multiprocessing
+import sys
+
+import click
+
+from config import file_name_text
+from config import reader_chunk_lines as chunk_lines
+from error import LexerError, ParserError
+from lexer import ENDMARKER, tokenize_buffer
+from parser import TokenStream, question_record
+from reader import (Reader, evaluate_error, iter_lines_from_file,
+                    split_blocks, split_chunks)
+
+class Diagnostic:
+    """One error found in a question set. Line and column start at 1"""
+    __slots__ = ('file_name', 'line', 'column', 'question', 'message')
+
+    def __init__(self, file_name, line, column, question, message):
+        self.file_name = file_name
+        self.line = line
+        self.column = column
+        self.question = question
+        self.message = message
+
+    def __repr__(self):
+        return f"Diagnostic({self.file_name}:{self.line}:{self.column}, {self.message!r})"
+
+    def __str__(self):
+        return (f"{self.file_name}:{self.line}:{self.column}: "
+                f"question {self.question}: {self.message}")
+
+def shorten(line):
+    line = line.rstrip('\n')
+    return repr(line if len(line) < 72 else line[:69] + '...')
+
+def check_block_regex(start, block):
+    """Runs the reader state machine over one block. Returns the number of
+    questions read and the errors as (line, column, message)"""
+    reader = Reader(line_number=start, quiet=True)
+    count = 0
+    for line in block:
+        question = reader.feed(line)
+        if question is not None:
+            count += 1
+        elif reader.stopped:
+            expected = evaluate_error(reader.question, reader.last_matched_pattern)
+            return count, [(reader.line_number, 1,
+                            f"Got: {shorten(line)} Expected: {expected}")]
+    if not reader.question.empty or reader.code_block_start:
+        return count, [(start + 1, 1, "Question not ended with an answer line")]
+    return count, []
+
+def locate(data, offset):
+    """Converts an offset into the source bytes to a line and column"""
+    line = data.count(b'\n', 0, offset)
+    start = data.rfind(b'\n', 0, offset) + 1
+    return line, len(data[start:offset].decode(errors='replace')) + 1
+
+def check_block_grammar(start, block):
+    """Tokenizes and parses one block with the lexer and parser. Returns the
+    number of questions read and the errors as (line, column, message)"""
+    data = "".join(block).encode()
+    try:
+        tokens = tokenize_buffer(data)
+    except LexerError as e:
+        line, column = locate(data, e.offset)
+        return 0, [(start + line + 1, column, e.message)]
+    if len(tokens) == 1:
+        return 0, []
+
+    stream = TokenStream(tokens)
+    try:
+        question_record(stream, data)
+        if stream.peek().type != ENDMARKER:
+            stream.next()
+            error = "Not all tokens consumed"
+        else:
+            return 1, []
+    except ParserError as e:
+        error = e.message.strip().splitlines()[-1]
+        if e.token is not None:
+            error += f". Got: {e.token.type} ({e.token.value!r})"
+    index = min(stream.position - 1, len(tokens) - 1)
+    line, column = locate(data, tokens.starts[index])
+    return 0, [(start + line + 1, column, error)]
+
+engines = {
+    'regex': check_block_regex,
+    'grammar': check_block_grammar
+}
+
+def check_chunk(job):
+    """Worker entry point. Question numbers are relative to the chunk and
+    are offset by the caller once earlier chunks are counted"""
+    engine, (start, lines) = job
+    check_block = engines[engine]
+    count = 0
+    errors = []
+    for block_start, block in split_blocks(lines):
+        read, found = check_block(start + block_start, block)
+        errors.extend((count + read + 1, *error) for error in found)
+        # a failed block still holds one question
+        count += read + (1 if found else 0)
+    return count, errors
+
+def validate_lines(lines, file_name, engine='regex', jobs=1, chunk_size=chunk_lines):
+    """Yields a Diagnostic for every error in the question set"""
+    chunks = ((engine, chunk) for chunk in split_chunks(lines, chunk_size))
+    if jobs > 1:
+        pool = multiprocessing.Pool(jobs)
+        results = pool.imap(check_chunk, chunks)
+    else:
+        pool = None
+        results = map(check_chunk, chunks)
+    count = 0
+    try:
+        for read, errors in results:
+            for question, line, column, message in errors:
+                yield Diagnostic(file_name, line, column, count + question, message)
+            count += read
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+def validate_file(file_name, engine='regex', jobs=1):
+    return list(validate_lines(iter_lines_from_file(file_name), file_name, engine, jobs))
+
+@click.command()
+@click.argument('file_name', default=file_name_text)
+@click.option('--engine', type=click.Choice(list(engines)), default='regex',
+              help="check with the reader patterns or the lexer and parser")
+@click.option('--jobs', default=1, help="check chunks in this many processes")
+def main(file_name, engine, jobs):
+    errors = 0
+    for diagnostic in validate_lines(iter_lines_from_file(file_name), file_name,
+                                     engine, jobs):
+        print(diagnostic)
+        errors += 1
+    print(f"{errors} error{'s' if errors != 1 else ''} in {file_name}", file=sys.stderr)
+    if errors:
+        exit(1)
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,107 @@
+# watch.py
+
+"""Rebuilds compiled question sets whenever their source file changes
+
+Parsed blocks are kept in memory between builds, so an edit only re-parses
+the blocks whose text changed. The output is written to a temporary file
+and moved over the old output, so readers never see a partial file"""
+
+import json
+import os
+import time
+
+from bank import write_bank
+from cache import block_hash
+from config import watch_interval
+from reader import engines, read_lines_from_file, report, split_blocks
+
+class IncrementalBuild:
+    """Serialized questions of the last build keyed by block hash"""
+
+    def __init__(self, engine='regex'):
+        self.parse = engines[engine]
+        self.blocks = {}
+        self.parsed = 0
+
+    def __repr__(self):
+        return f"IncrementalBuild({len(self.blocks)} blocks)"
+
+    def build(self, lines):
+        """Returns every question in lines or None when a block has an error.
+        Blocks missing from the last build are parsed, the rest are reused"""
+        blocks = {}
+        questions = []
+        parsed = 0
+        for start, block in split_blocks(lines):
+            key = block_hash(block)
+            found = blocks.get(key)
+            if found is None:
+                found = self.blocks.get(key)
+            if found is None:
+                found, stopped = self.parse(block, start, len(questions))
+                parsed += 1
+                if stopped:
+                    return None
+            blocks[key] = found
+            questions.extend(found)
+        self.blocks = blocks
+        self.parsed = parsed
+        return questions
+
+def write_output(questions, file_name, output_format, compress=False):
+    """Writes the output next to its destination then replaces it"""
+    temporary = f"{file_name}.tmp"
+    if output_format == 'bank':
+        write_bank(questions, temporary, compressed=compress)
+    else:
+        with open(temporary, "w") as f:
+            if output_format == 'jsonl':
+                f.writelines(json.dumps(question) + "\n" for question in questions)
+            else:
+                json.dump(questions, f, indent=2)
+    os.replace(temporary, file_name)
+
+def file_stamp(file_name):
+    try:
+        stat = os.stat(file_name)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def rebuild(build, file_name_in, file_name_out, output_format, compress=False):
+    started = time.perf_counter()
+    questions = build.build(read_lines_from_file(file_name_in))
+    if questions is None:
+        report(f"{file_name_out} not updated, fix the error above")
+        return False
+    write_output(questions, file_name_out, output_format, compress)
+    elapsed = time.perf_counter() - started
+    report(f"Updated {len(questions)} questions in {file_name_out} "
+           f"({build.parsed} blocks parsed, {elapsed * 1000:.0f}ms)")
+    return True
+
+def watch(file_name_in, file_name_out, output_format, compress=False,
+          interval=watch_interval, engine='regex'):
+    """Polls the source file and rebuilds on every change until interrupted.
+    Editors that save by renaming a new file over the source can leave it
+    missing for a moment, so a missing source is reported and polled again"""
+    build = IncrementalBuild(engine)
+    last = None
+    missing = False
+    report(f"Watching {file_name_in} (ctrl-c to stop)")
+    try:
+        while True:
+            stamp = file_stamp(file_name_in)
+            if stamp is None and not missing:
+                report(f"{file_name_in} not found, waiting for it")
+            missing = stamp is None
+            if stamp is not None and stamp != last:
+                last = stamp
+                try:
+                    rebuild(build, file_name_in, file_name_out, output_format, compress)
+                except FileNotFoundError:
+                    # removed after it was polled, rebuild once it is back
+                    last = None
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass